@@ -1,15 +1,33 @@
+from controllers.approvals import router as approvals_router
+from controllers.audit import router as audit_router
 from controllers.auth import router as auth_router
+from controllers.events import router as events_router
 from controllers.health import router as health_router
+from controllers.jwks import router as jwks_router
+from controllers.profiles import router as profiles_router
+from controllers.requisitions import router as requisitions_router
 from controllers.users import router as users_router
 
 # Expose routers directly
+approvals = approvals_router
+audit = audit_router
 auth = auth_router
+events = events_router
 health = health_router
+jwks = jwks_router
+profiles = profiles_router
+requisitions = requisitions_router
 users = users_router
 
 # If you want to use the dictionary approach later
 router_modules = {
+    "approvals": approvals_router,
+    "audit": audit_router,
     "auth": auth_router,
+    "events": events_router,
     "health": health_router,
+    "jwks": jwks_router,
+    "profiles": profiles_router,
+    "requisitions": requisitions_router,
     "users": users_router,
 }
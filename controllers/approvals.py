@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from controllers.requisitions import _visibility
+from core.database import get_db, get_read_db
+from core.org_index import org_index
+from core.security import get_current_admin_user, get_current_user
+from models.approval_decision import BatchDecisionRequest, BatchDecisionResponse
+from models.eligible_approver import RequisitionApprovers
+from services.approval_service import ApprovalService
+from services.user_service import UserService
+
+router = APIRouter(
+    prefix="/approvals",
+    tags=["approvals"],
+    responses={
+        401: {"description": "Unauthorized"},
+    },
+)
+
+@router.post("/batch", response_model=BatchDecisionResponse)
+def batch_decision(
+    request: BatchDecisionRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Approve or reject the pending step of many requisitions in one transaction
+    - **requisition_ids**: up to 500 requisitions
+    - **decision**: approve | reject
+    - **return**: one result per requisition, failures don't block the others
+    """
+    user = UserService.get_user_by_email(db, current_user.get("sub"))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+    return ApprovalService.batch_decide(db, user.id, request)
+
+@router.get("/approvers", response_model=List[RequisitionApprovers])
+def resolve_approvers(
+    requisition_id: List[int] = Query(..., min_length=1, max_length=500),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Eligible approvers for every step of the approval chains of many requisitions
+    - **requisition_id**: requisitions to resolve (repeatable, up to 500); those
+      the user can't see are left out of the response
+    """
+    return ApprovalService.resolve_approvers(db, requisition_id, **_visibility(db, current_user))
+
+@router.get("/org-index/stats", dependencies=[Depends(get_current_admin_user)])
+def org_index_stats() -> dict:
+    """Size and refresh counters of this worker's org hierarchy index (admin only)"""
+    return org_index.stats()
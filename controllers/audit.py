@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from core.audit import audit_log
+from core.database import get_read_db
+from core.security import get_current_admin_user
+from models.audit_event import AuditEvent
+from services.audit_service import AuditService
+
+router = APIRouter(
+    prefix="/audit",
+    tags=["audit"],
+    dependencies=[Depends(get_current_admin_user)],
+    responses={
+        401: {"description": "Unauthorized"},
+        403: {"description": "Forbidden"},
+    },
+)
+
+@router.get("/events", response_model=List[AuditEvent])
+def get_audit_events(
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    action: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Audit trail, newest first (admin only)
+    - **entity_type** / **entity_id**: e.g. requisition / 42
+    - **actor_id**: user who made the change
+    - **before_id**: page through older events
+    """
+    if entity_id is not None and entity_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="entity_id requires entity_type"
+        )
+    return AuditService.get_events(
+        db,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        actor_id=actor_id,
+        action=action,
+        before_id=before_id,
+        limit=limit,
+    )
+
+@router.get("/stats")
+def audit_stats() -> dict:
+    """Queue and write counters of this worker's audit log (admin only)"""
+    return audit_log.stats()
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta, datetime
-from jose import JWTError, jwt
+from typing import Optional
 
+from core.audit import audit_log
 from core.config import settings
 from core.database import get_db
+from core.keys import decode_token
+from core.rate_limit import get_client_ip, login_rate_limiter
 from core.security import (
     authenticate_user,
     create_access_token,
     create_id_token,
     get_current_admin_user,
+    get_current_user,
     oauth2_scheme
 )
+from models.auth.token import TokenRefreshRequest
+from services.token_service import RefreshTokenReuseError, TokenService
 
 router = APIRouter(
     prefix="/auth",
@@ -24,14 +30,33 @@ router = APIRouter(
 
 @router.post("/login")
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     OAuth2 compatible token login, get an access token for future requests
     """
+    client_ip = get_client_ip(request)
+    # Reject floods before any DB query or password hashing
+    limit = login_rate_limiter.hit({
+        "ip": client_ip,
+        "email": form_data.username.strip().lower(),
+    })
+    if not limit.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(limit.retry_after)}
+        )
+
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
+        audit_log.record(
+            "auth.login_failed", "user",
+            ip_address=client_ip,
+            details={"email": form_data.username.strip().lower()},
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -68,62 +93,84 @@ async def login(
         user_data=user_data,
         expires_delta=timedelta(days=7)  # ID tokens typically last longer
     )
+
+    # Opaque refresh token, starts a new rotation family
+    refresh_token, _ = TokenService.issue_refresh_token(db, user.id)
+    audit_log.record("auth.login", "user", user.id, actor_id=user.id, ip_address=client_ip)
     
     return {
         "access_token": access_token,
         "id_token": id_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
         "expires_in": int(access_token_expires.total_seconds())
     }
 
 @router.post("/refresh-token")
-async def refresh_token(refresh_token: str):
+def refresh_token(
+    token_request: TokenRefreshRequest,
+    db: Session = Depends(get_db)
+):
     """
     Refresh token endpoint
-    - **refresh_token**: str
-    - **return**: new access token
+    - **refresh_token**: str, as returned by login or a previous refresh
+    - **return**: new access token and a new refresh token (the old one is spent)
     - **status**: 200 OK
     """
-
     try:
-        payload = jwt.decode(
-            refresh_token, 
-            settings.get_jwt_key, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_email = payload.get("sub")
-        
-        if not user_email:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Create a new access token
-        access_token = create_access_token(
-            data={"sub": user_email},
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        result = TokenService.rotate_refresh_token(db, token_request.refresh_token)
+    except RefreshTokenReuseError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected, please log in again",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        
-        return {"access_token": access_token, "token_type": "bearer"}
-    
-    except JWTError:
+
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user, new_refresh_token = result
+    access_token_expires = settings.access_token_expires
+    access_token = create_access_token(
+        data={"sub": user.email, "is_sys_admin": user.is_sys_admin},
+        expires_delta=access_token_expires
+    )
+
+    return {
+        "access_token": access_token,
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer",
+        "expires_in": int(access_token_expires.total_seconds())
+    }
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token_request: Optional[TokenRefreshRequest] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Revoke the current access token and, if given, the refresh token family
+    """
+    if current_user.get("jti") and current_user.get("exp"):
+        TokenService.revoke_access_token(
+            db, current_user["jti"], datetime.utcfromtimestamp(current_user["exp"])
+        )
+    if token_request:
+        TokenService.revoke_refresh_token(db, token_request.refresh_token)
+    return None
+
 @router.get("/debug-token", dependencies=[Depends(get_current_admin_user)])
 async def debug_token(token: str = Depends(oauth2_scheme)):
     """Debug endpoint to check token details (admin only)"""
     try:
         # Decode without verification for debugging
-        payload = jwt.decode(
+        payload = decode_token(
             token, 
-            settings.get_jwt_key, 
-            algorithms=[settings.ALGORITHM],
             options={"verify_exp": False}  # Skip expiration check for debugging
         )
         
@@ -146,3 +193,8 @@ async def debug_token(token: str = Depends(oauth2_scheme)):
         
     except Exception as e:
         return {"error": str(e)}
+
+@router.get("/rate-limit-stats", dependencies=[Depends(get_current_admin_user)])
+def rate_limit_stats() -> dict:
+    """Login rate limiter counters for monitoring (admin only)"""
+    return login_rate_limiter.stats()
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional
+import json
+import secrets
+
+from core.cache import get_cache
+from core.config import settings
+from core.database import SessionLocal
+from core.events import approver_topic, broker, requisition_topic, user_topic
+from core.security import get_current_admin_user, get_current_user, is_sys_admin, oauth2_scheme
+from models.orm_models import Requisition
+from services.approval_service import ApprovalService
+from services.user_service import UserService
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"],
+    responses={
+        401: {"description": "Unauthorized"},
+    },
+)
+
+HEARTBEAT_SECONDS = 15
+
+# Stream ticket -> claims of the user it was issued to. With the memory cache
+# backend a ticket only works on the worker that issued it.
+_stream_tickets = get_cache("event_stream_tickets", default_ttl=settings.EVENT_STREAM_TICKET_SECONDS)
+
+def _user_topics(current_user: Dict[str, Any], requisition_ids: List[int]) -> List[str]:
+    """
+    The user's own topic, one per department role they can approve for, and
+    one per requested requisition. Only requisitions the user initiated or
+    that belong to one of their departments can be followed (any for sys admins).
+    """
+    db = SessionLocal()
+    try:
+        user = UserService.get_user_by_email(db, current_user.get("sub"))
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+        roles = ApprovalService.get_user_roles(db, user.id)
+        topics = [user_topic(user.id)] + [approver_topic(d, r) for d, r in roles]
+        if not requisition_ids:
+            return topics
+
+        requisition_ids = list(dict.fromkeys(requisition_ids))
+        departments = {department_id for department_id, _ in roles}
+        admin = is_sys_admin(current_user)
+        allowed = {
+            row.id
+            for row in db.execute(
+                select(Requisition.id, Requisition.department_id, Requisition.initiator_id).where(
+                    Requisition.id.in_(requisition_ids),
+                    Requisition.deleted_at.is_(None),
+                )
+            )
+            if admin or row.initiator_id == user.id or row.department_id in departments
+        }
+        denied = [r for r in requisition_ids if r not in allowed]
+        if denied:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not allowed to follow requisitions: {', '.join(map(str, denied))}"
+            )
+        return topics + [requisition_topic(r) for r in requisition_ids]
+    finally:
+        db.close()
+
+@router.post("/ticket")
+def create_stream_ticket(current_user: dict = Depends(get_current_user)) -> dict:
+    """
+    Single-use ticket to open the event stream with, for EventSource clients
+    which can't send an Authorization header. It expires after a few seconds.
+    """
+    ticket = secrets.token_urlsafe(32)
+    _stream_tickets.set(ticket, {"sub": current_user.get("sub"), "is_sys_admin": is_sys_admin(current_user)})
+    return {"ticket": ticket, "expires_in": settings.EVENT_STREAM_TICKET_SECONDS}
+
+@router.get("/stream")
+async def stream(
+    request: Request,
+    requisition_id: List[int] = Query([]),
+    ticket: Optional[str] = None,
+    token: Optional[str] = Depends(oauth2_scheme),
+):
+    """
+    Server-Sent Events stream of approval status changes for the current user
+    - **requisition_id**: extra requisitions to follow (repeatable), the user's own or of their departments
+    - **ticket**: from POST /events/ticket, instead of the Authorization header
+    """
+    if token or not ticket:
+        current_user = await get_current_user(token)
+    else:
+        # Used up here, so a ticket leaked through logs or history can't be replayed
+        current_user = await run_in_threadpool(_stream_tickets.pop, ticket)
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired ticket"
+            )
+    topics = await run_in_threadpool(_user_topics, current_user, requisition_id)
+
+    subscription = broker.subscribe(topics)
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await broker.next_event(subscription, HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stats", dependencies=[Depends(get_current_admin_user)])
+def event_stats() -> dict:
+    """Open connections and fan-out latency of this worker (admin only)"""
+    return broker.stats()
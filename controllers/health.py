@@ -1,5 +1,7 @@
 from fastapi import APIRouter
 
+from core.load_shedding import concurrency_limiter
+
 router = APIRouter(
     prefix="",
     tags=["health"],
@@ -16,3 +18,9 @@ def health() -> dict[str, str]:
 @router.get("/healthz")
 def healthz() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/health/load")
+def load() -> dict:
+    """Concurrency limit, in-flight and shed request counts of this worker"""
+    return concurrency_limiter.stats()
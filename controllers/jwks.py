@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from core.keys import get_key_ring
+
+router = APIRouter(
+    prefix="/.well-known",
+    tags=["authentication"],
+)
+
+@router.get("/jwks.json")
+def jwks(response: Response) -> dict:
+    """
+    Public keys used to sign tokens, so other services can verify them locally
+    """
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return get_key_ring().jwks()
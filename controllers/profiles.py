@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from core.profiling import collapsed, get_profile, speedscope
+from core.security import get_current_admin_user
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["diagnostics"],
+    dependencies=[Depends(get_current_admin_user)],
+    responses={
+        401: {"description": "Unauthorized"},
+        403: {"description": "Forbidden"},
+    },
+)
+
+@router.get("/{profile_id}")
+def read_profile(
+    profile_id: str,
+    format: str = Query("summary", pattern="^(summary|collapsed|speedscope)$"),
+):
+    """
+    Profile of a request sent with ``X-Profile: 1`` (admin only).
+
+    ``summary`` splits the wall time between the event loop, the threadpool,
+    SQL and password hashing; ``collapsed`` is the input of flamegraph.pl;
+    ``speedscope`` can be dropped onto https://www.speedscope.app.
+    """
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    if format == "collapsed":
+        return PlainTextResponse(collapsed(profile))
+    if format == "speedscope":
+        return speedscope(profile)
+    return {key: value for key, value in profile.items() if key != "stacks"}
@@ -0,0 +1,175 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, datetime
+import os
+import tempfile
+
+from core.database import get_read_db
+from core.deadlines import request_deadline
+from core.security import get_current_admin_user, get_current_user, is_sys_admin
+from models.requisition import Requisition, RequisitionWithApprovals
+from services.approval_service import ApprovalService
+from services.export_service import ExportService
+from services.requisition_service import RequisitionService
+from services.user_service import UserService
+
+router = APIRouter(
+    prefix="/requisitions",
+    tags=["requisitions"],
+    responses={
+        404: {"description": "Not found"},
+        401: {"description": "Unauthorized"},
+    },
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def _visibility(db: Session, current_user: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read scope of the caller: sys admins see every requisition, other users
+    those of the departments they hold a role in and the ones they initiated
+    """
+    if is_sys_admin(current_user):
+        return {}
+    user = UserService.get_user_by_email(db, current_user.get("sub"))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+    departments = {department_id for department_id, _ in ApprovalService.get_user_roles(db, user.id)}
+    return {"visible_to": user.id, "visible_departments": departments}
+
+def _export_filename(export_format: str) -> str:
+    return f"requisitions-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+
+# XLSX exports are built before the response starts
+@router.get("/export", dependencies=[Depends(get_current_admin_user), Depends(request_deadline(300))])
+def export_requisitions(
+    format: Literal["csv", "xlsx"] = "csv",
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    department_id: Optional[int] = None,
+):
+    """
+    Export requisitions with their purchase details and line items (admin only)
+
+    CSV is streamed straight from a server-side cursor; XLSX is written to a
+    temporary file first, since the zip container can't be streamed.
+    """
+    filters = {"created_from": created_from, "created_to": created_to, "department_id": department_id}
+    headers = {"Content-Disposition": f'attachment; filename="{_export_filename(format)}"'}
+
+    if format == "csv":
+        return StreamingResponse(
+            ExportService.csv_chunks(ExportService.stream_requisitions(**filters)),
+            media_type=MEDIA_TYPES["csv"],
+            headers=headers,
+        )
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        ExportService.write_xlsx(ExportService.stream_requisitions(**filters), path)
+    except Exception as e:
+        os.remove(path)
+        if isinstance(e, RuntimeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        raise
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES["xlsx"],
+        headers=headers,
+        background=BackgroundTask(os.remove, path),
+    )
+
+@router.post("/exports", status_code=status.HTTP_202_ACCEPTED)
+def create_export_job(
+    background_tasks: BackgroundTasks,
+    format: Literal["csv", "xlsx"] = "csv",
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    department_id: Optional[int] = None,
+    current_user: dict = Depends(get_current_admin_user),
+):
+    """
+    Start an export in the background (admin only), poll it and download the file when completed
+    """
+    filters = {"created_from": created_from, "created_to": created_to, "department_id": department_id}
+    job = ExportService.create_job(format, current_user.get("sub"), filters)
+    background_tasks.add_task(ExportService.run_job, job["id"], filters)
+    return job
+
+@router.get("/exports/{job_id}")
+def get_export_job(job_id: str, current_user: dict = Depends(get_current_admin_user)):
+    """
+    Get the status of an export job
+    """
+    job = ExportService.get_job(job_id)
+    if not job or job["requested_by"] != current_user.get("sub"):
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+@router.get("/exports/{job_id}/download")
+def download_export(job_id: str, current_user: dict = Depends(get_current_admin_user)):
+    """
+    Download the file of a completed export job
+    """
+    job = ExportService.get_job(job_id)
+    if not job or job["requested_by"] != current_user.get("sub"):
+        raise HTTPException(status_code=404, detail="Export not found")
+    path = ExportService.job_path(job)
+    if job["status"] != "completed" or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export is {job['status']}")
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[job["format"]],
+        filename=_export_filename(job["format"]),
+    )
+
+@router.get("/", response_model=List[Requisition])
+def get_requisitions(
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    department_id: Optional[int] = None,
+    status_id: Optional[int] = None,
+    include_archive: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get requisitions, newest first. Archived requisitions are only included when asked for.
+    Users other than sys admins only get their departments' requisitions and their own.
+    """
+    return RequisitionService.get_requisitions(
+        db,
+        skip=skip,
+        limit=limit,
+        department_id=department_id,
+        status_id=status_id,
+        include_archive=include_archive,
+        **_visibility(db, current_user),
+    )
+
+@router.get("/{requisition_id}", response_model=RequisitionWithApprovals)
+def get_requisition(
+    requisition_id: int,
+    include_archive: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get a requisition with its approval chain
+    """
+    requisition = RequisitionService.get_requisition_by_id(
+        db, requisition_id, include_archive=include_archive, **_visibility(db, current_user)
+    )
+    if not requisition:
+        raise HTTPException(status_code=404, detail="Requisition not found")
+    return requisition
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from core.database import get_db
+from core.database import get_db, get_read_db
 from core.security import get_current_user, get_current_admin_user, get_current_user_optional, get_user_from_request
 from models.user import User, UserCreate, UserUpdate
 from services.user_service import UserService
@@ -17,20 +17,26 @@ router = APIRouter(
     },
 )
 
+def _actor_id(db: Session, current_user: dict) -> Optional[int]:
+    """Id of the authenticated user, for the audit trail"""
+    actor = UserService.get_user_by_email(db, current_user.get("sub"))
+    return actor.id if actor else None
+
 @router.get("/", dependencies=[Depends(get_current_admin_user)], response_model=List[User])
 def get_users(
     skip: int = 0, 
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all users
     """
     users = UserService.get_users(db, skip=skip, limit=limit)
-    return users
+    # Straight from the users table, no need to validate every email again
+    return [User.trusted(user) for user in users]
 
 @router.get("/{user_id}", dependencies=[Depends(get_current_user)], response_model=User)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """
     Get user by ID
     """
@@ -56,12 +62,11 @@ def create_user(
             detail="Email already registered"
         )
     
-    # Hash the password
+    # Hash the password; the input is already validated, so copy instead of rebuilding
     from core.security import get_password_hash
-    user_dict = user.model_dump()
-    user_dict["password"] = get_password_hash(user.password)
+    user = user.model_copy(update={"password": get_password_hash(user.password)})
     
-    return UserService.create_user(db, UserCreate(**user_dict))
+    return UserService.create_user(db, user, actor_id=_actor_id(db, current_user))
 
 @router.put("/{user_id}", response_model=User)
 def update_user(
@@ -76,11 +81,9 @@ def update_user(
     # Hash the password if it's being updated
     if user.password:
         from core.security import get_password_hash
-        user_dict = user.model_dump()
-        user_dict["password"] = get_password_hash(user.password)
-        user = UserUpdate(**user_dict)
+        user = user.model_copy(update={"password": get_password_hash(user.password)})
     
-    updated_user = UserService.update_user(db, user_id, user)
+    updated_user = UserService.update_user(db, user_id, user, actor_id=_actor_id(db, current_user))
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
     return updated_user
@@ -94,7 +97,7 @@ def delete_user(
     """
     Delete user (admin only)
     """
-    success = UserService.delete_user(db, user_id)
+    success = UserService.delete_user(db, user_id, actor_id=_actor_id(db, current_user))
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return None
@@ -102,7 +105,7 @@ def delete_user(
 @router.get("/me", response_model=User)
 def get_my_profile(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get current user profile 
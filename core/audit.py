@@ -0,0 +1,208 @@
+"""
+Audit trail with batched, asynchronous writes.
+
+Recording an event only appends it to an in-memory queue, so approvals, user
+changes and logins don't wait for an extra INSERT. A background loop writes
+the queue to ``audit_events`` with one multi-row INSERT per batch, as soon as
+``settings.AUDIT_BATCH_SIZE`` events are waiting and at least every
+``settings.AUDIT_FLUSH_SECONDS``. On shutdown the queue is drained before the
+worker exits.
+
+Events are recorded once the change they describe is committed, so the trail
+never mentions a change that was rolled back; the price is that events still
+queued when a worker is killed are lost. While the database is unavailable
+batches are retried, keeping at most ``settings.AUDIT_QUEUE_MAX`` events (the
+oldest are dropped, and logged). A batch the database rejects for another
+reason is retried row by row, and the rows that still fail are logged and
+dropped, so one bad event can't hold up the queue.
+
+Strings in ``details`` often come from the request (e.g. the email of a failed
+login), so they are cut to ``settings.AUDIT_MAX_STRING_LENGTH`` when queued.
+
+Without the flush loop (scripts, tests) every event is written straight away.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from core.config import settings
+from core.database import SessionLocal
+from models.orm_models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# The database is unreachable rather than refusing the rows: keep them for the next flush
+UNAVAILABLE_ERRORS = (OperationalError, InterfaceError)
+
+
+def _truncate(value: Any, max_length: int) -> Any:
+    """Cut every string in a details value to max_length characters"""
+    if isinstance(value, str):
+        return value if len(value) <= max_length else value[:max_length] + "..."
+    if isinstance(value, dict):
+        return {_truncate(k, max_length): _truncate(v, max_length) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_truncate(v, max_length) for v in value]
+    return value
+
+
+class AuditLog:
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, max_string_length: int = 1000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_string_length = max_string_length
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        # One batch in flight at a time keeps the events in order
+        self._flush_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.failed_flushes = 0
+
+    def record(
+        self,
+        action: str,
+        entity_type: str,
+        entity_id: Optional[int] = None,
+        actor_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+    ) -> None:
+        """Queue an event, e.g. record("user.delete", "user", 42, actor_id=1)"""
+        if details:
+            details = _truncate(details, self.max_string_length)
+        event = {
+            "occurred_at": datetime.utcnow(),
+            "actor_id": actor_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "ip_address": ip_address[:45] if ip_address else ip_address,
+            "details": json.dumps(details, default=str, separators=(",", ":")) if details else None,
+        }
+        with self._lock:
+            self._queue.append(event)
+            overflow = len(self._queue) - self.max_queue
+            for _ in range(max(overflow, 0)):
+                self._queue.popleft()
+            pending = len(self._queue)
+        if overflow > 0:
+            self.dropped += overflow
+            logger.error("Audit queue full, dropped %d events", overflow)
+
+        loop = self._loop
+        if loop is None:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to write audit events")
+        elif pending >= self.batch_size:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def flush(self) -> int:
+        """Write everything queued in batches, returns the number of events written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                if not batch:
+                    return written
+                try:
+                    self._write(batch)
+                    count = len(batch)
+                except UNAVAILABLE_ERRORS:
+                    # Put the batch back in front, it is retried on the next flush
+                    self._requeue(batch)
+                    self.failed_flushes += 1
+                    raise
+                except Exception:
+                    logger.exception("Audit batch of %d events rejected, writing it row by row", len(batch))
+                    self.failed_flushes += 1
+                    count = self._write_each(batch)
+                written += count
+                self.written += count
+
+    def _requeue(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._queue.extendleft(reversed(events))
+
+    def _write_each(self, batch: List[Dict[str, Any]]) -> int:
+        """Write a rejected batch one event at a time, dropping the events that still fail"""
+        written = 0
+        for index, event in enumerate(batch):
+            try:
+                self._write([event])
+            except UNAVAILABLE_ERRORS:
+                self._requeue(batch[index:])
+                self.written += written
+                raise
+            except Exception:
+                self.rejected += 1
+                logger.exception(
+                    "Dropped audit event %s on %s %s",
+                    event["action"], event["entity_type"], event["entity_id"],
+                )
+            else:
+                written += 1
+        return written
+
+    @staticmethod
+    def _write(batch: List[Dict[str, Any]]) -> None:
+        with SessionLocal() as db:
+            # executemany; PyMySQL sends it as multi-row INSERT statements
+            db.execute(insert(AuditEvent.__table__), batch)
+            db.commit()
+
+    async def run_flush_loop(self) -> None:
+        """Write batches until cancelled, then call drain()"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Failed to write audit events, %d queued", len(self._queue))
+                # Don't let a full queue turn the retries into a busy loop
+                await asyncio.sleep(self.flush_interval)
+
+    async def drain(self) -> None:
+        """Write what is left on shutdown; later events are written straight away"""
+        self._loop = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception:
+            logger.exception("Failed to write %d audit events on shutdown", len(self._queue))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+audit_log = AuditLog(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_SECONDS,
+    max_queue=settings.AUDIT_QUEUE_MAX,
+    max_string_length=settings.AUDIT_MAX_STRING_LENGTH,
+)
@@ -0,0 +1,453 @@
+"""
+Shared cache used by the API for tokens, users and reference data.
+
+Two backends are available, selected through ``settings.CACHE_BACKEND``:
+
+- ``memory``: in-process LRU with per-entry TTL. Fast, but every uvicorn
+  worker holds its own copy.
+- ``redis``: any Redis-protocol server (Redis, KeyDB, Valkey, fakeredis in
+  tests). Values are shared between workers; a short-lived local copy is kept
+  per worker and dropped when another worker publishes an invalidation.
+
+Callers never talk to a backend directly, they ask for a namespace:
+
+    users_cache = get_cache("users")
+    user = users_cache.get_or_load(user_id, lambda: load_user(user_id))
+"""
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with a TTL per entry"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[str, Optional[str]], None]] = []
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+        self.publish_invalidation(key)
+
+    def pop(self, key: str) -> Any:
+        """Remove and return a value atomically (single-use entries)"""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        self.publish_invalidation(key)
+        if entry is _MISSING:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            return _MISSING
+        return value
+
+    def clear(self, prefix: str = "") -> None:
+        with self._lock:
+            if not prefix:
+                self._data.clear()
+            else:
+                for key in [k for k in self._data if k.startswith(prefix)]:
+                    del self._data[key]
+        self.publish_invalidation(None, prefix)
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        # A single process already serializes loads with threading locks
+        return True
+
+    def release_lock(self, key: str) -> None:
+        pass
+
+    def publish_invalidation(self, key: Optional[str], prefix: Optional[str] = None) -> None:
+        for callback in list(self._subscribers):
+            callback(key or "", prefix)
+
+    def subscribe_invalidations(self, callback: Callable[[str, Optional[str]], None]) -> None:
+        self._subscribers.append(callback)
+
+
+class RedisCacheBackend:
+    """
+    Redis-protocol backend shared by all workers.
+
+    A small local LRU sits in front of Redis to save a round trip on hot keys;
+    writes and deletes are broadcast over pub/sub so the other workers evict
+    their local copy.
+    """
+
+    CHANNEL = "forms-anyware:cache:invalidate"
+    RECONNECT_MIN_SECONDS = 0.5
+    RECONNECT_MAX_SECONDS = 30.0
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Any = None,
+        key_prefix: str = "forms-anyware:",
+        local_ttl: float = 5.0,
+        local_max_entries: int = 10000,
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "CACHE_BACKEND=redis requires the 'redis' package (pip install redis)"
+                ) from e
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+
+        self.client = client
+        self.key_prefix = key_prefix
+        self.local_ttl = local_ttl
+        self.local = MemoryCacheBackend(max_entries=local_max_entries) if local_ttl > 0 else None
+        self._subscribers: list[Callable[[str, Optional[str]], None]] = []
+        self._listener: Optional[threading.Thread] = None
+        self._origin = uuid.uuid4().hex
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def get(self, key: str) -> Any:
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not _MISSING:
+                return value
+
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            return _MISSING
+        value = pickle.loads(raw)
+
+        if self.local is not None:
+            self.local.set(key, value, ttl=self.local_ttl)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if ttl:
+            self.client.set(self._key(key), raw, px=int(ttl * 1000))
+        else:
+            self.client.set(self._key(key), raw)
+
+        if self.local is not None:
+            self.local.set(key, value, ttl=min(ttl, self.local_ttl) if ttl else self.local_ttl)
+        # Peers may hold an older local copy of this key
+        self.publish_invalidation(key, notify_local=False)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+        if self.local is not None:
+            self.local.delete(key)
+        self.publish_invalidation(key)
+
+    def pop(self, key: str) -> Any:
+        """Remove and return a value atomically across workers (GETDEL)"""
+        raw = self.client.getdel(self._key(key))
+        if self.local is not None:
+            self.local.delete(key)
+        self.publish_invalidation(key)
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def clear(self, prefix: str = "") -> None:
+        keys = list(self.client.scan_iter(match=f"{self._key(prefix)}*", count=500))
+        if keys:
+            self.client.delete(*keys)
+        if self.local is not None:
+            self.local.clear(prefix)
+        self.publish_invalidation(None, prefix)
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        """Cross-worker single-flight lock (SET NX with expiry)"""
+        return bool(self.client.set(self._key(f"lock:{key}"), b"1", nx=True, px=int(ttl * 1000)))
+
+    def release_lock(self, key: str) -> None:
+        self.client.delete(self._key(f"lock:{key}"))
+
+    def publish_invalidation(
+        self, key: Optional[str], prefix: Optional[str] = None, notify_local: bool = True
+    ) -> None:
+        # Messages look like "<origin>|k|<key>" or "<origin>|p|<prefix>"
+        if prefix is not None:
+            message = f"{self._origin}|p|{prefix}"
+        else:
+            message = f"{self._origin}|k|{key}"
+        try:
+            self.client.publish(self.CHANNEL, message)
+        except Exception:
+            logger.exception("Failed to publish cache invalidation")
+
+        if not notify_local:
+            return
+        # Our own messages are skipped by the listener, notify local subscribers here
+        for callback in list(self._subscribers):
+            callback(key or "", prefix)
+
+    def subscribe_invalidations(self, callback: Callable[[str, Optional[str]], None]) -> None:
+        self._subscribers.append(callback)
+        self._start_listener()
+
+    def _start_listener(self) -> None:
+        if self._listener is not None:
+            return
+        self._listener = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        """Relay peer invalidations to local subscribers, reconnecting when Redis goes away"""
+        delay = self.RECONNECT_MIN_SECONDS
+        connected_before = False
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                if connected_before:
+                    # Invalidations sent while we were away are lost: drop everything local
+                    logger.info("Cache invalidation listener reconnected")
+                    self._dispatch("", "")
+                connected_before = True
+                delay = self.RECONNECT_MIN_SECONDS
+                for message in pubsub.listen():
+                    self._handle_message(message.get("data"))
+            except Exception:
+                logger.exception("Cache invalidation listener lost its connection, retrying in %.1fs", delay)
+            time.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_SECONDS)
+
+    def _handle_message(self, data: Any) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        if not isinstance(data, str):
+            return
+        origin, kind, value = (data.split("|", 2) + ["", ""])[:3]
+        if origin == self._origin:
+            return
+        if kind == "p":
+            self._dispatch("", value)
+        else:
+            self._dispatch(value, None)
+
+    def _dispatch(self, key: str, prefix: Optional[str]) -> None:
+        if self.local is not None:
+            if prefix is not None:
+                self.local.clear(prefix)
+            else:
+                self.local.delete(key)
+        for callback in list(self._subscribers):
+            try:
+                callback(key, prefix)
+            except Exception:
+                logger.exception("Cache invalidation callback failed")
+
+
+class CacheNamespace:
+    """
+    A named slice of the cache with its own hit/miss counters.
+
+    ``get_or_load`` provides stampede protection: concurrent misses on the
+    same key in a worker wait for a single loader call, and with the Redis
+    backend other workers wait on a short-lived lock instead of recomputing.
+    """
+
+    def __init__(self, name: str, backend: Any, default_ttl: Optional[float] = None):
+        self.name = name
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_errors = 0
+        self._stats_lock = threading.Lock()
+        # full key -> [lock, number of threads using it]
+        self._inflight: Dict[str, list] = {}
+        self._inflight_lock = threading.Lock()
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.name}:{key}"
+
+    def _count(self, attr: str) -> None:
+        with self._stats_lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.backend.get(self._key(key))
+        if value is _MISSING:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.backend.set(self._key(key), value, ttl=ttl if ttl is not None else self.default_ttl)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key here and in every other worker"""
+        self.backend.delete(self._key(key))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value; of concurrent callers only one gets it"""
+        value = self.backend.pop(self._key(key))
+        return default if value is _MISSING else value
+
+    def clear(self) -> None:
+        self.backend.clear(f"{self.name}:")
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        full_key = self._key(key)
+        value = self.backend.get(full_key)
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+        self._count("misses")
+
+        with self._inflight_lock:
+            entry = self._inflight.setdefault(full_key, [threading.Lock(), 0])
+            entry[1] += 1
+        key_lock = entry[0]
+
+        with key_lock:
+            try:
+                # Another thread may have loaded it while we waited
+                value = self.backend.get(full_key)
+                if value is not _MISSING:
+                    return value
+
+                lock_ttl = settings.CACHE_LOAD_LOCK_SECONDS
+                deadline = time.monotonic() + lock_ttl
+                locked = self.backend.acquire_lock(full_key, lock_ttl)
+                while not locked:
+                    # Another worker is loading; wait for its result
+                    time.sleep(0.01)
+                    value = self.backend.get(full_key)
+                    if value is not _MISSING:
+                        return value
+                    if time.monotonic() > deadline:
+                        break
+                    locked = self.backend.acquire_lock(full_key, lock_ttl)
+
+                try:
+                    self._count("loads")
+                    value = loader()
+                except Exception:
+                    self._count("load_errors")
+                    raise
+                finally:
+                    if locked:
+                        self.backend.release_lock(full_key)
+
+                self.set(key, value, ttl=ttl)
+                return value
+            finally:
+                # Only forget the lock once no other thread is waiting on it,
+                # or a newcomer would create a fresh one and load concurrently
+                with self._inflight_lock:
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        del self._inflight[full_key]
+
+    def on_invalidate(self, callback: Callable[[str], None]) -> None:
+        """Call ``callback(key)`` whenever a key of this namespace is invalidated anywhere"""
+        prefix = f"{self.name}:"
+
+        def handler(key: str, cleared_prefix: Optional[str]) -> None:
+            if cleared_prefix is not None:
+                if prefix.startswith(cleared_prefix) or cleared_prefix.startswith(prefix):
+                    callback("")
+            elif key.startswith(prefix):
+                callback(key[len(prefix):])
+
+        self.backend.subscribe_invalidations(handler)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def create_backend() -> Any:
+    """Build the backend configured in settings"""
+    backend = settings.CACHE_BACKEND.lower()
+    if backend == "memory":
+        return MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    if backend == "redis":
+        return RedisCacheBackend(
+            url=settings.CACHE_URL,
+            local_ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+            local_max_entries=settings.CACHE_MAX_ENTRIES,
+        )
+    raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+
+
+_backend: Any = None
+_namespaces: Dict[str, CacheNamespace] = {}
+_registry_lock = threading.Lock()
+
+
+def get_backend() -> Any:
+    global _backend
+    if _backend is None:
+        with _registry_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend: Any) -> None:
+    """Replace the process-wide backend (e.g. with a fakeredis client in tests)"""
+    global _backend
+    with _registry_lock:
+        _backend = backend
+        for namespace in _namespaces.values():
+            namespace.backend = backend
+
+
+def get_cache(namespace: str, default_ttl: Optional[float] = None) -> CacheNamespace:
+    """Get (or create) a cache namespace on the shared backend"""
+    cache = _namespaces.get(namespace)
+    if cache is None:
+        backend = get_backend()
+        with _registry_lock:
+            cache = _namespaces.setdefault(namespace, CacheNamespace(namespace, backend, default_ttl))
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss statistics for every namespace in this worker"""
+    return {name: ns.stats() for name, ns in _namespaces.items()}
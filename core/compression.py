@@ -0,0 +1,225 @@
+"""
+Response compression.
+
+Bodies are compressed with Brotli when the client accepts it and the
+``brotli`` package is installed, otherwise with gzip. Small bodies are sent
+as they are, since compressing them costs more than it saves.
+
+Streaming responses (CSV exports) are compressed chunk by chunk and flushed
+after every chunk, so the client keeps receiving data as it is produced.
+Server-Sent Events and formats that are already compressed are passed
+through untouched.
+
+Compressed bodies of responses marked publicly cacheable (``Cache-Control:
+public`` or ``max-age``) are kept in a small LRU of their own in each worker,
+keyed by a digest of the uncompressed body, so hot reference payloads are
+compressed once. The LRU is in-process on purpose: lookups run on the event
+loop and must not wait on Redis or on another worker's load lock.
+"""
+import hashlib
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.cache import _MISSING, MemoryCacheBackend
+from core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types that are already compressed or must not be buffered
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "audio/",
+    "video/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/vnd.openxmlformats-officedocument",
+)
+
+_compressed_bodies = MemoryCacheBackend(max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES)
+
+
+class Compressor:
+    """Incremental compressor for one response body"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16 + MAX_WBITS writes a gzip header and trailer
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so it can be decoded on arrival"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick br or gzip from an Accept-Encoding header. A coding listed with q=0
+    is refused even when ``*`` is accepted; ``*`` only stands for the
+    codings the header doesn't name.
+    """
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        qualities[name] = q
+
+    def accepted(coding: str) -> bool:
+        if coding in qualities:
+            return qualities[coding] > 0
+        return qualities.get("*", 0) > 0
+
+    if brotli is not None and qualities.get("br", 0) > 0:
+        return "br"
+    if accepted("gzip"):
+        return "gzip"
+    return None
+
+
+def is_cacheable(headers: Headers) -> bool:
+    cache_control = headers.get("cache-control", "").lower()
+    if any(directive in cache_control for directive in ("no-store", "no-cache", "private")):
+        return False
+    return "public" in cache_control or "max-age" in cache_control
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_compressed: bool = True,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_compressed = cache_compressed
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+    def compress_body(self, body: bytes, encoding: str, cacheable: bool) -> bytes:
+        def compress() -> bytes:
+            return Compressor(encoding, self.gzip_level, self.brotli_quality).finish(body)
+
+        if not (cacheable and self.cache_compressed):
+            return compress()
+        key = f"{encoding}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+        compressed = _compressed_bodies.get(key)
+        if compressed is _MISSING:
+            compressed = compress()
+            _compressed_bodies.set(key, compressed, ttl=settings.COMPRESSION_CACHE_TTL_SECONDS)
+        return compressed
+
+
+class _CompressionResponder:
+    """Wraps ``send`` for one response, deciding on the first body message"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk tells us what to do
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        if self.compressor is not None:
+            await self._send_chunk(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        content_type = headers.get("content-type", "")
+        if "content-encoding" in headers or content_type.startswith(EXCLUDED_CONTENT_TYPES):
+            await self._pass_through(message)
+            return
+
+        if more_body:
+            # Streaming: compress as it goes, the final length is unknown
+            self.compressor = Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            self._set_encoding_headers(headers)
+            del headers["content-length"]
+            await self.send(self.start_message)
+            await self._send_chunk(message)
+            return
+
+        if len(body) < self.middleware.minimum_size:
+            await self._pass_through(message)
+            return
+
+        compressed = self.middleware.compress_body(body, self.encoding, is_cacheable(headers))
+        if len(compressed) >= len(body):
+            await self._pass_through(message)
+            return
+        self._set_encoding_headers(headers)
+        headers["content-length"] = str(len(compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def _pass_through(self, message: Message) -> None:
+        self.passthrough = True
+        await self.send(self.start_message)
+        await self.send(message)
+
+    async def _send_chunk(self, message: Message) -> None:
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            data = self.compressor.compress(body) if body else b""
+            if data:
+                await self.send({"type": "http.response.body", "body": data, "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.compressor.finish(body)})
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
@@ -1,8 +1,20 @@
-from sqlalchemy import create_engine
+import asyncio
+import hashlib
+import itertools
+import logging
+import threading
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from core.cache import get_cache
 from core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Create engine for database connection
 engine = create_engine(settings.DATABASE_URL)
 
@@ -12,10 +24,94 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for ORM models
 Base = declarative_base()
 
+class ReplicaRouter:
+    """
+    Round-robin over the read replicas that passed their last health check,
+    falling back to the primary when none is available. Replicas join the
+    rotation only after their first successful check.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self.healthy: List[Engine] = []
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    def pick(self) -> Engine:
+        with self._lock:
+            if self._cycle is None:
+                return engine
+            return next(self._cycle)
+
+    def check_health(self) -> None:
+        healthy = []
+        for replica in self.engines:
+            try:
+                with replica.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                healthy.append(replica)
+            except Exception:
+                logger.warning("Read replica %s failed its health check", replica.url.host)
+        with self._lock:
+            if healthy != self.healthy:
+                self.healthy = healthy
+                self._cycle = itertools.cycle(healthy) if healthy else None
+
+    async def run_health_check_loop(self) -> None:
+        if not self.engines:
+            return
+        if settings.CACHE_BACKEND == "memory":
+            logger.warning(
+                "Read replicas are configured with the memory cache backend: a client is only "
+                "pinned to the primary after a write on the worker that handled the write; "
+                "use CACHE_BACKEND=redis when running several workers"
+            )
+        while True:
+            try:
+                await asyncio.to_thread(self.check_health)
+            except Exception:
+                logger.exception("Read replica health check failed")
+            await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+replica_router = ReplicaRouter(settings.replica_urls)
+
+# Clients that wrote recently. Only shared between workers with the Redis cache
+# backend; with the memory backend each worker pins its own clients.
+_primary_pins = get_cache("primary_pin", default_ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+@event.listens_for(Session, "after_commit")
+def _mark_session_wrote(session: Session) -> None:
+    session.info["wrote"] = True
+
+def _client_key(request: Request) -> Optional[str]:
+    """Identify the client by its bearer token, without decoding it"""
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
 # Dependency to get DB session
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        # Send the client's next reads to the primary so it sees its own writes
+        if db.info.get("wrote") and replica_router.engines:
+            client_key = _client_key(request)
+            if client_key:
+                _primary_pins.set(client_key, True)
+        db.close()
+
+# Dependency to get a DB session for read-only endpoints
+def get_read_db(request: Request):
+    pinned = request.headers.get("x-consistency", "").lower() == "strong"
+    if not pinned and replica_router.engines:
+        client_key = _client_key(request)
+        pinned = bool(client_key and _primary_pins.get(client_key))
+
+    db = SessionLocal() if pinned else SessionLocal(bind=replica_router.pick())
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,160 @@
+"""
+Request deadlines.
+
+Every request gets a deadline (``settings.REQUEST_TIMEOUT_SECONDS``, or a
+per-route value set with the ``request_deadline`` dependency). If the handler
+hasn't started its response by then it is cancelled and the client gets a
+504. Sync handlers running in the threadpool can't be interrupted, so the
+deadline also follows them into SQL:
+
+- on MySQL every SELECT carries a ``MAX_EXECUTION_TIME`` hint with the time
+  left, so the server aborts a slow query instead of holding the connection;
+- on any database, a statement issued after the deadline raises
+  ``DeadlineExceeded`` before reaching the server, which unwinds the handler.
+
+Once a response has started (streamed exports, SSE, background tasks) the
+deadline no longer applies.
+"""
+import asyncio
+import contextvars
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# MySQL ER_QUERY_TIMEOUT: statement aborted by max_execution_time
+MYSQL_QUERY_TIMEOUT = 3024
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    def __init__(self, timeout: Optional[float]):
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + timeout if timeout else None
+        self.responded = False
+        self.timed_out = False
+
+    def set_timeout(self, timeout: Optional[float]) -> None:
+        """Replace the timeout, counted from the start of the request"""
+        self.expires_at = self.started_at + timeout if timeout else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, None when no deadline applies"""
+        if self.expires_at is None or self.responded:
+            return None
+        return self.expires_at - time.monotonic()
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+def request_deadline(seconds: Optional[float]):
+    """
+    Dependency overriding the request deadline of a route, None for no deadline:
+
+        @router.get("/export", dependencies=[Depends(request_deadline(300))])
+    """
+    async def apply() -> None:
+        # Async so it runs in the request's own context, which the deadline middleware watches
+        deadline = _current_deadline.get()
+        if deadline is not None:
+            deadline.set_timeout(seconds)
+
+    return apply
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    if isinstance(exc, DeadlineExceeded):
+        return True
+    if isinstance(exc, OperationalError):
+        args = getattr(exc.orig, "args", ())
+        return bool(args) and args[0] == MYSQL_QUERY_TIMEOUT
+    return False
+
+
+@event.listens_for(Engine, "before_cursor_execute", retval=True)
+def _apply_deadline(conn, cursor, statement, parameters, context, executemany):
+    deadline = _current_deadline.get()
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is None:
+        return statement, parameters
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded before running the statement")
+    if conn.dialect.name == "mysql":
+        stripped = statement.lstrip()
+        if stripped[:6].upper() == "SELECT":
+            hint = f"SELECT /*+ MAX_EXECUTION_TIME({max(1, int(remaining * 1000))}) */"
+            statement = hint + stripped[6:]
+    return statement, parameters
+
+
+class DeadlineMiddleware:
+    def __init__(self, app: ASGIApp, timeout: Optional[float] = 30.0):
+        self.app = app
+        self.timeout = timeout if timeout and timeout > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline = Deadline(self.timeout)
+
+        async def guarded_send(message: Message) -> None:
+            if deadline.timed_out:
+                # The client already got its 504
+                return
+            if message["type"] == "http.response.start":
+                deadline.responded = True
+            await send(message)
+
+        token = _current_deadline.set(deadline)
+        try:
+            # The task copies the current context, deadline included
+            task = asyncio.ensure_future(self.app(scope, receive, guarded_send))
+        finally:
+            _current_deadline.reset(token)
+
+        try:
+            while True:
+                remaining = deadline.remaining()
+                try:
+                    await asyncio.wait_for(asyncio.shield(task), None if remaining is None else max(remaining, 0))
+                    return
+                except asyncio.TimeoutError:
+                    # A route may have extended its deadline meanwhile
+                    if deadline.remaining() is None or deadline.remaining() > 0:
+                        continue
+                    task.cancel()
+                    await self._timed_out(deadline, scope, receive, send)
+                    break
+                except Exception as exc:
+                    if deadline.responded or not is_timeout_error(exc):
+                        raise
+                    await self._timed_out(deadline, scope, receive, send)
+                    return
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        # Let the handler unwind; a sync handler keeps its thread until its
+        # current statement returns, which the SQL deadline keeps short
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    @staticmethod
+    async def _timed_out(deadline: Deadline, scope: Scope, receive: Receive, send: Send) -> None:
+        deadline.timed_out = True
+        response = JSONResponse({"detail": "Request timed out"}, status_code=504)
+        await response(scope, receive, send)
@@ -0,0 +1,194 @@
+"""
+Event broker behind the ``/events/stream`` push channel.
+
+Events are published to topics (``user:<id>``, ``requisition:<id>``,
+``department:<id>:role:<id>``) from any thread, typically a sync request
+handler in the threadpool, and delivered to the asyncio queues of the
+connections subscribed to those topics.
+
+With the memory cache backend events only reach connections held by this
+worker. With the Redis backend every publish goes through Redis pub/sub, so
+a decision taken in one worker reaches clients connected to any worker.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.cache import RedisCacheBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, topics: Iterable[str], loop: asyncio.AbstractEventLoop):
+        self.topics = set(topics)
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Runs on the subscriber's loop; drops the oldest event for slow clients"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._redis = None
+
+    # Subscribers
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(topics, asyncio.get_running_loop())
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[topic]
+
+    async def next_event(self, subscription: Subscription, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next event, None on timeout (time for a heartbeat)"""
+        try:
+            event = await asyncio.wait_for(subscription.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        latency = time.time() - event.get("published_at", time.time())
+        with self._lock:
+            self.delivered += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+        return event
+
+    # Publishers
+
+    def publish(self, topics: Iterable[str], event: Dict[str, Any]) -> None:
+        """Publish from any thread; never raises, push is best effort"""
+        event = dict(event, published_at=time.time())
+        topics = list(topics)
+        with self._lock:
+            self.published += 1
+        try:
+            if self._redis is not None:
+                self._redis.publish(RedisEventBackend.CHANNEL, json.dumps({"topics": topics, "event": event}, default=str))
+            else:
+                self.dispatch(topics, event)
+        except Exception:
+            logger.exception("Failed to publish event")
+
+    def dispatch(self, topics: List[str], event: Dict[str, Any]) -> None:
+        """Hand an event to the local subscribers of the topics, each once"""
+        with self._lock:
+            targets = set()
+            for topic in topics:
+                targets.update(self._subscriptions.get(topic, ()))
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The connection's loop is closed, it will unsubscribe itself
+                pass
+
+    # Multi-worker fan-out
+
+    def use_redis(self, client) -> None:
+        self._redis = client
+        RedisEventBackend(client, self).start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            connections = len({s for subs in self._subscriptions.values() for s in subs})
+            return {
+                "connections": connections,
+                "topics": len(self._subscriptions),
+                "published": self.published,
+                "delivered": self.delivered,
+                "avg_fanout_latency_ms": round(self._latency_total / self.delivered * 1000, 3) if self.delivered else 0.0,
+                "max_fanout_latency_ms": round(self._latency_max * 1000, 3),
+            }
+
+
+class RedisEventBackend:
+    """Relays events published by any worker to this worker's subscribers"""
+
+    CHANNEL = "forms-anyware:events"
+    RECONNECT_MIN_SECONDS = 0.5
+    RECONNECT_MAX_SECONDS = 30.0
+
+    def __init__(self, client, broker: EventBroker):
+        self.client = client
+        self.broker = broker
+        self._listener: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._listener = threading.Thread(target=self._listen, name="event-relay", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        """Relay events to local subscribers, reconnecting when Redis goes away"""
+        delay = self.RECONNECT_MIN_SECONDS
+        connected_before = False
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                if connected_before:
+                    # Events published while we were away are lost, push is best effort
+                    logger.info("Event relay reconnected")
+                connected_before = True
+                delay = self.RECONNECT_MIN_SECONDS
+                for message in pubsub.listen():
+                    self._handle_message(message)
+            except Exception:
+                logger.exception("Event relay lost its connection, retrying in %.1fs", delay)
+            time.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_SECONDS)
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        try:
+            payload = json.loads(message["data"])
+            self.broker.dispatch(payload["topics"], payload["event"])
+        except Exception:
+            logger.exception("Invalid event message")
+
+
+broker = EventBroker()
+
+
+def setup_broker() -> None:
+    """Share events between workers when the cache runs on Redis"""
+    backend = get_backend()
+    if isinstance(backend, RedisCacheBackend):
+        broker.use_redis(backend.client)
+
+
+def user_topic(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def requisition_topic(requisition_id: int) -> str:
+    return f"requisition:{requisition_id}"
+
+
+def approver_topic(department_id: int, role_id: int) -> str:
+    return f"department:{department_id}:role:{role_id}"
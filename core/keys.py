@@ -0,0 +1,129 @@
+"""
+JWT signing keys.
+
+All token encoding and decoding goes through the process-wide ``KeyRing`` so
+key material is parsed once at startup instead of on every call.
+
+- ``HS*`` algorithms use ``settings.get_jwt_key`` (shared secret, no JWKS).
+- ``RS*``/``ES*`` algorithms load every ``*.pem`` file in
+  ``settings.JWT_KEYS_DIR``; the file name (without extension) is the ``kid``.
+  The key named by ``settings.JWT_ACTIVE_KID`` (or the last private key in
+  name order) signs new tokens, the others only verify, which allows rotating
+  keys without invalidating tokens already issued. Public keys are published
+  at ``/.well-known/jwks.json`` so other services can verify tokens locally.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+from jose.constants import ALGORITHMS
+
+from core.config import settings
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: Optional[str]
+    algorithm: str
+    verify_key: Key
+    sign_key: Optional[Key] = None
+
+    def to_jwk(self) -> Dict[str, Any]:
+        data = self.verify_key.to_dict()
+        data.update({"kid": self.kid, "use": "sig", "alg": self.algorithm})
+        return data
+
+
+class KeyRing:
+    def __init__(self, keys: List[SigningKey], active_kid: Optional[str]):
+        self._keys = {key.kid: key for key in keys}
+        if active_kid not in self._keys or self._keys[active_kid].sign_key is None:
+            raise ValueError(f"No private signing key for kid {active_kid!r}")
+        self.active = self._keys[active_kid]
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.active.algorithm not in ALGORITHMS.HMAC
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        headers = {"kid": self.active.kid} if self.active.kid else None
+        return jwt.encode(claims, self.active.sign_key, algorithm=self.active.algorithm, headers=headers)
+
+    def decode(self, token: str, **kwargs) -> Dict[str, Any]:
+        """Verify and decode a token with the key named in its ``kid`` header"""
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(token, key.verify_key, algorithms=[key.algorithm], **kwargs)
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Public keys in JWK Set format (empty for shared-secret algorithms)"""
+        if not self.is_asymmetric:
+            return {"keys": []}
+        return {"keys": [key.to_jwk() for key in self._keys.values()]}
+
+
+def load_key_ring() -> KeyRing:
+    algorithm = settings.ALGORITHM
+
+    if algorithm in ALGORITHMS.HMAC:
+        key = jwk.construct(settings.get_jwt_key, algorithm)
+        return KeyRing([SigningKey(None, algorithm, key, key)], None)
+
+    if algorithm not in ALGORITHMS.RSA_DS and algorithm not in ALGORITHMS.EC_DS:
+        raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+
+    keys = []
+    for filename in sorted(os.listdir(settings.JWT_KEYS_DIR)):
+        if not filename.endswith(".pem"):
+            continue
+        with open(os.path.join(settings.JWT_KEYS_DIR, filename)) as f:
+            pem = f.read()
+        kid = filename[: -len(".pem")]
+        key = jwk.construct(pem, algorithm)
+        if "PRIVATE KEY" in pem:
+            keys.append(SigningKey(kid, algorithm, key.public_key(), key))
+        else:
+            keys.append(SigningKey(kid, algorithm, key))
+
+    active_kid = settings.JWT_ACTIVE_KID
+    if active_kid is None:
+        private = [key.kid for key in keys if key.sign_key is not None]
+        if not private:
+            raise ValueError(f"No private key found in {settings.JWT_KEYS_DIR}")
+        active_kid = private[-1]
+
+    return KeyRing(keys, active_kid)
+
+
+_key_ring: Optional[KeyRing] = None
+_key_ring_lock = threading.Lock()
+
+
+def get_key_ring() -> KeyRing:
+    global _key_ring
+    if _key_ring is None:
+        with _key_ring_lock:
+            if _key_ring is None:
+                _key_ring = load_key_ring()
+    return _key_ring
+
+
+def reload_key_ring() -> KeyRing:
+    """Re-read the keys, e.g. after dropping a new key file in place"""
+    global _key_ring
+    with _key_ring_lock:
+        _key_ring = load_key_ring()
+    return _key_ring
+
+
+def encode_token(claims: Dict[str, Any]) -> str:
+    return get_key_ring().encode(claims)
+
+
+def decode_token(token: str, **kwargs) -> Dict[str, Any]:
+    return get_key_ring().decode(token, **kwargs)
@@ -0,0 +1,183 @@
+"""
+Adaptive concurrency limit with load shedding.
+
+Each worker admits at most ``limit`` requests at a time. Extra requests wait
+in a short queue and get a 503 (with ``Retry-After``) if no slot frees up
+within ``settings.LOAD_SHED_MAX_QUEUE_MS``, so an overloaded worker fails
+fast instead of letting latency grow without bound.
+
+The limit adapts like Netflix's Gradient2: it is scaled by the ratio between
+the long-term and the recent average latency (arrival to first response
+byte, queueing included). While latency holds steady the limit grows by
+``sqrt(limit)`` per window; when requests start queueing and latency rises,
+the ratio drops below 1 and the limit shrinks.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+# Latency samples per limit update
+WINDOW_SIZE = 32
+# Weight of a new window in the long-term latency average
+LONG_TERM_WEIGHT = 0.05
+# Weight of a new estimate in the limit
+SMOOTHING = 0.2
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int, max_queue_wait: float):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue_wait = max_queue_wait
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._window: List[float] = []
+        self._long_latency: Optional[float] = None
+        self._short_latency: Optional[float] = None
+        self.accepted = 0
+        self.queued = 0
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting briefly if none is free; False means shed the request"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.accepted += 1
+            return True
+        if len(self._waiters) >= int(self.limit):
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(waiter, self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the request was cancelled
+                self._hand_over()
+            raise
+        finally:
+            if waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self.accepted += 1
+        return True
+
+    def release(self, latency: float) -> None:
+        self._record(latency)
+        self._hand_over()
+
+    def _hand_over(self) -> None:
+        """Pass a freed slot to the oldest waiter, or give it back"""
+        if self.in_flight <= int(self.limit):
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    return
+        self.in_flight -= 1
+
+    def _record(self, latency: float) -> None:
+        self._window.append(latency)
+        if len(self._window) < WINDOW_SIZE:
+            return
+        short = sum(self._window) / len(self._window)
+        self._window.clear()
+        self._short_latency = short
+
+        if self._long_latency is None:
+            self._long_latency = short
+        else:
+            self._long_latency = self._long_latency * (1 - LONG_TERM_WEIGHT) + short * LONG_TERM_WEIGHT
+        # Recover quickly after an overload instead of dragging the old average along
+        if self._long_latency / short > 2:
+            self._long_latency *= 0.9
+
+        gradient = max(0.5, min(1.0, self._long_latency / short))
+        # Only grow when the limit is actually being used
+        headroom = math.sqrt(self.limit) if self.in_flight >= self.limit / 2 else 0.0
+        estimate = self.limit * gradient + headroom
+        self.limit = max(self.min_limit, min(self.max_limit, self.limit * (1 - SMOOTHING) + estimate * SMOOTHING))
+
+    def stats(self) -> Dict[str, Any]:
+        recent = self._short_latency
+        if recent is None and self._window:
+            recent = sum(self._window) / len(self._window)
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued_now": len(self._waiters),
+            "accepted": self.accepted,
+            "queued": self.queued,
+            "shed": self.shed,
+            # Average of the last full window; until WINDOW_SIZE requests have
+            # completed, of the ones so far (None before the first)
+            "recent_latency_ms": round(recent * 1000, 3) if recent is not None else None,
+            "recent_latency_samples": len(self._window) if self._short_latency is None else WINDOW_SIZE,
+            "long_term_latency_ms": round(self._long_latency * 1000, 3) if self._long_latency is not None else None,
+        }
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app: ASGIApp, limiter: AdaptiveConcurrencyLimiter, exempt_paths: Iterable[str] = ()):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.monotonic()
+        if not await self.limiter.acquire():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.limiter.release(time.monotonic() - arrived)
+
+        async def send_and_release(message: Message) -> None:
+            # Streams (exports, SSE) give their slot back once the response starts
+            if message["type"] == "http.response.start":
+                release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            release()
+
+
+concurrency_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=settings.CONCURRENCY_LIMIT_INITIAL,
+    min_limit=settings.CONCURRENCY_LIMIT_MIN,
+    max_limit=settings.CONCURRENCY_LIMIT_MAX,
+    max_queue_wait=settings.LOAD_SHED_MAX_QUEUE_MS / 1000,
+)
@@ -0,0 +1,225 @@
+"""
+In-memory index of who holds which role in which department.
+
+Approval checks ask two questions over and over: "which (department, role)
+pairs does this user hold?" and "who holds this role in this department?".
+Both are answered from ``departments_users_roles`` (minus soft-deleted users
+and departments), which is small and rarely changes, so each worker keeps it
+in two dictionaries instead of joining the tables for every approval step.
+
+The index is kept current incrementally: committing a session that changed a
+membership, a user's ``deleted_at`` or a department's ``deleted_at`` reloads
+the affected users in every worker (through the cache invalidation channel).
+Bulk SQL updates bypass the ORM, so a periodic full rebuild
+(``settings.ORG_INDEX_REFRESH_SECONDS``) catches anything missed.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from core.cache import get_cache
+from core.config import settings
+from core.database import SessionLocal
+from models.orm_models import Department, DepartmentUserRole, User
+
+logger = logging.getLogger(__name__)
+
+# Only used for its cross-worker invalidation messages: key = user id,
+# a cleared namespace = full rebuild
+_invalidations = get_cache("org_index")
+
+
+class OrgIndex:
+    def __init__(self):
+        # department_id -> role_id -> user ids
+        self._by_department: Dict[int, Dict[int, FrozenSet[int]]] = {}
+        # user_id -> (department_id, role_id) pairs
+        self._by_user: Dict[int, FrozenSet[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.built_at: Optional[float] = None
+        self.full_loads = 0
+        self.user_reloads = 0
+
+    # Loading
+
+    @staticmethod
+    def _memberships_query(user_ids: Optional[Iterable[int]] = None):
+        query = (
+            select(DepartmentUserRole.user_id, DepartmentUserRole.department_id, DepartmentUserRole.role_id)
+            .join(User, User.id == DepartmentUserRole.user_id)
+            .join(Department, Department.id == DepartmentUserRole.department_id)
+            .where(User.deleted_at.is_(None), Department.deleted_at.is_(None))
+        )
+        if user_ids is not None:
+            query = query.where(DepartmentUserRole.user_id.in_(list(user_ids)))
+        return query
+
+    def _run(self, fn, db: Optional[Session]):
+        if db is not None:
+            return fn(db)
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """Rebuild the whole index, returns the number of memberships"""
+        rows = self._run(lambda s: s.execute(self._memberships_query()).all(), db)
+
+        by_user: Dict[int, Set[Tuple[int, int]]] = {}
+        for user_id, department_id, role_id in rows:
+            by_user.setdefault(user_id, set()).add((department_id, role_id))
+
+        with self._lock:
+            self._by_user = {user_id: frozenset(pairs) for user_id, pairs in by_user.items()}
+            self._by_department = self._invert(self._by_user)
+            self._loaded = True
+            self.built_at = time.time()
+            self.full_loads += 1
+        return len(rows)
+
+    def reload_users(self, user_ids: Iterable[int], db: Optional[Session] = None) -> None:
+        """Re-read the memberships of a few users and patch the index"""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        rows = self._run(lambda s: s.execute(self._memberships_query(user_ids)).all(), db)
+
+        fresh: Dict[int, Set[Tuple[int, int]]] = {user_id: set() for user_id in user_ids}
+        for user_id, department_id, role_id in rows:
+            fresh[user_id].add((department_id, role_id))
+
+        with self._lock:
+            for user_id, pairs in fresh.items():
+                old = self._by_user.get(user_id, frozenset())
+                for department_id, role_id in old - pairs:
+                    self._set_holders(department_id, role_id, self.holders(department_id, role_id) - {user_id})
+                for department_id, role_id in pairs - old:
+                    self._set_holders(department_id, role_id, self.holders(department_id, role_id) | {user_id})
+                if pairs:
+                    self._by_user[user_id] = frozenset(pairs)
+                else:
+                    self._by_user.pop(user_id, None)
+            self.user_reloads += len(fresh)
+
+    def ensure_loaded(self, db: Optional[Session] = None) -> None:
+        """Build the index on first use when the startup load hasn't run (scripts, tests)"""
+        if not self._loaded:
+            self.load(db)
+
+    async def run_refresh_loop(self) -> None:
+        """Build the index now, then rebuild it periodically until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self.load)
+            except Exception:
+                logger.exception("Failed to build the org hierarchy index")
+            await asyncio.sleep(settings.ORG_INDEX_REFRESH_SECONDS)
+
+    # Lookups
+
+    def roles_of(self, user_id: int) -> FrozenSet[Tuple[int, int]]:
+        """(department_id, role_id) pairs the user holds"""
+        return self._by_user.get(user_id, frozenset())
+
+    def holders(self, department_id: int, role_id: int) -> FrozenSet[int]:
+        """Ids of the users holding a role in a department"""
+        return self._by_department.get(department_id, {}).get(role_id, frozenset())
+
+    def can_approve(self, user_id: int, department_id: int, role_id: int) -> bool:
+        return (department_id, role_id) in self._by_user.get(user_id, frozenset())
+
+    def resolve(self, steps: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], FrozenSet[int]]:
+        """Holders of many (department_id, role_id) pairs at once"""
+        return {step: self.holders(*step) for step in steps}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._by_user),
+            "departments": len(self._by_department),
+            "memberships": sum(len(pairs) for pairs in self._by_user.values()),
+            "built_at": self.built_at,
+            "full_loads": self.full_loads,
+            "user_reloads": self.user_reloads,
+        }
+
+    # Internals, called with the lock held
+
+    def _set_holders(self, department_id: int, role_id: int, users: FrozenSet[int]) -> None:
+        roles = self._by_department.setdefault(department_id, {})
+        if users:
+            roles[role_id] = users
+        else:
+            roles.pop(role_id, None)
+            if not roles:
+                self._by_department.pop(department_id, None)
+
+    @staticmethod
+    def _invert(by_user: Dict[int, FrozenSet[Tuple[int, int]]]) -> Dict[int, Dict[int, FrozenSet[int]]]:
+        by_department: Dict[int, Dict[int, Set[int]]] = {}
+        for user_id, pairs in by_user.items():
+            for department_id, role_id in pairs:
+                by_department.setdefault(department_id, {}).setdefault(role_id, set()).add(user_id)
+        return {
+            department_id: {role_id: frozenset(users) for role_id, users in roles.items()}
+            for department_id, roles in by_department.items()
+        }
+
+
+org_index = OrgIndex()
+
+
+def _on_invalidate(key: str) -> None:
+    if not org_index._loaded:
+        return
+    try:
+        if key:
+            org_index.reload_users([int(key)])
+        else:
+            org_index.load()
+    except Exception:
+        logger.exception("Failed to refresh the org hierarchy index")
+
+
+_invalidations.on_invalidate(_on_invalidate)
+
+
+# Keep the index in step with ORM writes
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    user_ids = session.info.setdefault("org_index_users", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, DepartmentUserRole):
+            history = inspect(obj).attrs.user_id.history
+            user_ids.update(uid for uid in (history.deleted or ()) if uid is not None)
+            if obj.user_id is not None:
+                user_ids.add(obj.user_id)
+        elif isinstance(obj, User) and inspect(obj).attrs.deleted_at.history.has_changes():
+            user_ids.add(obj.id)
+        elif isinstance(obj, Department) and inspect(obj).attrs.deleted_at.history.has_changes():
+            session.info["org_index_full"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    user_ids = session.info.pop("org_index_users", None)
+    full = session.info.pop("org_index_full", False)
+    if full:
+        _invalidations.clear()
+    elif user_ids:
+        for user_id in user_ids:
+            _invalidations.delete(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop("org_index_users", None)
+    session.info.pop("org_index_full", False)
@@ -0,0 +1,301 @@
+"""
+Per-request profiling for admins.
+
+An admin adds ``X-Profile: 1`` (or ``?_profile=1``) to any request. While it
+runs, a sampler thread records the Python stacks of the event loop thread and
+of the threadpool workers executing this request's sync code (dependencies,
+endpoints, SQL). SQL statements and password hashing are also timed exactly.
+
+The profile is stored in the shared cache under the id returned in the
+``X-Profile-Id`` response header, and can be fetched from ``/profiles/{id}``
+as a summary, collapsed stacks (flamegraph.pl, speedscope) or speedscope JSON.
+
+Threadpool samples are attributed through explicit tagging: while a request
+is profiled, work it hands to the threadpool (``anyio.to_thread.run_sync``,
+which Starlette and FastAPI use for sync code) registers its worker thread
+for the profile while it runs. Event loop samples are not tied to one
+request: they show whatever the loop was running, which includes other
+requests served at the same time.
+"""
+import contextvars
+import functools
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.cache import get_cache
+from core.config import settings
+
+_current_profile: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+_profiles = get_cache("profiles", default_ttl=settings.PROFILING_TTL_SECONDS)
+
+# Frames that mean the event loop is waiting for I/O rather than working
+_IDLE_LOOP_FRAMES = {("selectors.py", "select"), ("base_events.py", "run_forever"), ("runners.py", "run")}
+
+# Worker thread id -> profile of the request whose work item it is running
+_profiled_threads: Dict[int, "Profile"] = {}
+_original_run_sync = anyio.to_thread.run_sync
+
+
+class Profile:
+    def __init__(self, method: str, path: str, interval: float):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.loop_thread = threading.get_ident()
+        self.started_at = time.time()
+        self.wall = 0.0
+        # Collapsed stack -> sampled seconds
+        self.stacks: Counter = Counter()
+        self.sampled = {"event_loop": 0.0, "threadpool": 0.0}
+        # Exactly timed sections (sql, password_hash) -> seconds, calls
+        self.timings: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # Exact timings, from any thread running with this profile in context
+
+    def add_timing(self, category: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[category] = self.timings.get(category, 0.0) + seconds
+            self.calls[category] = self.calls.get(category, 0) + 1
+
+    # Sampling
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample_loop, name=f"profiler-{self.id[:8]}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.wall = time.time() - self.started_at
+        self._stop.set()
+        self._thread.join()
+
+    def _sample_loop(self) -> None:
+        deadline = time.monotonic() + settings.PROFILING_MAX_SECONDS
+        last = time.monotonic()
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            # Weight by the real gap: with the GIL held elsewhere the sampler
+            # may wake up later than asked
+            elapsed, last = now - last, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if thread_id == self.loop_thread:
+                    if not self._is_idle_loop(frame):
+                        self._record("event_loop", frame, elapsed)
+                elif self._runs_this_request(thread_id):
+                    self._record("threadpool", frame, elapsed)
+            if now > deadline:
+                break
+
+    def _runs_this_request(self, thread_id: int) -> bool:
+        """Whether a worker thread is running a work item of this request"""
+        return _profiled_threads.get(thread_id) is self
+
+    @staticmethod
+    def _is_idle_loop(frame) -> bool:
+        code = frame.f_code
+        return (code.co_filename.rsplit("/", 1)[-1], code.co_name) in _IDLE_LOOP_FRAMES
+
+    def _record(self, kind: str, frame, elapsed: float) -> None:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.append(kind)
+        with self._lock:
+            self.stacks[";".join(reversed(names))] += elapsed
+            self.sampled[kind] += elapsed
+
+    # Output
+
+    def to_dict(self) -> Dict[str, Any]:
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 3)
+
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "interval_ms": ms(self.interval),
+            "summary": {
+                "wall_ms": ms(self.wall),
+                "event_loop_ms": ms(self.sampled["event_loop"]),
+                "threadpool_ms": ms(self.sampled["threadpool"]),
+                "sql_ms": ms(self.timings.get("sql", 0.0)),
+                "sql_queries": self.calls.get("sql", 0),
+                "password_hash_ms": ms(self.timings.get("password_hash", 0.0)),
+                "password_hash_calls": self.calls.get("password_hash", 0),
+            },
+            # Collapsed stacks weighted in microseconds
+            "stacks": {stack: round(seconds * 1_000_000) for stack, seconds in self.stacks.items()},
+        }
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    return _profiles.get(profile_id)
+
+
+def collapsed(profile: Dict[str, Any]) -> str:
+    """Brendan Gregg's collapsed stack format, one ``frame;frame;... weight`` per line"""
+    return "\n".join(f"{stack} {weight}" for stack, weight in sorted(profile["stacks"].items())) + "\n"
+
+
+def speedscope(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """https://www.speedscope.app/file-format-schema.json, one sampled profile"""
+    frames: List[Dict[str, Any]] = []
+    index: Dict[str, int] = {}
+    samples, weights = [], []
+    for stack, weight in profile["stacks"].items():
+        sample = []
+        for name in stack.split(";"):
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({"name": name})
+            sample.append(index[name])
+        samples.append(sample)
+        weights.append(weight)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": f"{profile['method']} {profile['path']}",
+        "exporter": settings.PROJECT_NAME,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": f"{profile['method']} {profile['path']}",
+            "unit": "microseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+@contextmanager
+def timed(category: str) -> Iterator[None]:
+    """Time a section into the profile of the current request, if any"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_timing(category, time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("profile_query_start")
+    if profile is not None and starts:
+        profile.add_timing("sql", time.perf_counter() - starts.pop())
+
+
+def _tag_thread(profile: Profile, func):
+    @functools.wraps(func)
+    def run(*args):
+        thread_id = threading.get_ident()
+        _profiled_threads[thread_id] = profile
+        try:
+            return func(*args)
+        finally:
+            _profiled_threads.pop(thread_id, None)
+    return run
+
+
+async def _run_sync(func, *args, **kwargs):
+    """anyio.to_thread.run_sync, tagging the worker thread while it runs a profiled request's work"""
+    profile = _current_profile.get()
+    if profile is not None:
+        func = _tag_thread(profile, func)
+    return await _original_run_sync(func, *args, **kwargs)
+
+
+def install_thread_tagging() -> None:
+    """Route threadpool work through _run_sync; Starlette looks run_sync up on every call"""
+    if anyio.to_thread.run_sync is _original_run_sync:
+        anyio.to_thread.run_sync = _run_sync
+
+
+def uninstall_thread_tagging() -> None:
+    """Put the original anyio.to_thread.run_sync back, unless someone wrapped it since"""
+    if anyio.to_thread.run_sync is _run_sync:
+        anyio.to_thread.run_sync = _original_run_sync
+
+
+def _is_admin(headers: Headers) -> bool:
+    # Imported here: core.security hashes passwords under timed()
+    from core.security import get_current_user_optional
+
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    payload = get_current_user_optional(token)
+    if not payload:
+        return False
+    return bool(payload.get("is_sys_admin") or payload.get("profile", {}).get("is_sys_admin"))
+
+
+class ProfilingMiddleware:
+    """Profile requests flagged by an admin; everything else passes straight through"""
+
+    def __init__(self, app: ASGIApp, interval_ms: float = 1.0):
+        self.app = app
+        self.interval = interval_ms / 1000
+        install_thread_tagging()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        requested = headers.get("x-profile") == "1" or QueryParams(scope.get("query_string", b"")).get("_profile") == "1"
+        if not requested or not _is_admin(headers):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"], self.interval)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile.id
+            await send(message)
+
+        token = _current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current_profile.reset(token)
+            profile.stop()
+            # The shared cache may be Redis: store from the threadpool, not the loop
+            await _original_run_sync(_profiles.set, profile.id, profile.to_dict())
@@ -0,0 +1,174 @@
+"""
+Sliding-window rate limiting for login attempts.
+
+Attempts are counted per client IP and per submitted email, and checked
+before the login handler touches the database or bcrypt, so a
+credential-stuffing burst is rejected for the price of a dict lookup.
+
+Counts live in this worker's memory, or in Redis when the shared cache uses
+the Redis backend so that all workers enforce the same limit. The window is
+the usual two-bucket approximation: the previous window's count is weighted
+by how much of it still overlaps the sliding window.
+
+Behind a reverse proxy, set TRUSTED_PROXY_HEADER so the limit applies to the
+client rather than to the proxy's address.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+
+from core.cache import RedisCacheBackend, get_backend
+from core.config import settings
+
+
+class MemoryRateLimitStore:
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._counts: "OrderedDict[str, Dict[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, keys: List[str], window_id: int, window: int) -> List[Tuple[int, int]]:
+        """Count an attempt for each key, returns (previous, current) window counts including it"""
+        result = []
+        with self._lock:
+            for key in keys:
+                buckets = self._counts.get(key)
+                if buckets is None:
+                    buckets = self._counts[key] = {}
+                # Only the current and previous windows matter
+                for old in [w for w in buckets if w < window_id - 1]:
+                    del buckets[old]
+                buckets[window_id] = buckets.get(window_id, 0) + 1
+                self._counts.move_to_end(key)
+                result.append((buckets.get(window_id - 1, 0), buckets[window_id]))
+            while len(self._counts) > self.max_keys:
+                self._counts.popitem(last=False)
+        return result
+
+    def undo(self, keys: List[str], window_id: int) -> None:
+        with self._lock:
+            for key in keys:
+                buckets = self._counts.get(key)
+                if buckets and buckets.get(window_id, 0) > 0:
+                    buckets[window_id] -= 1
+
+    def tracked_keys(self) -> int:
+        return len(self._counts)
+
+
+class RedisRateLimitStore:
+    def __init__(self, client, key_prefix: str = "forms-anyware:ratelimit:"):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def add(self, keys: List[str], window_id: int, window: int) -> List[Tuple[int, int]]:
+        # One MULTI/EXEC; every INCR returns a distinct count, so two workers
+        # can't both take the last attempt left
+        pipe = self.client.pipeline(transaction=True)
+        for key in keys:
+            current = f"{self.key_prefix}{key}:{window_id}"
+            pipe.get(f"{self.key_prefix}{key}:{window_id - 1}")
+            pipe.incr(current)
+            pipe.expire(current, window * 2)
+        replies = pipe.execute()
+        return [(int(replies[i] or 0), int(replies[i + 1])) for i in range(0, len(replies), 3)]
+
+    def undo(self, keys: List[str], window_id: int) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        for key in keys:
+            pipe.decr(f"{self.key_prefix}{key}:{window_id}")
+        pipe.execute()
+
+    def tracked_keys(self) -> Optional[int]:
+        return None
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    retry_after: int = 0
+    scope: Optional[str] = None
+
+
+class RateLimiter:
+    def __init__(self, store, limits: Dict[str, int], window: int):
+        self.store = store
+        self.limits = limits
+        self.window = window
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {scope: 0 for scope in limits}
+        self._stats_lock = threading.Lock()
+
+    def hit(self, keys: Dict[str, str]) -> RateLimitResult:
+        """
+        Register an attempt for every ``{scope: key}`` given, unless one of
+        them is already over its limit, in which case nothing is counted.
+
+        The attempt is counted first and compared after, then taken back if it
+        went over, so concurrent attempts can't all pass the check before any
+        of them is counted.
+        """
+        now = time.time()
+        window_id = int(now // self.window)
+        # Weight of the previous window, by how much of it the sliding window still covers
+        weight = 1 - (now % self.window) / self.window
+        scopes = [scope for scope, key in keys.items() if key]
+        store_keys = [f"{scope}:{keys[scope]}" for scope in scopes]
+        counts = self.store.add(store_keys, window_id, self.window)
+
+        for scope, (previous, current) in zip(scopes, counts):
+            if previous * weight + current > self.limits[scope]:
+                self.store.undo(store_keys, window_id)
+                with self._stats_lock:
+                    self.rejected[scope] += 1
+                retry_after = math.ceil(self.window - (now % self.window))
+                return RateLimitResult(False, retry_after, scope)
+
+        with self._stats_lock:
+            self.allowed += 1
+        return RateLimitResult(True)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "window_seconds": self.window,
+            "limits": self.limits,
+            "allowed": self.allowed,
+            "rejected": dict(self.rejected),
+            "tracked_keys": self.store.tracked_keys(),
+        }
+
+
+def get_client_ip(request: Request) -> Optional[str]:
+    """
+    The client address to count attempts against. Behind a reverse proxy that
+    is read from settings.TRUSTED_PROXY_HEADER; entries further left than
+    TRUSTED_PROXY_HOPS were written by the client and can't be trusted.
+    """
+    header = settings.TRUSTED_PROXY_HEADER
+    if header:
+        forwarded = [ip.strip() for ip in request.headers.get(header, "").split(",") if ip.strip()]
+        if forwarded:
+            return forwarded[-min(settings.TRUSTED_PROXY_HOPS, len(forwarded))]
+    return request.client.host if request.client else None
+
+
+def create_store():
+    backend = get_backend()
+    if isinstance(backend, RedisCacheBackend):
+        return RedisRateLimitStore(backend.client)
+    return MemoryRateLimitStore()
+
+
+login_rate_limiter = RateLimiter(
+    create_store(),
+    limits={
+        "ip": settings.LOGIN_RATE_LIMIT_PER_IP,
+        "email": settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    },
+    window=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
@@ -0,0 +1,83 @@
+"""
+In-memory list of revoked access token IDs (``jti``).
+
+Checking a token on every request must not cost a DB round trip, so each
+worker keeps the revoked ``jti``s in a set and only talks to the
+``revoked_tokens`` table from a background sync loop. Revocations made in
+this worker are visible immediately; revocations made by other workers are
+picked up on the next sync (``settings.REVOCATION_SYNC_SECONDS``).
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    def __init__(self):
+        self._revoked: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._last_sync: Optional[datetime] = None
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def prune(self) -> None:
+        """Forget revocations for tokens that have expired anyway"""
+        now = datetime.utcnow()
+        with self._lock:
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+
+    def sync(self, db=None) -> int:
+        """Load revocations created since the last sync, returns how many were loaded"""
+        from core.database import SessionLocal
+        from models.orm_models import RevokedToken
+
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            started_at = datetime.utcnow()
+            query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+                RevokedToken.expires_at > started_at
+            )
+            if self._last_sync is not None:
+                # Overlap a little to tolerate clock skew between workers
+                query = query.filter(
+                    RevokedToken.created_at >= self._last_sync - settings.revocation_sync_overlap
+                )
+            rows = query.all()
+
+            with self._lock:
+                for jti, expires_at in rows:
+                    self._revoked[jti] = expires_at
+            self._last_sync = started_at
+            self.prune()
+            return len(rows)
+        finally:
+            if own_session:
+                db.close()
+
+    async def run_sync_loop(self) -> None:
+        """Periodically sync with the database until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception:
+                logger.exception("Failed to sync revoked tokens")
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocation_list = RevocationList()
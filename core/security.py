@@ -5,8 +5,13 @@ from pydantic import ValidationError
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from passlib.context import CryptContext
+from passlib.hash import argon2
+import uuid
 
 from core.config import settings
+from core.keys import decode_token, encode_token
+from core.profiling import timed
+from core.revocation import revocation_list
 from models.auth.token import TokenPayload
 from models.user import User
 
@@ -16,18 +21,46 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 class UserInDB(User):
     password: str
 
-# Create a password context that explicitly configures the bcrypt handler
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12  # Explicitly set rounds
-)
+def create_pwd_context() -> CryptContext:
+    """
+    Build the password context from settings. The preferred scheme hashes new
+    passwords; hashes using the other scheme or other costs still verify but
+    are reported by needs_update so they get rehashed on the next login.
+
+    argon2 is optional: without argon2-cffi it is left out as a fallback, and
+    selecting it fails here instead of on the first login.
+    """
+    preferred = settings.PASSWORD_HASH_SCHEME
+    if preferred not in ("bcrypt", "argon2"):
+        raise ValueError(f"Unsupported password hash scheme: {preferred}")
+    if preferred == "argon2" and not argon2.has_backend():
+        raise RuntimeError(
+            "PASSWORD_HASH_SCHEME=argon2 requires the 'argon2-cffi' package (pip install argon2-cffi)"
+        )
+    schemes = [preferred] + [s for s in ("bcrypt", "argon2") if s != preferred]
+    if not argon2.has_backend():
+        schemes.remove("argon2")
+
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        argon2__type="ID",
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+pwd_context = create_pwd_context()
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    with timed("password_hash"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    with timed("password_hash"):
+        return pwd_context.hash(password)
 
 def get_user(db, email: str):
     """Get a user by email from the database"""
@@ -52,9 +85,18 @@ def authenticate_user(db, email: str, password: str):
     
     # Check if user exists and password is correct
     if not user:
+        # Spend the same time as a real check so unknown emails can't be told apart
+        with timed("password_hash"):
+            pwd_context.dummy_verify()
         return False
-    if not verify_password(password, user.password):
+    with timed("password_hash"):
+        valid, new_hash = pwd_context.verify_and_update(password, user.password)
+    if not valid:
         return False
+
+    # Transparently upgrade hashes made with an outdated scheme or cost
+    if new_hash:
+        user.password = new_hash
     
     # Update last login timestamp
     user.last_login = datetime.utcnow()
@@ -91,7 +133,7 @@ def create_id_token(user_data: dict, expires_delta: Optional[timedelta] = None):
 
     to_encode.update({"exp": expire})
 
-    id_token = jwt.encode(to_encode, settings.get_jwt_key, algorithm=settings.ALGORITHM)
+    id_token = encode_token(to_encode)
     return id_token
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -104,8 +146,10 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    # Unique token ID so the token can be revoked before it expires
+    to_encode.setdefault("jti", str(uuid.uuid4()))
 
-    encoded_jwt = jwt.encode(to_encode, settings.get_jwt_key, algorithm=settings.ALGORITHM)
+    encoded_jwt = encode_token(to_encode)
     return encoded_jwt
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
@@ -118,14 +162,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any
         )
     
     try:
-        payload = jwt.decode(
+        payload = decode_token(
             token, 
-            settings.get_jwt_key,
-            algorithms=[settings.ALGORITHM],
             options={"verify_exp": True}  # Explicitly verify expiration
         )
 
-        token_data = TokenPayload(**payload)
+        TokenPayload.model_validate(payload)
             
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -145,6 +187,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any
             detail="Invalid token format",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    if revocation_list.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
         
     return payload
 
@@ -154,16 +203,15 @@ def get_current_user_optional(token: str = Depends(oauth2_scheme)) -> Optional[D
         return None
     
     try:
-        payload = jwt.decode(
-            token, 
-            settings.get_jwt_key,  # Use the property
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
 
-        token_data = TokenPayload(**payload)
+        TokenPayload.model_validate(payload)
             
     except (JWTError, ValidationError):
         return None
+
+    if revocation_list.is_revoked(payload.get("jti")):
+        return None
         
     return payload
 
@@ -176,15 +224,15 @@ def get_current_active_user(current_user: Dict[str, Any] = Depends(get_current_u
         )
     return current_user
 
+def is_sys_admin(current_user: Dict[str, Any]) -> bool:
+    """Admin claim of the access token, or of the profile in an ID token"""
+    if current_user.get("is_sys_admin", False):
+        return True
+    return bool(current_user.get("profile", {}).get("is_sys_admin", False))
+
 def get_current_admin_user(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
     """Ensure the user is an admin"""
-    # First check direct claim (from access token)
-    if current_user.get("is_sys_admin", False):
-        return current_user
-        
-    # If not found directly, check in profile (from ID token)
-    profile = current_user.get("profile", {})
-    if profile.get("is_sys_admin", False):
+    if is_sys_admin(current_user):
         return current_user
         
     # Not an admin
@@ -204,7 +252,7 @@ def decode_id_token(token: str):
     Decode and validate an ID token
     """
     try:
-        payload = jwt.decode(token, settings.get_jwt_key, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token)
         # Check if it's an ID token
         if "profile" not in payload:
             raise ValueError("Not a valid ID token")
@@ -1,3 +1,6 @@
+-- Baseline schema, applied by the 0001_baseline migration (alembic upgrade head).
+-- Do not edit: schema changes go in a new migration under migrations/versions.
+
 use hpha;
 
 -- Common tables
@@ -1,11 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from controllers import auth, health, users
+from controllers import approvals, audit, auth, events, health, jwks, profiles, requisitions, users
+from core.audit import audit_log
+from core.compression import CompressionMiddleware
+from core.config import settings
+from core.database import replica_router
+from core.deadlines import DeadlineMiddleware
+from core.events import setup_broker
+from core.keys import get_key_ring
+from core.load_shedding import LoadSheddingMiddleware, concurrency_limiter
+from core.org_index import org_index
+from core.profiling import ProfilingMiddleware
+from core.revocation import revocation_list
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse the signing keys once, before the first request
+    get_key_ring()
+    # Relay push events between workers when running on Redis
+    setup_broker()
+    # Keep the in-memory token revocation list in sync with the database
+    revocation_sync = asyncio.create_task(revocation_list.run_sync_loop())
+    # Put read replicas in rotation once they pass a health check, take failing ones out
+    replica_health = asyncio.create_task(replica_router.run_health_check_loop())
+    # Build the department/role membership index, then rebuild it periodically
+    org_index_refresh = asyncio.create_task(org_index.run_refresh_loop())
+    # Write audit events in batches
+    audit_flush = asyncio.create_task(audit_log.run_flush_loop())
+    yield
+    audit_flush.cancel()
+    # In-flight requests are done by now, write what they left in the queue
+    await audit_log.drain()
+    org_index_refresh.cancel()
+    replica_health.cancel()
+    revocation_sync.cancel()
+
+app = FastAPI(title="Forms Anyware API", lifespan=lifespan)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, interval_ms=settings.PROFILING_INTERVAL_MS)
+
+if settings.LOAD_SHEDDING_ENABLED:
+    # Health checks keep answering so an overloaded worker isn't restarted
+    app.add_middleware(LoadSheddingMiddleware, limiter=concurrency_limiter, exempt_paths=["/health", "/healthz"])
+
+# Outside the limiter, so time spent queueing counts against the deadline
+app.add_middleware(DeadlineMiddleware, timeout=settings.REQUEST_TIMEOUT_SECONDS)
 
-app = FastAPI(title="Forms Anyware API")
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        cache_compressed=settings.COMPRESSION_CACHE,
+    )
 
 # Include routers
+app.include_router(approvals)
+app.include_router(audit)
 app.include_router(auth)
+app.include_router(events)
 app.include_router(health)
+app.include_router(jwks)
+app.include_router(profiles)
+app.include_router(requisitions)
 app.include_router(users)
 
 if __name__ == "__main__":
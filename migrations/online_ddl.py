@@ -0,0 +1,35 @@
+"""
+Helpers for schema changes that must not block writes on large tables.
+
+On MySQL indexes are added and dropped with ``ALGORITHM=INPLACE, LOCK=NONE``:
+the server builds the index while reads and writes continue, and fails fast
+instead of silently falling back to a table copy if the change can't be made
+online. Other dialects use the plain Alembic operations.
+"""
+from typing import Sequence
+
+from alembic import op
+
+def _is_mysql() -> bool:
+    return op.get_context().dialect.name in ("mysql", "mariadb")
+
+def create_index_online(name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    if not _is_mysql():
+        op.create_index(name, table, list(columns), unique=unique)
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cols = ", ".join(f"`{c}`" for c in columns)
+    op.execute(f"ALTER TABLE `{table}` ADD {kind} `{name}` ({cols}), ALGORITHM=INPLACE, LOCK=NONE")
+
+def drop_index_online(name: str, table: str) -> None:
+    if not _is_mysql():
+        op.drop_index(name, table_name=table)
+        return
+    op.execute(f"ALTER TABLE `{table}` DROP INDEX `{name}`, ALGORITHM=INPLACE, LOCK=NONE")
+
+def add_column_online(table: str, column_ddl: str) -> None:
+    """Add a column, e.g. ``add_column_online("requisitions", "version int not null default 1")``"""
+    if not _is_mysql():
+        op.execute(f"ALTER TABLE {table} ADD COLUMN {column_ddl}")
+        return
+    op.execute(f"ALTER TABLE `{table}` ADD COLUMN {column_ddl}, ALGORITHM=INPLACE, LOCK=NONE")
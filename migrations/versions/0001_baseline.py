@@ -0,0 +1,61 @@
+"""Baseline schema from db/schema.sql
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases bootstrapped from db/schema.sql before migrations existed already
+have this schema: mark them with `alembic stamp 0001`, then `alembic upgrade head`.
+"""
+import os
+import re
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "db", "schema.sql")
+
+TABLES = [
+    "travel_expense_details",
+    "personal_expense_details",
+    "purchase_requisition_items",
+    "purchase_requisition_details",
+    "purchase_requisition_types",
+    "requisition_approvals",
+    "requisitions",
+    "requisition_status",
+    "requisition_types",
+    "flow_approval_rules",
+    "flow_versions",
+    "flows",
+    "sites",
+    "departments_users_roles",
+    "roles",
+    "departments",
+    "users",
+]
+
+def schema_statements():
+    with open(SCHEMA_FILE) as f:
+        sql = f.read()
+    # Drop comments, none of the statements contain "--" in a literal
+    sql = re.sub(r"--[^\n]*", "", sql)
+    for statement in sql.split(";"):
+        statement = statement.strip()
+        # The database is selected by the connection URL
+        if statement and not statement.lower().startswith("use "):
+            yield statement
+
+def upgrade() -> None:
+    for statement in schema_statements():
+        op.execute(statement)
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_table(table)
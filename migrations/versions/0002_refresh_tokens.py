@@ -0,0 +1,52 @@
+"""Refresh tokens and revoked access tokens
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+refresh_tokens keeps only the SHA-256 hash of each token; tokens issued by
+rotating one another share a family_id, so a reused token can revoke its
+whole family. revoked_tokens holds the jti of revoked access tokens until
+they expire, and is synced by every worker by created_at.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# users.id is bigint unsigned in db/schema.sql
+ID = sa.BigInteger().with_variant(mysql.BIGINT(unsigned=True), "mysql").with_variant(sa.Integer, "sqlite")
+
+def upgrade() -> None:
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("id", ID, primary_key=True, autoincrement=True),
+        sa.Column("user_id", ID, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("family_id", sa.CHAR(36), nullable=False),
+        sa.Column("token_hash", sa.CHAR(64), nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP, nullable=False),
+        sa.Column("revoked_at", sa.TIMESTAMP, nullable=True),
+        sa.Column("replaced_by_id", ID, nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP, server_default=sa.func.current_timestamp()),
+        sa.UniqueConstraint("token_hash", name="unique_refresh_tokens"),
+    )
+    op.create_index("idx_refresh_tokens_family", "refresh_tokens", ["family_id"])
+
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.CHAR(36), primary_key=True),
+        sa.Column("expires_at", sa.TIMESTAMP, nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP, server_default=sa.func.current_timestamp()),
+    )
+    op.create_index("idx_revoked_tokens_created_at", "revoked_tokens", ["created_at"])
+
+def downgrade() -> None:
+    op.drop_table("revoked_tokens")
+    op.drop_table("refresh_tokens")
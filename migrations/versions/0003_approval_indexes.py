@@ -0,0 +1,41 @@
+"""Indexes for approval queues and requisition lists
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Built online on MySQL (ALGORITHM=INPLACE, LOCK=NONE), so approvals keep
+flowing while the indexes on requisition_approvals are created.
+"""
+from typing import Sequence, Union
+
+from migrations.online_ddl import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # Approval chain of a requisition, in level order
+    ("idx_requisition_approvals_requisition_level", "requisition_approvals", ["requisition_id", "approval_level"]),
+    # Approver inbox: pending approvals for the roles a user holds
+    ("idx_requisition_approvals_role_status", "requisition_approvals", ["role_id", "status_id"]),
+    # Decisions made by a user
+    ("idx_requisition_approvals_approver_status", "requisition_approvals", ["approver_id", "status_id"]),
+    # Requisition lists by department / initiator / status, newest first
+    ("idx_requisitions_department_status", "requisitions", ["department_id", "current_status_id", "created_at"]),
+    ("idx_requisitions_initiator_created", "requisitions", ["initiator_id", "created_at"]),
+    ("idx_requisitions_status_created", "requisitions", ["current_status_id", "created_at"]),
+    # Memberships of a user (the unique key only covers lookups by department)
+    ("idx_departments_users_roles_user", "departments_users_roles", ["user_id", "department_id", "role_id"]),
+]
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
@@ -0,0 +1,90 @@
+"""Archive tables for closed requisitions and their approval history
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Each archive table has the columns of its hot table, no foreign keys, and an
+archived_at column. On MySQL the two large ones, requisitions_archive and
+requisition_approvals_archive, are RANGE partitioned by year of created_at
+so old years can be dropped or moved with partition operations. The hot
+tables themselves are not partitioned: MySQL does not allow partitioning
+tables that have foreign keys, so they stay small by archiving instead.
+
+Add next year's partition before it starts:
+
+    ALTER TABLE requisitions_archive REORGANIZE PARTITION p_future INTO (
+        PARTITION p2031 VALUES LESS THAN (UNIX_TIMESTAMP('2032-01-01')),
+        PARTITION p_future VALUES LESS THAN MAXVALUE);
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    "requisitions",
+    "requisition_approvals",
+    "purchase_requisition_details",
+    "purchase_requisition_items",
+    "personal_expense_details",
+    "travel_expense_details",
+]
+
+PARTITIONED = ["requisitions_archive", "requisition_approvals_archive"]
+FIRST_YEAR = 2024
+LAST_YEAR = 2030
+
+def _partitions() -> str:
+    partitions = [
+        f"PARTITION p{year} VALUES LESS THAN (UNIX_TIMESTAMP('{year + 1}-01-01'))"
+        for year in range(FIRST_YEAR, LAST_YEAR + 1)
+    ]
+    partitions.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+    return ",\n    ".join(partitions)
+
+def upgrade() -> None:
+    if op.get_context().dialect.name in ("mysql", "mariadb"):
+        for table in TABLES:
+            # LIKE copies columns and indexes but not foreign keys
+            op.execute(f"CREATE TABLE `{table}_archive` LIKE `{table}`")
+            op.execute(
+                f"ALTER TABLE `{table}_archive` "
+                "ADD COLUMN archived_at timestamp not null default current_timestamp"
+            )
+
+        # Partitioning requires the partition column in every unique key
+        op.execute("ALTER TABLE requisitions_archive DROP INDEX unique_requisitions")
+        op.execute("ALTER TABLE requisitions_archive ADD INDEX idx_requisitions_archive_number (requisition_number)")
+        for table in PARTITIONED:
+            op.execute(
+                f"ALTER TABLE `{table}` "
+                "MODIFY created_at timestamp not null default current_timestamp, "
+                "DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"
+            )
+            op.execute(
+                f"ALTER TABLE `{table}` PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (\n    {_partitions()}\n)"
+            )
+        return
+
+    # Other dialects (local SQLite databases): copy the reflected columns
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    for table in TABLES:
+        source = sa.Table(table, metadata, autoload_with=bind)
+        columns = [
+            sa.Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable, index=bool(c.foreign_keys))
+            for c in source.columns
+        ]
+        columns.append(sa.Column("archived_at", sa.DateTime, server_default=sa.func.current_timestamp()))
+        op.create_table(f"{table}_archive", *columns)
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_table(f"{table}_archive")
@@ -0,0 +1,42 @@
+"""Append-only audit trail
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Rows are only ever inserted, in batches, by core.audit. Both indexes end in
+the primary key so "latest events of an entity / actor" is an index range
+scan in id order, and paging with ``id < :before_id`` stays cheap.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same type as the ids of users and requisitions (bigint unsigned in db/schema.sql)
+ID = sa.BigInteger().with_variant(mysql.BIGINT(unsigned=True), "mysql").with_variant(sa.Integer, "sqlite")
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_events",
+        sa.Column("id", ID, primary_key=True, autoincrement=True),
+        sa.Column("occurred_at", sa.DateTime, nullable=False),
+        sa.Column("actor_id", ID, nullable=True),
+        sa.Column("action", sa.String(64), nullable=False),
+        sa.Column("entity_type", sa.String(64), nullable=False),
+        sa.Column("entity_id", ID, nullable=True),
+        sa.Column("ip_address", sa.String(45), nullable=True),
+        sa.Column("details", sa.Text, nullable=True),
+    )
+    op.create_index("idx_audit_events_entity", "audit_events", ["entity_type", "entity_id", "id"])
+    op.create_index("idx_audit_events_actor", "audit_events", ["actor_id", "id"])
+
+def downgrade() -> None:
+    op.drop_table("audit_events")
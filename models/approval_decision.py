@@ -0,0 +1,21 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+class BatchDecisionRequest(BaseModel):
+    """Approve or reject the current approval step of many requisitions at once"""
+    requisition_ids: List[int] = Field(..., min_length=1, max_length=500)
+    decision: Literal["approve", "reject"]
+    comments: Optional[str] = None
+
+class DecisionResult(BaseModel):
+    requisition_id: int
+    success: bool
+    approval_level: Optional[int] = None
+    requisition_status_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BatchDecisionResponse(BaseModel):
+    approved: int = 0
+    rejected: int = 0
+    failed: int = 0
+    results: List[DecisionResult]
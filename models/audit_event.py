@@ -0,0 +1,21 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import field_validator
+
+from models.base import ORMModel
+
+class AuditEvent(ORMModel):
+    id: int
+    occurred_at: datetime
+    actor_id: Optional[int] = None
+    action: str
+    entity_type: str
+    entity_id: Optional[int] = None
+    ip_address: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+    @field_validator("details", mode="before")
+    def parse_details(cls, v: Any) -> Any:
+        # Stored as JSON text
+        return json.loads(v) if isinstance(v, str) else v
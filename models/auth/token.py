@@ -1,6 +1,5 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any
-import time
 
 class Token(BaseModel):
     """Model for token response"""
@@ -10,7 +9,14 @@ class Token(BaseModel):
     expires_in: int = 3600  # Default to 1 hour
 
 class TokenPayload(BaseModel):
-    """Model for JWT token payload validation"""
+    """
+    Model for JWT token payload validation.
+
+    Only checks the shape of the claims: the signature and expiry have
+    already been verified by decode_token.
+    """
+    model_config = ConfigDict(frozen=True)
+
     # Standard JWT claims
     sub: str  # Subject (typically user email or ID)
     exp: int  # Expiration time (Unix timestamp)
@@ -21,22 +27,11 @@ class TokenPayload(BaseModel):
     iat: Optional[int] = None  # Issued at time
     
     # User profile information
-    is_sys_admin: Optional[bool] = False
     profile: Optional[Dict[str, Any]] = None
     
     # Access control flags
     is_sys_admin: Optional[bool] = False
 
-    @field_validator("exp", mode="before")
-    def check_expiration(cls, v):
-        # Ensure the token is not expired
-        if v < time.time():
-            raise ValueError("Token has expired")
-        return v
-    
-    class Config:
-        arbitrary_types_allowed = True
-
 class RefreshToken(BaseModel):
     """Model for refresh token"""
     refresh_token: str
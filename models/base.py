@@ -0,0 +1,25 @@
+from collections.abc import Mapping
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+class ORMModel(BaseModel):
+    """
+    Base of the read models filled from ORM objects or row mappings.
+
+    Validation is for input we don't control. Values read from our own
+    columns already have the field types, so ``trusted`` builds the model
+    without validating; FastAPI then passes the instance through instead of
+    validating the response again. Only use it when each column maps to its
+    field type exactly (Numeric columns come back as Decimal, not float).
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    @classmethod
+    def trusted(cls, source: Any):
+        if isinstance(source, Mapping):
+            values = {name: source[name] for name in cls.model_fields if name in source}
+        else:
+            values = {name: getattr(source, name) for name in cls.model_fields if hasattr(source, name)}
+        # Fields missing from the source get their defaults
+        return cls.model_construct(**values)
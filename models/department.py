@@ -1,11 +1,12 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
 
-class Department(BaseModel):
+from models.base import ORMModel
+
+class Department(ORMModel):
     id: int
     name: str
     code: str
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
-    deleted_at: Optional[datetime]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
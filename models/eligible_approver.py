@@ -0,0 +1,14 @@
+from typing import List
+from pydantic import BaseModel
+
+class ApprovalStepApprovers(BaseModel):
+    approval_level: int
+    role_id: int
+    status_id: int
+    user_ids: List[int]
+
+class RequisitionApprovers(BaseModel):
+    """Users who can act on each step of a requisition's approval chain"""
+    requisition_id: int
+    department_id: int
+    steps: List[ApprovalStepApprovers]
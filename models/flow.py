@@ -1,10 +1,11 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
 
-class Flow(BaseModel):
+from models.base import ORMModel
+
+class Flow(ORMModel):
     id: int
     name: str
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
-    deleted_at: Optional[datetime]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
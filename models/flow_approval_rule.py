@@ -1,8 +1,9 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
 
-class FlowApprovalRules(BaseModel):
+from models.base import ORMModel
+
+class FlowApprovalRules(ORMModel):
     id: int
     flow_version_id: int
     role_id: int
@@ -11,5 +12,5 @@ class FlowApprovalRules(BaseModel):
     max_amount: float
     can_skip: bool
     skip_reason_required: bool
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,12 +1,13 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
 
-class FlowVersion(BaseModel):
+from models.base import ORMModel
+
+class FlowVersion(ORMModel):
     id: int
     flow_id: int
     version: int
     is_active: bool
     effective_from: str
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
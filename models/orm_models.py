@@ -1,6 +1,7 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text
+from sqlalchemy import BigInteger, Boolean, Column, ForeignKey, Index, Integer, String, DateTime, Date, Numeric, Table, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from typing import List, Optional
 
 from core.database import Base
@@ -57,3 +58,248 @@ class DepartmentUserRole(Base):
     department = relationship("Department", back_populates="departments_users_roles")
     user = relationship("User", back_populates="departments_roles")
     role = relationship("Role", back_populates="departments_users_roles")
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    family_id: Mapped[str] = mapped_column(String(36), index=True)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True)
+    expires_at: Mapped[datetime] = mapped_column()
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    replaced_by_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(36), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, index=True)
+
+class AuditEvent(Base):
+    """Append-only, written in batches by core.audit"""
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("idx_audit_events_entity", "entity_type", "entity_id", "id"),
+        Index("idx_audit_events_actor", "actor_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column()
+    # No foreign keys: the trail outlives the rows it describes
+    actor_id: Mapped[Optional[int]] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), nullable=True)
+    action: Mapped[str] = mapped_column(String(64))
+    entity_type: Mapped[str] = mapped_column(String(64))
+    entity_id: Mapped[Optional[int]] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), nullable=True)
+    ip_address: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)
+    details: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+class Site(Base):
+    __tablename__ = "sites"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(100))
+    mnemonic: Mapped[str] = mapped_column(String(20), unique=True)
+    location: Mapped[str] = mapped_column(String(60))
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+class Flow(Base):
+    __tablename__ = "flows"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), unique=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+    versions: Mapped[List["FlowVersion"]] = relationship(back_populates="flow")
+
+class FlowVersion(Base):
+    __tablename__ = "flow_versions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    flow_id: Mapped[int] = mapped_column(ForeignKey("flows.id"))
+    version: Mapped[int] = mapped_column(Integer)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    effective_from: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    flow: Mapped["Flow"] = relationship(back_populates="versions")
+    approval_rules: Mapped[List["FlowApprovalRule"]] = relationship(back_populates="flow_version")
+
+class FlowApprovalRule(Base):
+    __tablename__ = "flow_approval_rules"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    flow_version_id: Mapped[int] = mapped_column(ForeignKey("flow_versions.id"))
+    role_id: Mapped[int] = mapped_column(ForeignKey("roles.id"))
+    approval_level: Mapped[int] = mapped_column(Integer)
+    min_amount: Mapped[Decimal] = mapped_column(Numeric(15, 2))
+    max_amount: Mapped[Decimal] = mapped_column(Numeric(15, 2))
+    can_skip: Mapped[bool] = mapped_column(Boolean, default=False)
+    skip_reason_required: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    flow_version: Mapped["FlowVersion"] = relationship(back_populates="approval_rules")
+
+class RequisitionType(Base):
+    __tablename__ = "requisition_types"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255))
+    code: Mapped[str] = mapped_column(String(50), unique=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+class RequisitionStatus(Base):
+    __tablename__ = "requisition_status"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(255), unique=True)
+
+class Requisition(Base):
+    __tablename__ = "requisitions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    requisition_number: Mapped[str] = mapped_column(String(50), unique=True)
+    requisition_type_id: Mapped[int] = mapped_column(ForeignKey("requisition_types.id"))
+    flow_id: Mapped[int] = mapped_column(ForeignKey("flows.id"))
+    flow_version_id: Mapped[int] = mapped_column(ForeignKey("flow_versions.id"))
+    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id"))
+    initiator_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    current_status_id: Mapped[int] = mapped_column(ForeignKey("requisition_status.id"))
+    total_amount: Mapped[Decimal] = mapped_column(Numeric(15, 2))
+    submission_date: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+    approvals: Mapped[List["RequisitionApproval"]] = relationship(back_populates="requisition")
+    purchase_detail: Mapped[Optional["PurchaseRequisitionDetail"]] = relationship(back_populates="requisition")
+
+class RequisitionApproval(Base):
+    __tablename__ = "requisition_approvals"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    requisition_id: Mapped[int] = mapped_column(ForeignKey("requisitions.id"))
+    approval_level: Mapped[int] = mapped_column(Integer)
+    role_id: Mapped[int] = mapped_column(ForeignKey("roles.id"))
+    approver_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
+    status_id: Mapped[int] = mapped_column(ForeignKey("requisition_status.id"))
+    comments: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    decision_date: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    skipped: Mapped[bool] = mapped_column(Boolean, default=False)
+    skip_reason: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    skipped_by_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
+    skipped_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    requisition: Mapped["Requisition"] = relationship(back_populates="approvals")
+
+class PurchaseRequisitionType(Base):
+    __tablename__ = "purchase_requisition_types"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), unique=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+class PurchaseRequisitionDetail(Base):
+    __tablename__ = "purchase_requisition_details"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    requisition_id: Mapped[int] = mapped_column(ForeignKey("requisitions.id"), unique=True)
+    site_id: Mapped[int] = mapped_column(ForeignKey("sites.id"))
+    purchase_type_id: Mapped[int] = mapped_column(ForeignKey("purchase_requisition_types.id"))
+    po_number: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    tel_ext: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    comments: Mapped[Optional[str]] = mapped_column(String(5000), nullable=True)
+    suggested_supplier: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    requisition: Mapped["Requisition"] = relationship(back_populates="purchase_detail")
+    items: Mapped[List["PurchaseRequisitionItem"]] = relationship(back_populates="detail")
+
+class PurchaseRequisitionItem(Base):
+    __tablename__ = "purchase_requisition_items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    purchase_requisition_detail_id: Mapped[int] = mapped_column(ForeignKey("purchase_requisition_details.id"))
+    quantity: Mapped[int] = mapped_column(Integer)
+    unit_measure: Mapped[str] = mapped_column(String(20))
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    vendor_catalogue_number: Mapped[str] = mapped_column(String(20))
+    eoc_cip: Mapped[str] = mapped_column(String(20))
+    description: Mapped[str] = mapped_column(String(5000))
+    total: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    detail: Mapped["PurchaseRequisitionDetail"] = relationship(back_populates="items")
+
+class PersonalExpenseDetail(Base):
+    __tablename__ = "personal_expense_details"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    requisition_id: Mapped[int] = mapped_column(ForeignKey("requisitions.id"), unique=True)
+    expense_date: Mapped[date] = mapped_column(Date)
+    expense_type: Mapped[str] = mapped_column(String(100))
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TravelExpenseDetail(Base):
+    __tablename__ = "travel_expense_details"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    requisition_id: Mapped[int] = mapped_column(ForeignKey("requisitions.id"), unique=True)
+    travel_start_date: Mapped[date] = mapped_column(Date)
+    travel_end_date: Mapped[date] = mapped_column(Date)
+    destination: Mapped[str] = mapped_column(String(200))
+    purpose: Mapped[str] = mapped_column(String(500))
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+def _archive_table(table: Table) -> Table:
+    """
+    Same columns as ``table`` without foreign keys or unique constraints, plus
+    ``archived_at``. Filled by services.archive_service.
+    """
+    columns = [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.primary_key,
+            nullable=column.nullable,
+            index=bool(column.foreign_keys),
+        )
+        for column in table.columns
+    ]
+    columns.append(Column("archived_at", DateTime, default=datetime.utcnow))
+    return Table(f"{table.name}_archive", Base.metadata, *columns)
+
+# Archive tables, in the order rows have to be copied (parents first)
+ARCHIVED_TABLES = [
+    Requisition.__table__,
+    RequisitionApproval.__table__,
+    PurchaseRequisitionDetail.__table__,
+    PurchaseRequisitionItem.__table__,
+    PersonalExpenseDetail.__table__,
+    TravelExpenseDetail.__table__,
+]
+archive_tables = {table.name: _archive_table(table) for table in ARCHIVED_TABLES}
+
+class RequisitionArchive(Base):
+    __table__ = archive_tables["requisitions"]
+
+class RequisitionApprovalArchive(Base):
+    __table__ = archive_tables["requisition_approvals"]
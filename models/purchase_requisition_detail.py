@@ -1,16 +1,17 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
 
-class PurchaseRequisitionDetail(BaseModel):
+from models.base import ORMModel
+
+class PurchaseRequisitionDetail(ORMModel):
     id: int
     requisition_id: int
     site_id: int
     purchase_type_id: int
-    po_number: Optional[str]
-    tel_ext: Optional[str]
-    comments: Optional[str]
-    suggested_supplier: Optional[str]
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
-    deleted_at: Optional[datetime]
+    po_number: Optional[str] = None
+    tel_ext: Optional[str] = None
+    comments: Optional[str] = None
+    suggested_supplier: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
@@ -1,8 +1,9 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
 
-class PurchaseRequisitionItem(BaseModel):
+from models.base import ORMModel
+
+class PurchaseRequisitionItem(ORMModel):
     id: int
     purchase_requisition_detail_id: int
     quantity: int
@@ -12,5 +13,5 @@ class PurchaseRequisitionItem(BaseModel):
     eoc_cip: str
     description: str
     total: float
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
 
-class Requisition(BaseModel):
+from models.base import ORMModel
+from models.requisition_approval import RequisitionApproval
+
+class Requisition(ORMModel):
     id: int
     requisition_number: str
     requisition_type_id: int
@@ -12,7 +14,11 @@ class Requisition(BaseModel):
     initiator_id: int
     current_status_id: int
     total_amount: float
-    submission_date: Optional[datetime]
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
-    deleted_at: Optional[datetime]
+    submission_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
+    archived: bool = False
+
+class RequisitionWithApprovals(Requisition):
+    approvals: List[RequisitionApproval] = []
@@ -1,20 +1,20 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
 
-class RequisitionApproval(BaseModel):
+from models.base import ORMModel
+
+class RequisitionApproval(ORMModel):
     id: int
     requisition_id: int
     approval_level: int
     role_id: int
-    approver_id: Optional[int]
+    approver_id: Optional[int] = None
     status_id: int
-    comments: Optional[str]
-    decision_date: Optional[datetime]
+    comments: Optional[str] = None
+    decision_date: Optional[datetime] = None
     skipped: bool
-    skip_reason: Optional[str]
-    skipped_by_user_id: Optional[int]
-    skipped_at: Optional[datetime]
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
-    deleted_at: Optional[datetime]
+    skip_reason: Optional[str] = None
+    skipped_by_user_id: Optional[int] = None
+    skipped_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -2,6 +2,8 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from models.base import ORMModel
+
 class UserBase(BaseModel):
     first_name: str
     last_name: str
@@ -20,14 +22,11 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
     is_sys_admin: Optional[bool] = None
 
-class User(UserBase):
+class User(ORMModel, UserBase):
     id: int
     last_login: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 class UserWithDepartments(User):
     departments_roles: List[Dict[str, Any]] = []
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Move closed requisitions and their approval history to the archive tables.
+
+    python -m scripts.archive_requisitions [--months 12] [--batch-size 500] [--max-batches N]
+
+Meant to run nightly from cron; each batch is its own short transaction, so
+it can be stopped at any point and resumed by running it again.
+"""
+import argparse
+import logging
+
+from core.database import SessionLocal
+from services.archive_service import ArchiveService
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--months", type=int, default=12, help="archive requisitions created before this many months ago")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--keep-deleted", action="store_true", help="leave soft-deleted open requisitions in place")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    db = SessionLocal()
+    try:
+        totals = ArchiveService.archive_requisitions(
+            db,
+            older_than_months=args.months,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            include_deleted=not args.keep_deleted,
+        )
+    finally:
+        db.close()
+    print(totals)
+
+if __name__ == "__main__":
+    main()
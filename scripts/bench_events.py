@@ -0,0 +1,59 @@
+"""
+Measure push fan-out through the in-process event broker.
+
+    python -m scripts.bench_events [connections] [events] [topics]
+
+Opens ``connections`` subscriptions spread over ``topics`` approver topics,
+publishes ``events`` events from a worker thread (like a request handler in
+the threadpool would) and reports delivery latency from publish to the
+moment each connection picks the event up.
+"""
+import asyncio
+import statistics
+import sys
+import threading
+import time
+
+from core.events import EventBroker
+
+async def run(connections: int, events: int, topics: int) -> None:
+    broker = EventBroker()
+    subscriptions = [broker.subscribe([f"department:{i % topics}:role:6"]) for i in range(connections)]
+    expected = sum(1 for i in range(events) for s in subscriptions if f"department:{i % topics}:role:6" in s.topics)
+    latencies = []
+
+    async def consume(subscription) -> None:
+        while True:
+            event = await broker.next_event(subscription, timeout=1.0)
+            if event is None:
+                return
+            latencies.append(time.time() - event["published_at"])
+
+    consumers = [asyncio.create_task(consume(s)) for s in subscriptions]
+
+    def publish() -> None:
+        for i in range(events):
+            broker.publish([f"department:{i % topics}:role:6"], {"type": "requisition.status", "requisition_id": i})
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=publish)
+    thread.start()
+    await asyncio.to_thread(thread.join)
+    await asyncio.gather(*consumers)
+    elapsed = time.perf_counter() - start - 1.0  # minus the idle timeout that ends the consumers
+
+    latencies.sort()
+    print(f"connections:   {connections}")
+    print(f"events:        {events} published, {len(latencies)}/{expected} deliveries")
+    print(f"throughput:    {len(latencies) / max(elapsed, 1e-9):,.0f} deliveries/s")
+    print(f"latency p50:   {statistics.median(latencies) * 1000:.3f} ms")
+    print(f"latency p99:   {latencies[int(len(latencies) * 0.99) - 1] * 1000:.3f} ms")
+    print(f"broker stats:  {broker.stats()}")
+
+def main() -> None:
+    args = [int(a) for a in sys.argv[1:]]
+    connections, events, topics = (args + [1000, 200, 20][len(args):])[:3]
+    asyncio.run(run(connections, events, topics))
+
+if __name__ == "__main__":
+    main()
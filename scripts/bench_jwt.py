@@ -0,0 +1,48 @@
+"""
+Compare token sign/verify cost per algorithm with throwaway keys.
+
+    python -m scripts.bench_jwt [iterations]
+"""
+import sys
+import time
+
+from cryptography.hazmat.primitives import serialization
+from jose import jwk
+
+from core.keys import KeyRing, SigningKey
+from scripts.generate_jwt_key import generate_private_key
+
+ALGORITHMS = ["HS256", "RS256", "ES256"]
+
+def build_ring(algorithm: str) -> KeyRing:
+    if algorithm.startswith("HS"):
+        key = jwk.construct("benchmark-secret", algorithm)
+        return KeyRing([SigningKey(None, algorithm, key, key)], None)
+    pem = generate_private_key(algorithm).private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    key = jwk.construct(pem, algorithm)
+    return KeyRing([SigningKey("bench", algorithm, key.public_key(), key)], "bench")
+
+def timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    claims = {"sub": "user@example.com", "is_sys_admin": False, "exp": int(time.time()) + 3600}
+
+    print(f"{'algorithm':<10}{'sign (us)':>12}{'verify (us)':>14}")
+    for algorithm in ALGORITHMS:
+        ring = build_ring(algorithm)
+        token = ring.encode(claims)
+        sign = timed(lambda: ring.encode(claims), iterations)
+        verify = timed(lambda: ring.decode(token), iterations)
+        print(f"{algorithm:<10}{sign:>12.1f}{verify:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare the cost of validating models per request against the fast paths:
+models built from trusted values with model_construct (which FastAPI passes
+through as the response without validating again), and model_copy instead of
+rebuilding a validated input.
+
+Each response is validated and dumped to JSON the way FastAPI does with a
+response_model, so the numbers are the model work of one request. The batch
+decision row is the counter-example: for plain int/str fields pydantic-core
+validates faster than model_construct, which runs in Python, so the fast path
+is only used where validation is expensive (emails, rebuilt inputs).
+
+    python -m scripts.bench_models [iterations]
+"""
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, List
+
+from pydantic import TypeAdapter
+
+from models.approval_decision import BatchDecisionResponse, DecisionResult
+from models.orm_models import User as UserRow
+from models.user import User, UserCreate
+
+BATCH_SIZE = 500
+PAGE_SIZE = 100
+
+def respond(adapter: TypeAdapter, value: Any) -> bytes:
+    """What FastAPI does with the value a route returns"""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+def batch_response(construct: bool) -> BatchDecisionResponse:
+    result = DecisionResult.model_construct if construct else DecisionResult
+    response = BatchDecisionResponse.model_construct if construct else BatchDecisionResponse
+    results = [
+        result(requisition_id=i, success=True, approval_level=1, requisition_status_id=2)
+        for i in range(BATCH_SIZE)
+    ]
+    return response(approved=BATCH_SIZE, rejected=0, failed=0, results=results)
+
+def timed(fn: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    new_user = UserCreate(first_name="Ada", last_name="Lovelace", email="ada@example.com", password="secret")
+    now = datetime.utcnow()
+    rows = [
+        UserRow(
+            id=i, first_name="Ada", last_name="Lovelace", username=None, email=f"user{i}@example.com",
+            password="x", is_sys_admin=False, last_login=None, created_at=now, updated_at=now,
+        )
+        for i in range(PAGE_SIZE)
+    ]
+    batch_adapter = TypeAdapter(BatchDecisionResponse)
+    users_adapter = TypeAdapter(List[User])
+
+    scenarios = [
+        (
+            "hashed user create",
+            lambda: UserCreate(**{**new_user.model_dump(), "password": "hash"}),
+            lambda: new_user.model_copy(update={"password": "hash"}),
+        ),
+        (
+            f"batch decision ({BATCH_SIZE})",
+            lambda: respond(batch_adapter, batch_response(construct=False)),
+            lambda: respond(batch_adapter, batch_response(construct=True)),
+        ),
+        (
+            f"user list ({PAGE_SIZE})",
+            lambda: respond(users_adapter, rows),
+            lambda: respond(users_adapter, [User.trusted(row) for row in rows]),
+        ),
+    ]
+
+    print(f"{'per request':<24}{'validated (us)':>16}{'fast path (us)':>16}{'speedup':>10}")
+    for name, validated, fast in scenarios:
+        # Cheap scenarios get more iterations for a stable figure
+        n = iterations * 50 if name == "hashed user create" else iterations
+        before = timed(validated, n)
+        after = timed(fast, n)
+        print(f"{name:<24}{before:>16.1f}{after:>16.1f}{before / after:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure password hashing cost on this host and suggest settings.
+
+    python -m scripts.calibrate_password_hash [target_ms] [--scheme bcrypt|argon2]
+
+Picks the highest cost whose median hash time stays within the target login
+latency (default 250 ms) and prints the environment variables to set. For
+argon2 the memory and parallelism come from the current settings
+(ARGON2_MEMORY_COST, ARGON2_PARALLELISM) and only the time cost is tuned.
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import argon2, bcrypt
+
+from core.config import settings
+
+SAMPLES = 5
+
+def measure(handler) -> float:
+    """Median seconds to hash a password with the given configured handler"""
+    timings = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def calibrate(name: str, configure, costs, target: float):
+    best = None
+    for cost in costs:
+        elapsed = measure(configure(cost))
+        print(f"  {name}={cost}: {elapsed * 1000:.1f} ms")
+        if elapsed > target:
+            break
+        best = cost
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("target_ms", nargs="?", type=float, default=250.0)
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default=settings.PASSWORD_HASH_SCHEME)
+    args = parser.parse_args()
+    target = args.target_ms / 1000
+
+    print(f"Calibrating {args.scheme} for a {args.target_ms:.0f} ms target")
+    if args.scheme == "bcrypt":
+        best = calibrate("BCRYPT_ROUNDS", lambda r: bcrypt.using(rounds=r), range(8, 20), target)
+        env = {"BCRYPT_ROUNDS": best}
+    else:
+        best = calibrate(
+            "ARGON2_TIME_COST",
+            lambda t: argon2.using(
+                type="ID",
+                time_cost=t,
+                memory_cost=settings.ARGON2_MEMORY_COST,
+                parallelism=settings.ARGON2_PARALLELISM,
+            ),
+            range(1, 20),
+            target,
+        )
+        env = {
+            "ARGON2_TIME_COST": best,
+            "ARGON2_MEMORY_COST": settings.ARGON2_MEMORY_COST,
+            "ARGON2_PARALLELISM": settings.ARGON2_PARALLELISM,
+        }
+
+    if best is None:
+        raise SystemExit("Even the lowest cost is slower than the target, raise the target")
+
+    print("\nSuggested settings:")
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    for key, value in env.items():
+        print(f"{key}={value}")
+
+if __name__ == "__main__":
+    main()
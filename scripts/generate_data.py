@@ -0,0 +1,586 @@
+"""
+Fill the database with synthetic data for scale testing.
+
+    python -m scripts.generate_data [--users 1000] [--departments 50] [--requisitions 20000]
+        [--years 3] [--until 2025-12-31] [--seed 42] [--chunk-size 5000]
+        [--database-url URL] [--create-schema] [--load-data]
+
+Generates users, departments, departments_users_roles, requisitions with
+their purchase, personal expense or travel details, purchase line items and
+approval chains that follow the flow approval rules. The same seed and
+arguments always produce the same rows on an empty database.
+
+Rows are written in chunks with executemany, or with LOAD DATA LOCAL INFILE
+on MySQL when --load-data is given (the server needs local_infile=1).
+Requisitions are generated chunk by chunk, so millions of them never sit in
+memory at once.
+
+On MySQL run ``alembic upgrade head`` first. On SQLite, --create-schema
+creates the tables and the reference data of db/schema.sql:
+
+    python -m scripts.generate_data --database-url sqlite:///scale.db --create-schema
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, create_engine, func, select
+from sqlalchemy.engine import Connection
+
+from core.config import settings
+from core.database import Base
+from models.orm_models import (
+    Department,
+    DepartmentUserRole,
+    Flow,
+    FlowApprovalRule,
+    FlowVersion,
+    PersonalExpenseDetail,
+    PurchaseRequisitionDetail,
+    PurchaseRequisitionItem,
+    PurchaseRequisitionType,
+    Requisition,
+    RequisitionApproval,
+    RequisitionStatus,
+    RequisitionType,
+    Role,
+    Site,
+    TravelExpenseDetail,
+    User,
+)
+
+INITIATOR, DELEGATE, SUPERVISOR, MANAGER, DIRECTOR, VP_DEPARTMENT, VP_CFE, CEO = 2, 3, 4, 5, 6, 7, 8, 9
+DRAFT, IN_PROGRESS, PENDING, APPROVED, REJECTED, CANCELLED = 1, 2, 3, 4, 5, 6
+
+# Bcrypt hash of "password" with a fixed salt, so reruns produce identical rows
+PASSWORD = "password"
+PASSWORD_SALT = "FormsAnywareSynthetic" + "u"
+
+FIRST_NAMES = [
+    "Olivia", "Liam", "Emma", "Noah", "Charlotte", "William", "Amelia", "Benjamin", "Ava", "Lucas",
+    "Sophia", "Henry", "Mia", "Jack", "Evelyn", "Leo", "Harper", "Owen", "Chloe", "Ethan",
+    "Aria", "Jacob", "Ella", "James", "Layla", "Logan", "Nora", "Thomas", "Zoe", "Samuel",
+]
+LAST_NAMES = [
+    "Smith", "Brown", "Tremblay", "Martin", "Roy", "Wilson", "MacDonald", "Gagnon", "Johnson", "Taylor",
+    "Campbell", "Anderson", "Leblanc", "Lee", "Jones", "White", "Williams", "Miller", "Thompson", "Young",
+]
+DEPARTMENT_NAMES = [
+    "Emergency", "Surgery", "Pharmacy", "Laboratory", "Diagnostic Imaging", "Maternal Child", "Mental Health",
+    "Dialysis", "Oncology", "Rehabilitation", "Food Services", "Environmental Services", "Facilities",
+    "Information Technology", "Finance", "Human Resources", "Health Records", "Infection Control",
+    "Intensive Care", "Medicine", "Ambulatory Care", "Purchasing", "Quality", "Education",
+]
+SUPPLIERS = [
+    "Medline Canada", "Cardinal Health", "Baxter", "Stryker", "Henry Schein", "Staples Business",
+    "Grand & Toy", "CDW Canada", "Dell Canada", "Sysco", "Grainger", "Fisher Scientific", None,
+]
+ITEMS = [
+    ("Nitrile exam gloves", "box", 12.5), ("IV administration set", "case", 180.0), ("Printer toner", "ea", 95.0),
+    ("Laptop", "ea", 1450.0), ("Office chair", "ea", 320.0), ("Suture kit", "box", 64.0),
+    ("Infusion pump", "ea", 4800.0), ("Patient monitor", "ea", 11500.0), ("Linen", "case", 210.0),
+    ("Reagent kit", "kit", 780.0), ("Wheelchair", "ea", 890.0), ("Ultrasound probe", "ea", 9200.0),
+    ("Paper", "case", 48.0), ("Network switch", "ea", 2600.0), ("Cleaning supplies", "case", 75.0),
+]
+EXPENSE_TYPES = ["Mileage", "Meals", "Conference fee", "Parking", "Books", "Professional dues"]
+DESTINATIONS = ["Toronto", "London", "Ottawa", "Kitchener", "Hamilton", "Windsor", "Montreal", "Vancouver"]
+
+# (status, weight) for requisitions created in the last 30 days, and older ones
+RECENT_STATUSES = [(DRAFT, 10), (PENDING, 45), (IN_PROGRESS, 30), (APPROVED, 10), (REJECTED, 3), (CANCELLED, 2)]
+OLD_STATUSES = [(DRAFT, 1), (PENDING, 2), (IN_PROGRESS, 2), (APPROVED, 80), (REJECTED, 10), (CANCELLED, 5)]
+
+
+class ExecutemanyWriter:
+    """INSERT ... VALUES with executemany (multi-row INSERTs on pymysql)"""
+
+    def insert(self, conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            conn.execute(table.insert(), rows)
+
+
+class LoadDataWriter:
+    """MySQL LOAD DATA LOCAL INFILE from a temporary tab-separated file"""
+
+    # Backslash first, so the escapes added for tabs and newlines stay single
+    _ESCAPES = [("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n")]
+
+    def insert(self, conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        columns = list(rows[0])
+        fd, path = tempfile.mkstemp(suffix=".tsv")
+        try:
+            with os.fdopen(fd, "w", newline="") as f:
+                for row in rows:
+                    f.write("\t".join(self._field(row[column]) for column in columns) + "\n")
+            conn.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table.name} "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({', '.join(columns)})"
+            )
+        finally:
+            os.remove(path)
+
+    @classmethod
+    def _field(cls, value: Any) -> str:
+        """One field as LOAD DATA reads it with ESCAPED BY '\\': \\N is NULL"""
+        if value is None:
+            return "\\N"
+        if isinstance(value, bool):
+            return str(int(value))
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        value = str(value)
+        for char, escaped in cls._ESCAPES:
+            value = value.replace(char, escaped)
+        return value
+
+
+class Generator:
+    def __init__(self, conn: Connection, writer, args: argparse.Namespace):
+        self.conn = conn
+        self.writer = writer
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.until = datetime.combine(args.until, datetime.min.time())
+        self.since = self.until - timedelta(days=365 * args.years)
+        self.counts: Dict[str, int] = {}
+        self.next_ids = {
+            table.name: (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+            for table in (
+                User.__table__, Department.__table__, DepartmentUserRole.__table__, Requisition.__table__,
+                RequisitionApproval.__table__, PurchaseRequisitionDetail.__table__,
+                PurchaseRequisitionItem.__table__, PersonalExpenseDetail.__table__, TravelExpenseDetail.__table__,
+            )
+        }
+        self._load_reference_data()
+
+    # Helpers
+
+    def _id(self, table: Table) -> int:
+        value = self.next_ids[table.name]
+        self.next_ids[table.name] = value + 1
+        return value
+
+    def _write(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        self.writer.insert(self.conn, table, rows)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _weighted(self, choices: Sequence[Tuple[Any, float]]) -> Any:
+        values, weights = zip(*choices)
+        return self.rng.choices(values, weights)[0]
+
+    @staticmethod
+    def _money(value: float) -> Decimal:
+        return Decimal(f"{value:.2f}")
+
+    def _load_reference_data(self) -> None:
+        conn = self.conn
+        self.type_ids = dict(conn.execute(select(RequisitionType.code, RequisitionType.id)).all())
+        flows = dict(conn.execute(select(Flow.name, Flow.id)).all())
+        purchase_types = dict(conn.execute(select(PurchaseRequisitionType.name, PurchaseRequisitionType.id)).all())
+        self.site_ids = list(conn.execute(select(Site.id).order_by(Site.id)).scalars())
+        if not (self.type_ids and flows and purchase_types and self.site_ids):
+            raise SystemExit("Reference data missing: run `alembic upgrade head` (MySQL) or use --create-schema")
+
+        # Latest active version of each flow and its rules, lowest level first
+        self.flow_versions: Dict[int, int] = {}
+        for flow_id, version_id in conn.execute(
+            select(FlowVersion.flow_id, FlowVersion.id)
+            .where(FlowVersion.is_active.is_(True))
+            .order_by(FlowVersion.flow_id, FlowVersion.version)
+        ):
+            self.flow_versions[flow_id] = version_id
+        self.rules: Dict[int, List[Tuple[int, int, float]]] = {}
+        for version_id, level, role_id, min_amount in conn.execute(
+            select(
+                FlowApprovalRule.flow_version_id, FlowApprovalRule.approval_level,
+                FlowApprovalRule.role_id, FlowApprovalRule.min_amount,
+            ).order_by(FlowApprovalRule.flow_version_id, FlowApprovalRule.approval_level)
+        ):
+            self.rules.setdefault(version_id, []).append((level, role_id, float(min_amount)))
+
+        # Purchase type name -> (weight, flow id, purchase type id)
+        self.purchase_flows = [
+            (80, flows.get("Purchase Requisition - Expense"), purchase_types.get("Expense")),
+            (15, flows.get("Purchase Requisition - Capital"), purchase_types.get("Capital")),
+            (5, flows.get("Purchase Requisition - Construction"), purchase_types.get("Construction")),
+        ]
+        self.personal_flow = flows.get("Personal Expense Reimbursement")
+        self.travel_flow = flows.get("Travel Expense Reimbursement")
+
+    # Organisation
+
+    def generate_organisation(self) -> None:
+        args, rng = self.args, self.rng
+        now = self.since
+
+        self.department_ids = []
+        departments = []
+        for n in range(args.departments):
+            department_id = self._id(Department.__table__)
+            base = DEPARTMENT_NAMES[n % len(DEPARTMENT_NAMES)]
+            departments.append({
+                "id": department_id,
+                "name": f"{base} {n // len(DEPARTMENT_NAMES) + 1}" if n >= len(DEPARTMENT_NAMES) else base,
+                "code": f"D{department_id:05d}",
+                "created_at": now,
+                "updated_at": now,
+            })
+            self.department_ids.append(department_id)
+        self._write(Department.__table__, departments)
+
+        # Department sizes follow a Zipf-like curve: a few large clinical
+        # departments, a long tail of small ones
+        self.department_weights = [1 / (rank + 1) ** 0.8 for rank in range(args.departments)]
+
+        from passlib.hash import bcrypt
+        password = bcrypt.using(salt=PASSWORD_SALT, rounds=settings.BCRYPT_ROUNDS).hash(PASSWORD)
+
+        self.members: Dict[int, List[int]] = {department_id: [] for department_id in self.department_ids}
+        self.holders: Dict[Tuple[int, int], List[int]] = {}
+        users: List[Dict[str, Any]] = []
+        memberships: List[Dict[str, Any]] = []
+
+        def add_membership(department_id: int, user_id: int, role_id: int) -> None:
+            memberships.append({
+                "id": self._id(DepartmentUserRole.__table__),
+                "department_id": department_id,
+                "user_id": user_id,
+                "role_id": role_id,
+            })
+            self.holders.setdefault((department_id, role_id), []).append(user_id)
+
+        def flush() -> None:
+            self._write(User.__table__, users)
+            self._write(DepartmentUserRole.__table__, memberships)
+            users.clear()
+            memberships.clear()
+
+        for n in range(args.users):
+            user_id = self._id(User.__table__)
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            created_at = self.since + timedelta(seconds=rng.randrange(int((self.until - self.since).total_seconds())))
+            users.append({
+                "id": user_id,
+                "first_name": first,
+                "last_name": last,
+                "username": f"{first[0]}{last}{user_id}".lower(),
+                "email": f"{first}.{last}.{user_id}@synthetic.example.com".lower(),
+                "password": password,
+                "is_sys_admin": False,
+                "created_at": created_at,
+                "updated_at": created_at,
+                # About 2% of the staff have left
+                "deleted_at": created_at + timedelta(days=rng.randint(30, 700)) if rng.random() < 0.02 else None,
+            })
+            # Every department gets one person before the rest are spread out
+            if n < args.departments:
+                department_id = self.department_ids[n]
+            else:
+                department_id = rng.choices(self.department_ids, self.department_weights)[0]
+            self.members[department_id].append(user_id)
+            add_membership(department_id, user_id, INITIATOR)
+            if len(users) >= args.chunk_size:
+                flush()
+        flush()
+
+        # Approvers are drawn from each department's own staff; VPs cover a
+        # group of ten departments and the VP/CFE and CEO every department
+        executives: Dict[int, int] = {}
+        for index, department_id in enumerate(self.department_ids):
+            staff = self.members[department_id]
+            for role_id, count in ((DELEGATE, 2), (SUPERVISOR, 1), (MANAGER, 1), (DIRECTOR, 1)):
+                for user_id in rng.sample(staff, min(count, len(staff))):
+                    add_membership(department_id, user_id, role_id)
+            group = index // 10
+            if group not in executives:
+                executives[group] = staff[0]
+            add_membership(department_id, executives[group], VP_DEPARTMENT)
+        cfo, ceo = rng.choice(self.members[self.department_ids[0]]), rng.choice(self.members[self.department_ids[-1]])
+        for department_id in self.department_ids:
+            add_membership(department_id, cfo, VP_CFE)
+            add_membership(department_id, ceo, CEO)
+        flush()
+
+    # Requisitions
+
+    def generate_requisitions(self) -> None:
+        args = self.args
+        tables = (
+            Requisition.__table__, RequisitionApproval.__table__, PurchaseRequisitionDetail.__table__,
+            PurchaseRequisitionItem.__table__, PersonalExpenseDetail.__table__, TravelExpenseDetail.__table__,
+        )
+        chunk: Dict[str, List[Dict[str, Any]]] = {table.name: [] for table in tables}
+        started = time.monotonic()
+        for n in range(args.requisitions):
+            self._requisition(chunk)
+            if (n + 1) % args.chunk_size == 0 or n + 1 == args.requisitions:
+                # Parents first, for the foreign keys
+                for table in tables:
+                    self._write(table, chunk[table.name])
+                    chunk[table.name].clear()
+                self.conn.commit()
+                elapsed = time.monotonic() - started
+                print(f"  {n + 1} requisitions, {(n + 1) / elapsed:.0f}/s", flush=True)
+
+    def _requisition(self, chunk: Dict[str, List[Dict[str, Any]]]) -> None:
+        rng = self.rng
+        requisition_id = self._id(Requisition.__table__)
+        department_id = rng.choices(self.department_ids, self.department_weights)[0]
+        initiator_id = rng.choice(self.members[department_id])
+
+        # Volume grows over time: more requisitions in recent months
+        span = (self.until - self.since).total_seconds()
+        created_at = self.since + timedelta(seconds=span * rng.random() ** 0.75)
+        age_days = (self.until - created_at).days
+        status = self._weighted(RECENT_STATUSES if age_days < 30 else OLD_STATUSES)
+
+        kind = self._weighted([("PR", 70), ("PE", 20), ("TE", 10)])
+        if kind == "PR":
+            _, flow_id, purchase_type_id = rng.choices(self.purchase_flows, [w for w, _, _ in self.purchase_flows])[0]
+            detail_id = self._id(PurchaseRequisitionDetail.__table__)
+            amount = self._purchase_items(chunk, detail_id, created_at)
+            chunk[PurchaseRequisitionDetail.__tablename__].append({
+                "id": detail_id,
+                "requisition_id": requisition_id,
+                "site_id": rng.choice(self.site_ids),
+                "purchase_type_id": purchase_type_id,
+                "po_number": f"PO{requisition_id:010d}" if status == APPROVED else None,
+                "tel_ext": str(rng.randint(2000, 4999)),
+                "comments": None,
+                "suggested_supplier": rng.choice(SUPPLIERS),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        elif kind == "PE":
+            flow_id = self.personal_flow
+            amount = min(rng.lognormvariate(4.5, 0.9), 5000)
+            chunk[PersonalExpenseDetail.__tablename__].append({
+                "id": self._id(PersonalExpenseDetail.__table__),
+                "requisition_id": requisition_id,
+                "expense_date": (created_at - timedelta(days=rng.randint(0, 45))).date(),
+                "expense_type": rng.choice(EXPENSE_TYPES),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        else:
+            flow_id = self.travel_flow
+            amount = min(rng.lognormvariate(6.5, 0.8), 20000)
+            start = (created_at + timedelta(days=rng.randint(-30, 60))).date()
+            chunk[TravelExpenseDetail.__tablename__].append({
+                "id": self._id(TravelExpenseDetail.__table__),
+                "requisition_id": requisition_id,
+                "travel_start_date": start,
+                "travel_end_date": start + timedelta(days=rng.randint(0, 5)),
+                "destination": rng.choice(DESTINATIONS),
+                "purpose": "Conference" if rng.random() < 0.6 else "Training",
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+
+        version_id = self.flow_versions.get(flow_id)
+        updated_at = self._approvals(chunk, requisition_id, department_id, version_id, amount, status, created_at)
+        chunk[Requisition.__tablename__].append({
+            "id": requisition_id,
+            "requisition_number": f"{kind}-{created_at.year}-{requisition_id:08d}",
+            "requisition_type_id": self.type_ids[kind],
+            "flow_id": flow_id,
+            "flow_version_id": version_id,
+            "department_id": department_id,
+            "initiator_id": initiator_id,
+            "current_status_id": status,
+            "total_amount": self._money(amount),
+            "submission_date": None if status == DRAFT else created_at + timedelta(minutes=rng.randint(1, 600)),
+            "created_at": created_at,
+            "updated_at": updated_at,
+            # About 1% were deleted by their initiator
+            "deleted_at": updated_at if rng.random() < 0.01 else None,
+        })
+
+    def _purchase_items(self, chunk: Dict[str, List[Dict[str, Any]]], detail_id: int, created_at: datetime) -> float:
+        """Line items of a purchase requisition, returns their total"""
+        rng = self.rng
+        total = 0.0
+        # Mostly a handful of lines, occasionally long orders
+        count = 1 + min(int(rng.expovariate(0.4)), 40)
+        for _ in range(count):
+            description, unit, base_price = rng.choice(ITEMS)
+            quantity = 1 + int(rng.expovariate(0.3))
+            unit_price = round(base_price * rng.uniform(0.8, 1.25), 2)
+            line_total = round(quantity * unit_price, 2)
+            total += line_total
+            chunk[PurchaseRequisitionItem.__tablename__].append({
+                "id": self._id(PurchaseRequisitionItem.__table__),
+                "purchase_requisition_detail_id": detail_id,
+                "quantity": quantity,
+                "unit_measure": unit,
+                "unit_price": self._money(unit_price),
+                "vendor_catalogue_number": f"V{rng.randint(10000, 99999)}",
+                "eoc_cip": f"{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+                "description": description,
+                "total": self._money(min(line_total, 99_999_999.99)),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        return total
+
+    def _approvals(
+        self,
+        chunk: Dict[str, List[Dict[str, Any]]],
+        requisition_id: int,
+        department_id: int,
+        version_id: Optional[int],
+        amount: float,
+        status: int,
+        created_at: datetime,
+    ) -> datetime:
+        """Approval chain up to the level covering the amount, returns the last change"""
+        rng = self.rng
+        if status == DRAFT:
+            return created_at
+        chain = [(level, role_id) for level, role_id, min_amount in self.rules.get(version_id, []) if min_amount <= amount]
+        if not chain:
+            return created_at
+
+        # How many steps were decided, and how the last decided one went
+        if status == APPROVED:
+            decided, last = len(chain), APPROVED
+        elif status == REJECTED:
+            decided, last = rng.randint(1, len(chain)), REJECTED
+        elif status == IN_PROGRESS and len(chain) > 1:
+            decided, last = rng.randint(1, len(chain) - 1), APPROVED
+        else:
+            decided, last = 0, None
+
+        moment = created_at
+        for index, (level, role_id) in enumerate(chain):
+            row = {
+                "id": self._id(RequisitionApproval.__table__),
+                "requisition_id": requisition_id,
+                "approval_level": level,
+                "role_id": role_id,
+                "approver_id": None,
+                "status_id": PENDING,
+                "comments": None,
+                "decision_date": None,
+                "skipped": False,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            if index < decided:
+                # Decisions take hours to days, with a long tail
+                moment += timedelta(minutes=min(rng.lognormvariate(6.5, 1.2), 60 * 24 * 30))
+                holders = self.holders.get((department_id, role_id))
+                row.update(
+                    approver_id=rng.choice(holders) if holders else None,
+                    status_id=last if index == decided - 1 else APPROVED,
+                    decision_date=moment,
+                    updated_at=moment,
+                )
+            chunk[RequisitionApproval.__tablename__].append(row)
+        return moment
+
+
+def create_schema(conn: Connection) -> None:
+    """Tables and the reference rows of db/schema.sql, for a fresh SQLite database"""
+    Base.metadata.create_all(conn)
+    if conn.execute(select(func.count()).select_from(Role)).scalar():
+        return
+    now = datetime.utcnow()
+    roles = ["Administrator", "Initiator", "Delegate", "Supervisor", "Manager", "Director",
+             "VP for Department", "VP / CFE", "CEO", "Board Chair"]
+    conn.execute(Role.__table__.insert(), [{"id": i, "name": name} for i, name in enumerate(roles, 1)])
+    statuses = ["Draft", "In Progress", "Pending", "Approved", "Rejected", "Cancelled", "Skipped"]
+    conn.execute(RequisitionStatus.__table__.insert(), [{"id": i, "name": name} for i, name in enumerate(statuses, 1)])
+    conn.execute(RequisitionType.__table__.insert(), [
+        {"id": 1, "name": "Purchase Requisition", "code": "PR", "created_at": now, "updated_at": now},
+        {"id": 2, "name": "Personal Expense", "code": "PE", "created_at": now, "updated_at": now},
+        {"id": 3, "name": "Travel Expense", "code": "TE", "created_at": now, "updated_at": now},
+    ])
+    conn.execute(Site.__table__.insert(), [
+        {"id": i, "name": name, "mnemonic": mnemonic, "location": location, "created_at": now, "updated_at": now}
+        for i, (name, mnemonic, location) in enumerate([
+            ("Stratford General Hospital", "SGH", "Stratford"),
+            ("Seaforth Community Hospital", "SEA", "Seaforth"),
+            ("Alexandra & Marine General Hospital", "AMGH", "Goderich"),
+            ("St. Marys Memorial Hospital", "SMMH", "St. Marys"),
+            ("Clinton Public Hospital", "CPH", "Clinton"),
+        ], 1)
+    ])
+    conn.execute(PurchaseRequisitionType.__table__.insert(), [
+        {"id": i, "name": name, "created_at": now, "updated_at": now}
+        for i, name in enumerate(["Expense", "Capital", "Construction"], 1)
+    ])
+    flows = ["Purchase Requisition - Expense", "Purchase Requisition - Capital", "Purchase Requisition - Construction",
+             "Personal Expense Reimbursement", "Travel Expense Reimbursement"]
+    conn.execute(Flow.__table__.insert(), [
+        {"id": i, "name": name, "created_at": now, "updated_at": now} for i, name in enumerate(flows, 1)
+    ])
+    conn.execute(FlowVersion.__table__.insert(), [
+        {"id": i, "flow_id": i, "version": 1, "is_active": True, "effective_from": now, "created_at": now, "updated_at": now}
+        for i in range(1, len(flows) + 1)
+    ])
+    rules = [(3, 0, 999.99), (5, 1000, 4999.99), (6, 5000, 24999.99), (7, 25000, 99999.99),
+             (8, 100000, 499999.99), (9, 500000, 9999999999.99)]
+    conn.execute(FlowApprovalRule.__table__.insert(), [
+        {
+            "flow_version_id": 1, "role_id": role_id, "approval_level": level,
+            "min_amount": Decimal(f"{low:.2f}"), "max_amount": Decimal(f"{high:.2f}"),
+            "can_skip": False, "skip_reason_required": True, "created_at": now, "updated_at": now,
+        }
+        for level, (role_id, low, high) in enumerate(rules, 1)
+    ])
+    conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--departments", type=int, default=50)
+    parser.add_argument("--requisitions", type=int, default=20000)
+    parser.add_argument("--years", type=int, default=3, help="spread requisitions over this many years")
+    parser.add_argument("--until", type=date.fromisoformat, default=date(2025, 12, 31), help="newest creation date")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per bulk insert and transaction")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--create-schema", action="store_true", help="create tables and reference data (SQLite)")
+    parser.add_argument("--load-data", action="store_true", help="use LOAD DATA LOCAL INFILE (MySQL)")
+    args = parser.parse_args()
+    if args.departments < 1 or args.users < args.departments:
+        parser.error("need at least one department and one user per department")
+
+    is_mysql = args.database_url.startswith("mysql")
+    if args.load_data and not is_mysql:
+        parser.error("--load-data needs a MySQL database")
+    engine = create_engine(args.database_url, connect_args={"local_infile": True} if args.load_data else {})
+
+    started = time.monotonic()
+    with engine.connect() as conn:
+        if args.create_schema:
+            create_schema(conn)
+        if is_mysql:
+            # Ids are assigned here and always consistent; skip per-row checks
+            conn.exec_driver_sql("SET foreign_key_checks = 0, unique_checks = 0")
+        generator = Generator(conn, LoadDataWriter() if args.load_data else ExecutemanyWriter(), args)
+        print(f"Generating {args.users} users in {args.departments} departments")
+        generator.generate_organisation()
+        conn.commit()
+        print(f"Generating {args.requisitions} requisitions")
+        generator.generate_requisitions()
+        if is_mysql:
+            conn.exec_driver_sql("SET foreign_key_checks = 1, unique_checks = 1")
+
+    elapsed = time.monotonic() - started
+    for table, count in generator.counts.items():
+        print(f"{table:32} {count:>12}")
+    total = sum(generator.counts.values())
+    print(f"{total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Generate a new JWT signing key in settings.JWT_KEYS_DIR.
+
+    python -m scripts.generate_jwt_key [kid]
+
+The kid defaults to today's date, so the newest key sorts last and becomes
+the active signing key unless JWT_ACTIVE_KID says otherwise. Old key files
+can be kept (or replaced by their public half) until the tokens they signed
+have expired.
+"""
+import os
+import sys
+from datetime import datetime
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from core.config import settings
+
+def generate_private_key(algorithm: str):
+    if algorithm.startswith("RS") or algorithm.startswith("PS"):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    curves = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+    if algorithm in curves:
+        return ec.generate_private_key(curves[algorithm])
+    raise SystemExit(f"ALGORITHM={algorithm} does not use key files")
+
+def main() -> None:
+    kid = sys.argv[1] if len(sys.argv) > 1 else datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    private_key = generate_private_key(settings.ALGORITHM)
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+    os.makedirs(settings.JWT_KEYS_DIR, exist_ok=True)
+    path = os.path.join(settings.JWT_KEYS_DIR, f"{kid}.pem")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    print(f"Wrote {settings.ALGORITHM} key {kid} to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+
+from core.audit import audit_log
+from core.cache import get_cache
+from core.events import approver_topic, broker, requisition_topic, user_topic
+from core.org_index import org_index
+from models.approval_decision import BatchDecisionRequest, BatchDecisionResponse, DecisionResult
+from models.eligible_approver import ApprovalStepApprovers, RequisitionApprovers
+from models.orm_models import FlowApprovalRule, Requisition, RequisitionApproval
+from models.requisition_status import RequisitionStatus
+
+# Approval rules change rarely and only through new flow versions
+_flow_rules_cache = get_cache("flow_rules", default_ttl=300)
+
+OPEN_REQUISITION_STATUSES = {
+    RequisitionStatus.IN_PROGRESS.value,
+    RequisitionStatus.PENDING.value,
+}
+DONE_APPROVAL_STATUSES = {
+    RequisitionStatus.APPROVED.value,
+    RequisitionStatus.SKIPPED.value,
+}
+
+class ApprovalService:
+    @staticmethod
+    def get_flow_rules(db: Session, flow_version_id: int) -> Dict[int, Dict[str, Any]]:
+        """Approval rules of a flow version by approval level, cached"""
+        def load() -> Dict[int, Dict[str, Any]]:
+            rules = db.scalars(
+                select(FlowApprovalRule).where(FlowApprovalRule.flow_version_id == flow_version_id)
+            ).all()
+            return {
+                rule.approval_level: {
+                    "role_id": rule.role_id,
+                    "min_amount": rule.min_amount,
+                    "max_amount": rule.max_amount,
+                    "can_skip": rule.can_skip,
+                }
+                for rule in rules
+            }
+
+        return _flow_rules_cache.get_or_load(flow_version_id, load)
+
+    @staticmethod
+    def get_user_roles(db: Session, user_id: int) -> Set[Tuple[int, int]]:
+        """(department_id, role_id) pairs the user holds, from the org hierarchy index"""
+        org_index.ensure_loaded(db)
+        return set(org_index.roles_of(user_id))
+
+    @staticmethod
+    def resolve_approvers(
+        db: Session,
+        requisition_ids: List[int],
+        visible_to: Optional[int] = None,
+        visible_departments: Collection[int] = (),
+    ) -> List[RequisitionApprovers]:
+        """
+        Eligible approvers for every step of the approval chains of many
+        requisitions: one query for the chains, then index lookups.
+        Requisitions outside the visibility scope (see RequisitionService) are
+        left out, like unknown ones.
+        """
+        requisition_ids = list(dict.fromkeys(requisition_ids))
+        query = (
+            select(
+                RequisitionApproval.requisition_id,
+                RequisitionApproval.approval_level,
+                RequisitionApproval.role_id,
+                RequisitionApproval.status_id,
+                Requisition.department_id,
+            )
+            .join(Requisition, Requisition.id == RequisitionApproval.requisition_id)
+            .where(
+                RequisitionApproval.requisition_id.in_(requisition_ids),
+                Requisition.deleted_at.is_(None),
+            )
+            .order_by(RequisitionApproval.requisition_id, RequisitionApproval.approval_level)
+        )
+        if visible_to is not None:
+            query = query.where(or_(
+                Requisition.department_id.in_(list(visible_departments)),
+                Requisition.initiator_id == visible_to,
+            ))
+        rows = db.execute(query).all()
+
+        org_index.ensure_loaded(db)
+        holders = org_index.resolve({(row.department_id, row.role_id) for row in rows})
+
+        chains: Dict[int, RequisitionApprovers] = {}
+        for row in rows:
+            chain = chains.get(row.requisition_id)
+            if chain is None:
+                chain = chains[row.requisition_id] = RequisitionApprovers(
+                    requisition_id=row.requisition_id, department_id=row.department_id, steps=[]
+                )
+            chain.steps.append(ApprovalStepApprovers(
+                approval_level=row.approval_level,
+                role_id=row.role_id,
+                status_id=row.status_id,
+                user_ids=sorted(holders[(row.department_id, row.role_id)]),
+            ))
+        return [chains[requisition_id] for requisition_id in requisition_ids if requisition_id in chains]
+
+    @staticmethod
+    def batch_decide(db: Session, user_id: int, request: BatchDecisionRequest) -> BatchDecisionResponse:
+        """
+        Apply one decision to the current approval step of many requisitions.
+
+        All approval rows of the requested requisitions are loaded (and locked)
+        with a single query, every item is validated in memory, and the changes
+        are written with one UPDATE per resulting status, all in one
+        transaction. Items that fail validation are reported and left untouched.
+
+        Besides holding the step's role, the user must not be the initiator nor
+        the approver of the previous level, and the total must be within the
+        amount range of the step's rule (a level applies from its min_amount;
+        the final approval must not exceed its max_amount).
+        """
+        requisition_ids = list(dict.fromkeys(request.requisition_ids))
+        approve = request.decision == "approve"
+
+        rows = db.execute(
+            select(
+                RequisitionApproval.id,
+                RequisitionApproval.requisition_id,
+                RequisitionApproval.approval_level,
+                RequisitionApproval.role_id,
+                RequisitionApproval.status_id,
+                RequisitionApproval.approver_id,
+                Requisition.department_id,
+                Requisition.initiator_id,
+                Requisition.flow_version_id,
+                Requisition.current_status_id,
+                Requisition.total_amount,
+            )
+            .join(Requisition, Requisition.id == RequisitionApproval.requisition_id)
+            .where(
+                RequisitionApproval.requisition_id.in_(requisition_ids),
+                Requisition.deleted_at.is_(None),
+            )
+            .order_by(RequisitionApproval.requisition_id, RequisitionApproval.approval_level)
+            .with_for_update()
+        ).all()
+
+        chains: Dict[int, List[Any]] = {}
+        for row in rows:
+            chains.setdefault(row.requisition_id, []).append(row)
+
+        user_roles = ApprovalService.get_user_roles(db, user_id)
+
+        results: Dict[int, DecisionResult] = {}
+        decided_approval_ids: List[int] = []
+        # (topics, event) to push once the transaction is committed
+        notifications: List[Tuple[List[str], Dict[str, Any]]] = []
+        # New requisition status -> requisition ids
+        requisition_updates: Dict[int, List[int]] = {}
+
+        for requisition_id in requisition_ids:
+            chain = chains.get(requisition_id)
+            error = None
+            step = None
+            if not chain:
+                error = "Requisition not found"
+            elif chain[0].current_status_id not in OPEN_REQUISITION_STATUSES:
+                error = "Requisition is not awaiting approval"
+            else:
+                step = next((r for r in chain if r.status_id not in DONE_APPROVAL_STATUSES), None)
+                if step is None or step.status_id != RequisitionStatus.PENDING.value:
+                    error = "No pending approval step"
+                else:
+                    rule = ApprovalService.get_flow_rules(db, step.flow_version_id).get(step.approval_level)
+                    index = chain.index(step)
+                    # Closest level below that was actually approved (skipped ones have no approver)
+                    previous = next(
+                        (r for r in reversed(chain[:index]) if r.status_id == RequisitionStatus.APPROVED.value),
+                        None,
+                    )
+                    if rule is None or rule["role_id"] != step.role_id:
+                        error = "Approval step does not match the flow rules"
+                    elif step.initiator_id == user_id:
+                        error = "Cannot approve your own requisition"
+                    elif (step.department_id, step.role_id) not in user_roles:
+                        error = "Not an approver for this step"
+                    elif previous is not None and previous.approver_id == user_id:
+                        error = "Already approved the previous level"
+                    elif step.total_amount < rule["min_amount"]:
+                        # Each level only applies from its minimum amount up
+                        error = "Amount is below the range of this approval level"
+                    elif approve and step is chain[-1] and step.total_amount > rule["max_amount"]:
+                        # The final approval must be within the level's limit
+                        error = "Amount exceeds the approval limit of this level"
+
+            if error:
+                results[requisition_id] = DecisionResult(requisition_id=requisition_id, success=False, detail=error)
+                continue
+
+            if not approve:
+                new_status = RequisitionStatus.REJECTED.value
+            elif step is chain[-1]:
+                new_status = RequisitionStatus.APPROVED.value
+            else:
+                new_status = RequisitionStatus.IN_PROGRESS.value
+
+            decided_approval_ids.append(step.id)
+            requisition_updates.setdefault(new_status, []).append(requisition_id)
+            topics = [
+                requisition_topic(requisition_id),
+                user_topic(step.initiator_id),
+                approver_topic(step.department_id, step.role_id),
+            ]
+            if new_status == RequisitionStatus.IN_PROGRESS.value:
+                # The requisition lands in the inbox of the next level
+                next_step = chain[index + 1]
+                topics.append(approver_topic(step.department_id, next_step.role_id))
+            notifications.append((topics, {
+                "type": "requisition.status",
+                "requisition_id": requisition_id,
+                "status_id": new_status,
+                "approval_level": step.approval_level,
+                "decision": request.decision,
+                "decided_by": user_id,
+            }))
+            results[requisition_id] = DecisionResult(
+                requisition_id=requisition_id,
+                success=True,
+                approval_level=step.approval_level,
+                requisition_status_id=new_status,
+            )
+
+        if decided_approval_ids:
+            now = datetime.utcnow()
+            try:
+                db.execute(
+                    update(RequisitionApproval)
+                    .where(RequisitionApproval.id.in_(decided_approval_ids))
+                    .values(
+                        status_id=RequisitionStatus.APPROVED.value if approve else RequisitionStatus.REJECTED.value,
+                        approver_id=user_id,
+                        decision_date=now,
+                        comments=request.comments,
+                        updated_at=now,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                for new_status, ids in requisition_updates.items():
+                    db.execute(
+                        update(Requisition)
+                        .where(Requisition.id.in_(ids))
+                        .values(current_status_id=new_status, updated_at=now)
+                        .execution_options(synchronize_session=False)
+                    )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            for topics, event in notifications:
+                broker.publish(topics, event)
+                audit_log.record(
+                    f"requisition.{request.decision}", "requisition", event["requisition_id"],
+                    actor_id=user_id,
+                    details={
+                        "approval_level": event["approval_level"],
+                        "status_id": event["status_id"],
+                        "comments": request.comments,
+                    },
+                )
+        else:
+            # Release the row locks
+            db.rollback()
+
+        ordered = [results[requisition_id] for requisition_id in requisition_ids]
+        return BatchDecisionResponse(
+            approved=sum(1 for r in ordered if r.success and approve),
+            rejected=sum(1 for r in ordered if r.success and not approve),
+            failed=sum(1 for r in ordered if not r.success),
+            results=ordered,
+        )
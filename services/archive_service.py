@@ -0,0 +1,112 @@
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+
+from models.orm_models import (
+    PersonalExpenseDetail,
+    PurchaseRequisitionDetail,
+    PurchaseRequisitionItem,
+    Requisition,
+    RequisitionApproval,
+    TravelExpenseDetail,
+    archive_tables,
+)
+from models.requisition_status import RequisitionStatus
+
+logger = logging.getLogger(__name__)
+
+CLOSED_STATUSES = [
+    RequisitionStatus.APPROVED.value,
+    RequisitionStatus.REJECTED.value,
+    RequisitionStatus.CANCELLED.value,
+]
+
+class ArchiveService:
+    @staticmethod
+    def _copy_rows(db: Session, table, where) -> int:
+        """INSERT INTO <table>_archive SELECT ... FROM <table> WHERE ..."""
+        archive = archive_tables[table.name]
+        columns = [c.name for c in table.columns]
+        source = [
+            func.coalesce(table.c.created_at, func.now()) if name == "created_at" else table.c[name]
+            for name in columns
+        ]
+        result = db.execute(
+            insert(archive).from_select(columns, select(*source).where(where))
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _archive_batch(db: Session, requisition_ids: List[int]) -> Dict[str, int]:
+        """Move one batch of requisitions and everything hanging off them, in one transaction"""
+        detail_ids = select(PurchaseRequisitionDetail.id).where(
+            PurchaseRequisitionDetail.requisition_id.in_(requisition_ids)
+        )
+
+        # (table, rows of that table belonging to the batch), parents first
+        plan = [
+            (Requisition.__table__, Requisition.id.in_(requisition_ids)),
+            (RequisitionApproval.__table__, RequisitionApproval.requisition_id.in_(requisition_ids)),
+            (PurchaseRequisitionDetail.__table__, PurchaseRequisitionDetail.requisition_id.in_(requisition_ids)),
+            (PurchaseRequisitionItem.__table__, PurchaseRequisitionItem.purchase_requisition_detail_id.in_(detail_ids)),
+            (PersonalExpenseDetail.__table__, PersonalExpenseDetail.requisition_id.in_(requisition_ids)),
+            (TravelExpenseDetail.__table__, TravelExpenseDetail.requisition_id.in_(requisition_ids)),
+        ]
+
+        counts = {}
+        try:
+            for table, where in plan:
+                counts[table.name] = ArchiveService._copy_rows(db, table, where)
+            # Children first so foreign keys hold while deleting
+            for table, where in reversed(plan):
+                db.execute(delete(table).where(where))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return counts
+
+    @staticmethod
+    def archive_requisitions(
+        db: Session,
+        older_than_months: int,
+        batch_size: int = 500,
+        max_batches: Optional[int] = None,
+        include_deleted: bool = True,
+    ) -> Dict[str, int]:
+        """
+        Move closed (approved, rejected, cancelled) requisitions created more
+        than ``older_than_months`` ago to the archive tables, together with
+        their approvals and details. Soft-deleted requisitions are archived too
+        unless ``include_deleted`` is False.
+
+        Works in batches of ``batch_size`` requisitions, each in its own short
+        transaction, so row locks on the hot tables are held only briefly.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=30 * older_than_months)
+        conditions = [Requisition.current_status_id.in_(CLOSED_STATUSES)]
+        if include_deleted:
+            conditions.append(Requisition.deleted_at.is_not(None))
+
+        totals: Dict[str, int] = {}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            requisition_ids = db.scalars(
+                select(Requisition.id)
+                .where(or_(*conditions), Requisition.created_at < cutoff)
+                .order_by(Requisition.id)
+                .limit(batch_size)
+            ).all()
+            if not requisition_ids:
+                break
+
+            counts = ArchiveService._archive_batch(db, list(requisition_ids))
+            for table, count in counts.items():
+                totals[table] = totals.get(table, 0) + count
+            batches += 1
+            logger.info("Archived batch %d: %s", batches, counts)
+
+        totals["batches"] = batches
+        return totals
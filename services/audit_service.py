@@ -0,0 +1,34 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from models.orm_models import AuditEvent
+
+class AuditService:
+    @staticmethod
+    def get_events(
+        db: Session,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        actor_id: Optional[int] = None,
+        action: Optional[str] = None,
+        before_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[AuditEvent]:
+        """
+        Newest first. Filtering by entity or actor walks one of the audit
+        indexes in id order; pass the smallest id of a page as before_id to get
+        the next one.
+        """
+        query = select(AuditEvent)
+        if entity_type is not None:
+            query = query.where(AuditEvent.entity_type == entity_type)
+        if entity_id is not None:
+            query = query.where(AuditEvent.entity_id == entity_id)
+        if actor_id is not None:
+            query = query.where(AuditEvent.actor_id == actor_id)
+        if action is not None:
+            query = query.where(AuditEvent.action == action)
+        if before_id is not None:
+            query = query.where(AuditEvent.id < before_id)
+        return list(db.scalars(query.order_by(AuditEvent.id.desc()).limit(limit)))
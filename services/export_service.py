@@ -0,0 +1,244 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+from datetime import date, datetime, timedelta
+import csv
+import io
+import logging
+import os
+import time
+import uuid
+
+from core.cache import get_cache
+from core.config import settings
+from core.database import SessionLocal, replica_router
+from models.orm_models import (
+    Department,
+    PurchaseRequisitionDetail,
+    PurchaseRequisitionItem,
+    Requisition,
+    RequisitionStatus,
+    RequisitionType,
+    Site,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    ("requisition_number", Requisition.requisition_number),
+    ("requisition_type", RequisitionType.code),
+    ("department", Department.code),
+    ("initiator", User.email),
+    ("status", RequisitionStatus.name),
+    ("total_amount", Requisition.total_amount),
+    ("submission_date", Requisition.submission_date),
+    ("created_at", Requisition.created_at),
+    ("site", Site.mnemonic),
+    ("po_number", PurchaseRequisitionDetail.po_number),
+    ("suggested_supplier", PurchaseRequisitionDetail.suggested_supplier),
+    ("item_quantity", PurchaseRequisitionItem.quantity),
+    ("item_unit_measure", PurchaseRequisitionItem.unit_measure),
+    ("item_unit_price", PurchaseRequisitionItem.unit_price),
+    ("item_vendor_catalogue_number", PurchaseRequisitionItem.vendor_catalogue_number),
+    ("item_eoc_cip", PurchaseRequisitionItem.eoc_cip),
+    ("item_description", PurchaseRequisitionItem.description),
+    ("item_total", PurchaseRequisitionItem.total),
+]
+
+# Rows fetched from the server-side cursor per round trip
+FETCH_SIZE = 1000
+# Rows buffered before a CSV chunk is handed to the response
+CSV_CHUNK_ROWS = 500
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+_export_jobs = get_cache("export_jobs", default_ttl=settings.EXPORT_JOB_TTL_HOURS * 3600)
+
+class ExportService:
+    @staticmethod
+    def requisition_rows_query(
+        created_from: Optional[date] = None,
+        created_to: Optional[date] = None,
+        department_id: Optional[int] = None,
+    ):
+        """One row per purchase line item (or per requisition without items)"""
+        query = (
+            select(*[column for _, column in EXPORT_COLUMNS])
+            .select_from(Requisition)
+            .join(RequisitionType, Requisition.requisition_type_id == RequisitionType.id)
+            .join(Department, Requisition.department_id == Department.id)
+            .join(User, Requisition.initiator_id == User.id)
+            .join(RequisitionStatus, Requisition.current_status_id == RequisitionStatus.id)
+            .outerjoin(PurchaseRequisitionDetail, PurchaseRequisitionDetail.requisition_id == Requisition.id)
+            .outerjoin(Site, PurchaseRequisitionDetail.site_id == Site.id)
+            .outerjoin(
+                PurchaseRequisitionItem,
+                PurchaseRequisitionItem.purchase_requisition_detail_id == PurchaseRequisitionDetail.id,
+            )
+            .where(Requisition.deleted_at.is_(None))
+            .order_by(Requisition.id, PurchaseRequisitionItem.id)
+        )
+        if created_from:
+            query = query.where(Requisition.created_at >= created_from)
+        if created_to:
+            query = query.where(Requisition.created_at < created_to + timedelta(days=1))
+        if department_id:
+            query = query.where(Requisition.department_id == department_id)
+        return query
+
+    @staticmethod
+    def iter_requisition_rows(db: Session, **filters) -> Iterator[Sequence[Any]]:
+        """
+        Stream rows from a server-side cursor, holding at most FETCH_SIZE rows
+        in memory regardless of how many the export contains.
+        """
+        result = db.execute(
+            ExportService.requisition_rows_query(**filters).execution_options(
+                stream_results=True, yield_per=FETCH_SIZE
+            )
+        )
+        try:
+            for row in result:
+                yield row
+        finally:
+            result.close()
+
+    @staticmethod
+    def stream_requisitions(**filters) -> Iterator[Sequence[Any]]:
+        """Like iter_requisition_rows, with its own read session closed when the stream ends"""
+        db = SessionLocal(bind=replica_router.pick())
+        try:
+            yield from ExportService.iter_requisition_rows(db, **filters)
+        finally:
+            db.close()
+
+    @staticmethod
+    def escape_formulas(row: Sequence[Any]) -> list:
+        """Prefix text cells that would be read as a formula with a quote (free-text fields are user input)"""
+        return [
+            f"'{value}" if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+            for value in row
+        ]
+
+    @staticmethod
+    def csv_chunks(rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+        """
+        Encode rows as CSV in chunks. Used as a StreamingResponse body the next
+        chunk is only produced once the previous one has been sent, so a slow
+        client slows the cursor down instead of filling worker memory.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for name, _ in EXPORT_COLUMNS])
+
+        pending = 0
+        for row in rows:
+            writer.writerow(ExportService.escape_formulas(row))
+            pending += 1
+            if pending >= CSV_CHUNK_ROWS:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        yield buffer.getvalue().encode()
+
+    @staticmethod
+    def write_xlsx(rows: Iterable[Sequence[Any]], path: str) -> None:
+        """Write rows to an XLSX file with openpyxl's constant-memory write-only mode"""
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise RuntimeError("XLSX export requires the 'openpyxl' package (pip install openpyxl)") from e
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Requisitions")
+        sheet.append([name for name, _ in EXPORT_COLUMNS])
+        for row in rows:
+            sheet.append(ExportService.escape_formulas(row))
+        workbook.save(path)
+
+    @staticmethod
+    def write_file(rows: Iterable[Sequence[Any]], export_format: str, path: str) -> None:
+        if export_format == "xlsx":
+            ExportService.write_xlsx(rows, path)
+            return
+        with open(path, "wb") as f:
+            for chunk in ExportService.csv_chunks(rows):
+                f.write(chunk)
+
+    # Background export jobs. Job metadata lives in the export_jobs cache: with
+    # the Redis backend any worker can report on a job, with the memory backend
+    # only the worker that started it. The file is written under EXPORT_DIR on
+    # that worker's host, and deleted after EXPORT_JOB_TTL_HOURS like the job.
+
+    @staticmethod
+    def create_job(export_format: str, requested_by: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "format": export_format,
+            "status": "pending",
+            "requested_by": requested_by,
+            "filters": {k: v.isoformat() if isinstance(v, date) else v for k, v in filters.items()},
+            "created_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "error": None,
+        }
+        _export_jobs.set(job_id, job)
+        return job
+
+    @staticmethod
+    def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+        return _export_jobs.get(job_id)
+
+    @staticmethod
+    def job_path(job: Dict[str, Any]) -> str:
+        return os.path.join(settings.EXPORT_DIR, f"{job['id']}.{job['format']}")
+
+    @staticmethod
+    def delete_expired_files(now: Optional[float] = None) -> int:
+        """Delete export files (and leftover partial ones) older than the job TTL"""
+        cutoff = (now if now is not None else time.time()) - settings.EXPORT_JOB_TTL_HOURS * 3600
+        deleted = 0
+        try:
+            entries = list(os.scandir(settings.EXPORT_DIR))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    deleted += 1
+            except FileNotFoundError:
+                # Removed by another worker in the meantime
+                pass
+        return deleted
+
+    @staticmethod
+    def run_job(job_id: str, filters: Dict[str, Any]) -> None:
+        job = _export_jobs.get(job_id)
+        if not job:
+            return
+        # Files outlive their job metadata otherwise; sweep when a new export starts
+        try:
+            ExportService.delete_expired_files()
+        except OSError:
+            logger.exception("Failed to delete expired export files")
+        job["status"] = "running"
+        _export_jobs.set(job_id, job)
+
+        path = ExportService.job_path(job)
+        tmp_path = f"{path}.part"
+        try:
+            os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+            ExportService.write_file(ExportService.stream_requisitions(**filters), job["format"], tmp_path)
+            os.replace(tmp_path, path)
+            job["status"] = "completed"
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            job["status"] = "failed"
+            job["error"] = str(e)
+        job["finished_at"] = datetime.utcnow().isoformat()
+        _export_jobs.set(job_id, job)
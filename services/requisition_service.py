@@ -0,0 +1,113 @@
+from sqlalchemy import literal, or_, select, union_all
+from sqlalchemy.orm import Session
+from typing import Any, Collection, Dict, List, Optional
+
+from models.orm_models import Requisition, RequisitionApproval, archive_tables
+
+REQUISITION_COLUMNS = [c.name for c in Requisition.__table__.columns]
+APPROVAL_COLUMNS = [c.name for c in RequisitionApproval.__table__.columns]
+
+class RequisitionService:
+    # Reads take an optional visibility scope: with visible_to set, only the
+    # requisitions of visible_departments and those initiated by visible_to
+    # are returned. Sys admins read without a scope.
+
+    @staticmethod
+    def _visible(table, visible_to: Optional[int], visible_departments: Collection[int]):
+        if visible_to is None:
+            return None
+        return or_(table.c.department_id.in_(list(visible_departments)), table.c.initiator_id == visible_to)
+
+    @staticmethod
+    def _requisitions_select(
+        table,
+        archived: bool,
+        department_id: Optional[int],
+        status_id: Optional[int],
+        visible_to: Optional[int] = None,
+        visible_departments: Collection[int] = (),
+    ):
+        query = select(*[table.c[name] for name in REQUISITION_COLUMNS], literal(archived).label("archived"))
+        query = query.where(table.c.deleted_at.is_(None))
+        visible = RequisitionService._visible(table, visible_to, visible_departments)
+        if visible is not None:
+            query = query.where(visible)
+        if department_id is not None:
+            query = query.where(table.c.department_id == department_id)
+        if status_id is not None:
+            query = query.where(table.c.current_status_id == status_id)
+        return query
+
+    @staticmethod
+    def get_requisitions(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        department_id: Optional[int] = None,
+        status_id: Optional[int] = None,
+        include_archive: bool = False,
+        visible_to: Optional[int] = None,
+        visible_departments: Collection[int] = (),
+    ) -> List[Dict[str, Any]]:
+        """Newest first. With include_archive the archived requisitions are merged in."""
+        scope = (visible_to, visible_departments)
+        hot = RequisitionService._requisitions_select(Requisition.__table__, False, department_id, status_id, *scope)
+        if not include_archive:
+            query = hot.order_by(Requisition.created_at.desc(), Requisition.id.desc()).offset(skip).limit(limit)
+            return [dict(row._mapping) for row in db.execute(query)]
+
+        # Each side only needs its first skip + limit rows before merging
+        archive = archive_tables["requisitions"]
+        parts = []
+        for table, query in [
+            (Requisition.__table__, hot),
+            (archive, RequisitionService._requisitions_select(archive, True, department_id, status_id, *scope)),
+        ]:
+            part = query.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(skip + limit).subquery()
+            parts.append(select(part))
+        merged = union_all(*parts).subquery()
+        query = (
+            select(merged)
+            .order_by(merged.c.created_at.desc(), merged.c.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    @staticmethod
+    def get_requisition_by_id(
+        db: Session,
+        requisition_id: int,
+        include_archive: bool = False,
+        visible_to: Optional[int] = None,
+        visible_departments: Collection[int] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """The requisition with its approval chain, looked up in the archive if asked to and not found"""
+        tables = [(Requisition.__table__, RequisitionApproval.__table__, False)]
+        if include_archive:
+            tables.append((archive_tables["requisitions"], archive_tables["requisition_approvals"], True))
+
+        for requisitions, approvals, archived in tables:
+            query = select(*[requisitions.c[name] for name in REQUISITION_COLUMNS]).where(
+                requisitions.c.id == requisition_id,
+                requisitions.c.deleted_at.is_(None),
+            )
+            visible = RequisitionService._visible(requisitions, visible_to, visible_departments)
+            if visible is not None:
+                query = query.where(visible)
+            row = db.execute(query).first()
+            if row is None:
+                continue
+
+            requisition = dict(row._mapping)
+            requisition["archived"] = archived
+            requisition["approvals"] = [
+                dict(approval._mapping)
+                for approval in db.execute(
+                    select(*[approvals.c[name] for name in APPROVAL_COLUMNS])
+                    .where(approvals.c.requisition_id == requisition_id)
+                    .order_by(approvals.c.approval_level)
+                )
+            ]
+            return requisition
+        return None
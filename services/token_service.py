@@ -0,0 +1,145 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, update
+from typing import Optional, Tuple
+from datetime import datetime
+import hashlib
+import secrets
+import uuid
+
+from core.config import settings
+from core.revocation import revocation_list
+from models.orm_models import RefreshToken, RevokedToken, User
+
+class RefreshTokenReuseError(Exception):
+    """An already rotated refresh token was presented again"""
+
+class TokenService:
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _add_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> Tuple[str, RefreshToken]:
+        """Add a new refresh token to the session (flushed, not committed)"""
+        raw_token = secrets.token_urlsafe(48)
+        db_token = RefreshToken(
+            user_id=user_id,
+            family_id=family_id or str(uuid.uuid4()),
+            token_hash=TokenService.hash_token(raw_token),
+            expires_at=datetime.utcnow() + settings.refresh_token_expires,
+        )
+        db.add(db_token)
+        db.flush()
+        return raw_token, db_token
+
+    @staticmethod
+    def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> Tuple[str, RefreshToken]:
+        """
+        Create a new refresh token for the user. Only its hash is stored, the
+        raw token is returned to be handed to the client.
+        """
+        raw_token, db_token = TokenService._add_refresh_token(db, user_id, family_id)
+        db.commit()
+        return raw_token, db_token
+
+    @staticmethod
+    def rotate_refresh_token(db: Session, raw_token: str) -> Optional[Tuple[User, str]]:
+        """
+        Exchange a refresh token for a new one in the same family.
+
+        Returns None for unknown or expired tokens. Presenting a token that was
+        already rotated means it leaked: the whole family is revoked and
+        RefreshTokenReuseError is raised.
+
+        The old token is claimed with a conditional UPDATE and its successor is
+        inserted in the same transaction, so of two concurrent refreshes with
+        the same token only one wins; the other is treated as reuse.
+        """
+        db_token = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == TokenService.hash_token(raw_token)
+        ).first()
+        if not db_token:
+            return None
+
+        if db_token.revoked_at is not None:
+            return TokenService._reject_spent_token(db, db_token)
+
+        if db_token.expires_at <= datetime.utcnow():
+            return None
+
+        user = db.query(User).filter(
+            and_(User.id == db_token.user_id, User.deleted_at.is_(None))
+        ).first()
+        if not user:
+            return None
+
+        try:
+            claimed = db.execute(
+                update(RefreshToken)
+                .where(RefreshToken.id == db_token.id, RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed != 1:
+                # Rotated or revoked by a concurrent request since we read it
+                db.rollback()
+                db.refresh(db_token)
+                return TokenService._reject_spent_token(db, db_token)
+
+            new_raw_token, new_token = TokenService._add_refresh_token(db, user.id, db_token.family_id)
+            db.execute(
+                update(RefreshToken)
+                .where(RefreshToken.id == db_token.id)
+                .values(replaced_by_id=new_token.id)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return user, new_raw_token
+
+    @staticmethod
+    def _reject_spent_token(db: Session, db_token: RefreshToken) -> None:
+        """A revoked token was presented: if it had been rotated, revoke its family and raise"""
+        if db_token.replaced_by_id is not None:
+            TokenService.revoke_family(db, db_token.family_id)
+            raise RefreshTokenReuseError()
+        return None
+
+    @staticmethod
+    def revoke_family(db: Session, family_id: str) -> int:
+        count = db.query(RefreshToken).filter(
+            and_(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        return count
+
+    @staticmethod
+    def revoke_refresh_token(db: Session, raw_token: str) -> bool:
+        """Revoke the family of the given refresh token (logout)"""
+        db_token = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == TokenService.hash_token(raw_token)
+        ).first()
+        if not db_token:
+            return False
+        TokenService.revoke_family(db, db_token.family_id)
+        return True
+
+    @staticmethod
+    def revoke_user_refresh_tokens(db: Session, user_id: int, commit: bool = True) -> int:
+        """Revoke every refresh token family of a user, e.g. when the user is deleted"""
+        count = db.query(RefreshToken).filter(
+            and_(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+        if commit:
+            db.commit()
+        return count
+
+    @staticmethod
+    def revoke_access_token(db: Session, jti: str, expires_at: datetime) -> None:
+        """Deny an access token until it expires, effective immediately in this worker"""
+        if not db.get(RevokedToken, jti):
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            db.commit()
+        revocation_list.add(jti, expires_at)
@@ -3,8 +3,10 @@ from sqlalchemy import and_, or_, not_
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from core.audit import audit_log
 from models.orm_models import User, Department, Role, DepartmentUserRole
 from models.user import UserCreate, UserUpdate
+from services.token_service import TokenService
 
 class UserService:
     @staticmethod
@@ -24,7 +26,7 @@ class UserService:
         ).first()
     
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
+    def create_user(db: Session, user: UserCreate, actor_id: Optional[int] = None) -> User:
         db_user = User(
             first_name=user.first_name,
             last_name=user.last_name,
@@ -36,10 +38,11 @@ class UserService:
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        audit_log.record("user.create", "user", db_user.id, actor_id=actor_id)
         return db_user
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
+    def update_user(db: Session, user_id: int, user: UserUpdate, actor_id: Optional[int] = None) -> Optional[User]:
         db_user = UserService.get_user_by_id(db, user_id)
         if not db_user:
             return None
@@ -61,17 +64,22 @@ class UserService:
         db_user.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(db_user)
+        # Field names only, values (passwords!) stay out of the trail
+        changed = [name for name, value in user.model_dump().items() if value is not None]
+        audit_log.record("user.update", "user", user_id, actor_id=actor_id, details={"fields": changed})
         return db_user
     
     @staticmethod
-    def delete_user(db: Session, user_id: int) -> bool:
+    def delete_user(db: Session, user_id: int, actor_id: Optional[int] = None) -> bool:
         db_user = UserService.get_user_by_id(db, user_id)
         if not db_user:
             return False
             
-        # Soft delete
+        # Soft delete, and end the user's sessions in the same transaction
         db_user.deleted_at = datetime.utcnow()
+        TokenService.revoke_user_refresh_tokens(db, user_id, commit=False)
         db.commit()
+        audit_log.record("user.delete", "user", user_id, actor_id=actor_id)
         return True
     
     @staticmethod
@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+import models.orm_models  # noqa: F401  (registers the tables)
+
+
+@pytest.fixture
+def db_sessions(tmp_path):
+    """Session factory on a throwaway SQLite database with the full schema"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_sessions):
+    session = db_sessions()
+    yield session
+    session.close()
@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+import pytest
+
+from controllers.approvals import resolve_approvers
+from core import audit
+from core.org_index import org_index
+from models.approval_decision import BatchDecisionRequest
+from models.orm_models import (
+    Department,
+    DepartmentUserRole,
+    FlowApprovalRule,
+    Requisition,
+    RequisitionApproval,
+    User,
+)
+from models.requisition_status import RequisitionStatus
+from services import approval_service
+from services.approval_service import ApprovalService
+
+PENDING = RequisitionStatus.PENDING.value
+APPROVED = RequisitionStatus.APPROVED.value
+DELEGATE, MANAGER, DIRECTOR = 3, 5, 6
+INITIATOR, DELEGATE_USER, MANAGER_USER = 1, 2, 3
+
+
+@pytest.fixture
+def org(db, monkeypatch):
+    monkeypatch.setattr(audit.audit_log, "record", lambda *args, **kwargs: None)
+    approval_service._flow_rules_cache.clear()
+    db.add(Department(id=1, name="IT", code="IT"))
+    for user_id in (INITIATOR, DELEGATE_USER, MANAGER_USER):
+        db.add(User(id=user_id, first_name="U", last_name=str(user_id), email=f"u{user_id}@example.com", password="x"))
+    db.flush()
+    db.add_all([
+        DepartmentUserRole(department_id=1, user_id=INITIATOR, role_id=DELEGATE),
+        DepartmentUserRole(department_id=1, user_id=DELEGATE_USER, role_id=DELEGATE),
+        DepartmentUserRole(department_id=1, user_id=DELEGATE_USER, role_id=MANAGER),
+        DepartmentUserRole(department_id=1, user_id=MANAGER_USER, role_id=MANAGER),
+    ])
+    for level, role_id, low, high in [(1, DELEGATE, "0", "999.99"), (2, MANAGER, "1000", "4999.99"), (3, DIRECTOR, "5000", "24999.99")]:
+        db.add(FlowApprovalRule(
+            flow_version_id=1, role_id=role_id, approval_level=level,
+            min_amount=Decimal(low), max_amount=Decimal(high),
+        ))
+    db.commit()
+    # Restore the shared index afterwards
+    for name in ("_by_user", "_by_department", "_loaded"):
+        monkeypatch.setattr(org_index, name, getattr(org_index, name))
+    org_index.load(db)
+
+
+def add_requisition(db, id, total, chain, department_id=1, initiator_id=INITIATOR):
+    """chain: (level, role_id, status_id, approver_id) per step"""
+    db.add(Requisition(
+        id=id, requisition_number=f"PR-{id}", requisition_type_id=1, flow_id=1, flow_version_id=1,
+        department_id=department_id, initiator_id=initiator_id, current_status_id=PENDING, total_amount=Decimal(total),
+    ))
+    db.flush()
+    for level, role_id, status_id, approver_id in chain:
+        db.add(RequisitionApproval(
+            requisition_id=id, approval_level=level, role_id=role_id, status_id=status_id, approver_id=approver_id,
+        ))
+    db.commit()
+
+
+def decide(db, user_id, *requisition_ids, decision="approve"):
+    request = BatchDecisionRequest(requisition_ids=list(requisition_ids), decision=decision)
+    return {r.requisition_id: r for r in ApprovalService.batch_decide(db, user_id, request).results}
+
+
+def test_cannot_approve_own_requisition(db, org):
+    add_requisition(db, 1, "100", [(1, DELEGATE, PENDING, None)])
+    result = decide(db, INITIATOR, 1)[1]
+    assert not result.success
+    assert result.detail == "Cannot approve your own requisition"
+    assert decide(db, DELEGATE_USER, 1)[1].success
+
+
+def test_cannot_approve_consecutive_levels(db, org):
+    chain = [(1, DELEGATE, APPROVED, DELEGATE_USER), (2, MANAGER, PENDING, None)]
+    add_requisition(db, 1, "2000", chain)
+    add_requisition(db, 2, "2000", chain)
+    results = decide(db, DELEGATE_USER, 1)
+    assert results[1].detail == "Already approved the previous level"
+    assert decide(db, MANAGER_USER, 2)[2].success
+
+
+def test_amount_range_of_the_step(db, org):
+    # Below the manager level's range: this step should not be in the chain
+    add_requisition(db, 1, "500", [(1, DELEGATE, APPROVED, MANAGER_USER), (2, MANAGER, PENDING, None)])
+    # Final approval above the manager's limit
+    add_requisition(db, 2, "7000", [(1, DELEGATE, APPROVED, MANAGER_USER), (2, MANAGER, PENDING, None)])
+    # Above the limit but not the last level: a director approves after
+    add_requisition(db, 3, "7000", [
+        (1, DELEGATE, APPROVED, MANAGER_USER), (2, MANAGER, PENDING, None), (3, DIRECTOR, PENDING, None),
+    ])
+
+    results = decide(db, DELEGATE_USER, 1, 2, 3)
+    assert results[1].detail == "Amount is below the range of this approval level"
+    assert results[2].detail == "Amount exceeds the approval limit of this level"
+    assert results[3].success
+    assert results[3].requisition_status_id == RequisitionStatus.IN_PROGRESS.value
+    # Rejecting is allowed whatever the amount
+    assert decide(db, DELEGATE_USER, 2, decision="reject")[2].success
+
+
+def test_resolve_approvers_leaves_out_requisitions_the_user_cannot_see(db, org):
+    db.add(Department(id=2, name="HR", code="HR"))
+    db.add(User(id=4, first_name="U", last_name="4", email="u4@example.com", password="x"))
+    db.commit()
+    add_requisition(db, 1, "100", [(1, DELEGATE, PENDING, None)])
+    add_requisition(db, 2, "100", [(1, DELEGATE, PENDING, None)], department_id=2)
+    add_requisition(db, 3, "100", [(1, DELEGATE, PENDING, None)], department_id=2, initiator_id=DELEGATE_USER)
+
+    def visible(email, **claims):
+        chains = resolve_approvers(requisition_id=[1, 2, 3], current_user={"sub": email, **claims}, db=db)
+        return [chain.requisition_id for chain in chains]
+
+    # Member of department 1, initiator of requisition 3
+    assert visible("u2@example.com") == [1, 3]
+    # No role anywhere, nothing initiated
+    assert visible("u4@example.com") == []
+    assert visible("u4@example.com", is_sys_admin=True) == [1, 2, 3]
+    chain = resolve_approvers(requisition_id=[1], current_user={"sub": "u2@example.com"}, db=db)[0]
+    assert chain.steps[0].user_ids == [INITIATOR, DELEGATE_USER]
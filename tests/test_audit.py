@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from core import audit
+from core.audit import AuditLog
+from models.orm_models import AuditEvent
+
+
+@pytest.fixture
+def log(db_sessions, monkeypatch):
+    monkeypatch.setattr(audit, "SessionLocal", db_sessions)
+    log = AuditLog(batch_size=10, flush_interval=1, max_queue=100, max_string_length=20)
+    # Queue only, as if the flush loop were running
+    log._loop = SimpleNamespace(call_soon_threadsafe=lambda callback: None)
+    log._wake = SimpleNamespace(set=None)
+    return log
+
+
+def test_flush_writes_batches(log, db):
+    for i in range(25):
+        log.record("user.update", "user", i, actor_id=1)
+    assert log.flush() == 25
+    assert db.query(AuditEvent).count() == 25
+    assert log.stats()["queued"] == 0
+
+
+def test_rejected_rows_are_dropped_and_the_rest_written(log, db):
+    log.record("user.update", "user", 1)
+    log.record(None, "user", 2)  # violates NOT NULL
+    log.record("user.update", "user", 3)
+    assert log.flush() == 2
+    assert sorted(e.entity_id for e in db.query(AuditEvent)) == [1, 3]
+    assert log.stats()["rejected"] == 1
+    assert log.stats()["queued"] == 0
+
+
+def test_events_are_kept_while_the_database_is_unavailable(log, db):
+    db.execute(text("alter table audit_events rename to audit_events_moved"))
+    db.commit()
+    log.record("user.update", "user", 1)
+    log.record("user.update", "user", 2)
+    with pytest.raises(OperationalError):
+        log.flush()
+    assert log.stats()["queued"] == 2
+    assert log.stats()["rejected"] == 0
+
+    db.execute(text("alter table audit_events_moved rename to audit_events"))
+    db.commit()
+    assert log.flush() == 2
+    assert [e.entity_id for e in db.query(AuditEvent).order_by(AuditEvent.id)] == [1, 2]
+
+
+def test_untrusted_strings_are_truncated(log, db):
+    log.record(
+        "auth.login_failed", "user",
+        ip_address="1" * 100,
+        details={"email": "x" * 5000, "nested": {"list": ["y" * 50]}, "count": 3},
+    )
+    log.flush()
+    event = db.query(AuditEvent).one()
+    assert len(event.ip_address) == 45
+    assert event.details == (
+        '{"email":"' + "x" * 20 + '...","nested":{"list":["' + "y" * 20 + '..."]},"count":3}'
+    )
@@ -0,0 +1,264 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from core.cache import _MISSING, CacheNamespace, MemoryCacheBackend, RedisCacheBackend
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def redis_backend(server, **kwargs) -> RedisCacheBackend:
+    """One 'worker' talking to the shared fake server"""
+    return RedisCacheBackend(client=fakeredis.FakeRedis(server=server), **kwargs)
+
+
+# MemoryCacheBackend
+
+def test_memory_get_set_delete():
+    backend = MemoryCacheBackend()
+    assert backend.get("a") is _MISSING
+    backend.set("a", {"x": 1})
+    assert backend.get("a") == {"x": 1}
+    backend.delete("a")
+    assert backend.get("a") is _MISSING
+
+
+def test_memory_ttl_eviction():
+    backend = MemoryCacheBackend()
+    backend.set("a", 1, ttl=0.05)
+    backend.set("b", 2)
+    assert backend.get("a") == 1
+    time.sleep(0.06)
+    assert backend.get("a") is _MISSING
+    assert backend.get("b") == 2
+
+
+def test_memory_pop():
+    backend = MemoryCacheBackend()
+    backend.set("a", 1)
+    backend.set("b", 2, ttl=0.01)
+    assert backend.pop("a") == 1
+    assert backend.pop("a") is _MISSING
+    time.sleep(0.02)
+    assert backend.pop("b") is _MISSING
+
+
+def test_memory_lru_eviction():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("b") is _MISSING
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+
+
+def test_memory_clear_prefix_notifies_subscribers():
+    backend = MemoryCacheBackend()
+    seen = []
+    backend.subscribe_invalidations(lambda key, prefix: seen.append((key, prefix)))
+    backend.set("users:1", 1)
+    backend.set("roles:1", 1)
+    backend.clear("users:")
+    assert backend.get("users:1") is _MISSING
+    assert backend.get("roles:1") == 1
+    assert seen == [("", "users:")]
+
+
+# CacheNamespace
+
+def test_get_or_load_single_flight():
+    cache = CacheNamespace("t", MemoryCacheBackend())
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 8
+    assert cache.loads == 1
+
+
+def test_get_or_load_keeps_lock_while_threads_wait():
+    """A thread arriving after the loader finished must not get a fresh lock while others still wait"""
+    backend = MemoryCacheBackend()
+    cache = CacheNamespace("t", backend)
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(1)
+        # Don't leave a value behind, so every waiter has to go through the lock
+        raise RuntimeError("boom")
+
+    def run():
+        try:
+            cache.get_or_load("k", loader)
+        except RuntimeError:
+            pass
+
+    first = threading.Thread(target=run)
+    first.start()
+    assert wait_for(lambda: calls)
+    waiters = [threading.Thread(target=run) for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+    assert wait_for(lambda: cache._inflight["t:k"][1] == 4)
+    release.set()
+    first.join()
+    for thread in waiters:
+        thread.join()
+
+    # Each failed load is retried by the next waiter, one at a time, and the
+    # entry is only dropped once the last of them is done
+    assert len(calls) == 4
+    assert cache._inflight == {}
+
+
+def test_get_or_load_loader_error_is_not_cached():
+    cache = CacheNamespace("t", MemoryCacheBackend())
+    with pytest.raises(ValueError):
+        cache.get_or_load("k", lambda: (_ for _ in ()).throw(ValueError("x")))
+    assert cache.load_errors == 1
+    assert cache.get_or_load("k", lambda: 42) == 42
+
+
+def test_namespace_on_invalidate():
+    backend = MemoryCacheBackend()
+    users = CacheNamespace("users", backend)
+    seen = []
+    users.on_invalidate(seen.append)
+    CacheNamespace("roles", backend).delete(1)
+    users.delete(7)
+    users.clear()
+    assert seen == ["7", ""]
+
+
+# RedisCacheBackend (fakeredis)
+
+def test_redis_values_are_shared_between_workers(server):
+    a = redis_backend(server, local_ttl=0)
+    b = redis_backend(server, local_ttl=0)
+    a.set("k", {"v": 1})
+    assert b.get("k") == {"v": 1}
+    b.delete("k")
+    assert a.get("k") is _MISSING
+
+
+def test_redis_pop_is_single_use_across_workers(server):
+    a = CacheNamespace("t", redis_backend(server, local_ttl=60))
+    b = CacheNamespace("t", redis_backend(server, local_ttl=60))
+    a.set("ticket", {"sub": "x"})
+    assert b.pop("ticket") == {"sub": "x"}
+    # Gone from a's local copy as well
+    assert a.pop("ticket") is None
+    assert a.get("ticket") is None
+
+
+def test_redis_ttl_eviction(server):
+    backend = redis_backend(server, local_ttl=0)
+    backend.set("k", 1, ttl=0.05)
+    assert backend.get("k") == 1
+    time.sleep(0.1)
+    assert backend.get("k") is _MISSING
+
+
+def test_redis_cross_worker_invalidation(server):
+    a = redis_backend(server, local_ttl=60)
+    b = redis_backend(server, local_ttl=60)
+    seen = []
+    b.subscribe_invalidations(lambda key, prefix: seen.append((key, prefix)))
+    time.sleep(0.1)
+
+    a.set("k", 1)
+    assert b.get("k") == 1  # now in b's local copy
+    a.delete("k")
+    assert wait_for(lambda: ("k", None) in seen)
+    assert b.get("k") is _MISSING
+
+    a.set("p:1", 1)
+    b.get("p:1")
+    a.clear("p:")
+    assert wait_for(lambda: ("", "p:") in seen)
+    assert b.local.get("p:1") is _MISSING
+
+
+def test_redis_listener_reconnects(server, monkeypatch):
+    monkeypatch.setattr(RedisCacheBackend, "RECONNECT_MIN_SECONDS", 0.01)
+    a = redis_backend(server, local_ttl=60)
+    b = redis_backend(server, local_ttl=60)
+    real_pubsub = b.client.pubsub
+    connections = []
+
+    def pubsub(**kwargs):
+        connection = real_pubsub(**kwargs)
+        if not connections:
+            # The first connection drops as soon as it starts listening
+            def listen():
+                raise ConnectionError("connection reset")
+            connection.listen = listen
+        connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(b.client, "pubsub", pubsub)
+    seen = []
+    b.subscribe_invalidations(lambda key, prefix: seen.append((key, prefix)))
+
+    # After reconnecting, everything local is dropped since messages may have been missed
+    assert wait_for(lambda: ("", "") in seen)
+    assert len(connections) == 2
+    assert b._listener.is_alive()
+
+    time.sleep(0.05)
+    a.delete("k")
+    assert wait_for(lambda: ("k", None) in seen)
+
+
+def test_redis_single_flight_across_workers(server):
+    a = CacheNamespace("t", redis_backend(server, local_ttl=0))
+    b = CacheNamespace("t", redis_backend(server, local_ttl=0))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return "v"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda ns=ns: results.append(ns.get_or_load("k", loader)))
+        for ns in (a, b)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["v", "v"]
+    assert len(calls) == 1
@@ -0,0 +1,60 @@
+import gzip
+
+import pytest
+
+from core import compression
+from core.cache import MemoryCacheBackend, get_backend
+from core.compression import CompressionMiddleware, choose_encoding
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=0, *", None),
+    ("*, gzip;q=0", None),
+    ("gzip;q=0.0, identity", None),
+    ("deflate, *;q=0", None),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=invalid", None),
+    ("identity", None),
+])
+def test_choose_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_prefers_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    # Brotli is only used when named explicitly
+    assert choose_encoding("*") == "gzip"
+
+
+def test_cacheable_bodies_use_their_own_bounded_lru(monkeypatch):
+    store = MemoryCacheBackend(max_entries=2)
+    monkeypatch.setattr(compression, "_compressed_bodies", store)
+    calls = []
+    finish = compression.Compressor.finish
+    monkeypatch.setattr(compression.Compressor, "finish", lambda self, data=b"": calls.append(1) or finish(self, data))
+    middleware = CompressionMiddleware(app=None)
+    bodies = [bytes([i]) * 2048 for i in range(3)]
+
+    first = middleware.compress_body(bodies[0], "gzip", cacheable=True)
+    assert middleware.compress_body(bodies[0], "gzip", cacheable=True) == first
+    assert gzip.decompress(first) == bodies[0]
+    assert len(calls) == 1
+
+    for body in bodies[1:]:
+        middleware.compress_body(body, "gzip", cacheable=True)
+    assert len(store._data) == 2
+    assert not any(key.startswith("compressed") for key in get_backend()._data)
+
+    # Non-cacheable responses are never stored
+    middleware.compress_body(b"x" * 2048, "gzip", cacheable=False)
+    assert len(calls) == 4
+    assert len(store._data) == 2
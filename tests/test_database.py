@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import text
+from starlette.requests import Request
+
+import core.database as database
+from core.database import ReplicaRouter
+
+
+def make_request(token="Bearer token-a", **headers):
+    raw = [(b"authorization", token.encode())] if token else []
+    raw += [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def fail_connect(replica, monkeypatch):
+    def connect(*args, **kwargs):
+        raise ConnectionError("replica down")
+    monkeypatch.setattr(replica, "connect", connect)
+
+
+@pytest.fixture
+def router(tmp_path):
+    router = ReplicaRouter([f"sqlite:///{tmp_path / f'replica{i}.db'}" for i in range(2)])
+    yield router
+    for replica in router.engines:
+        replica.dispose()
+
+
+@pytest.fixture
+def routed(db_sessions, router, monkeypatch):
+    """get_db/get_read_db on the test database as primary, with two replicas"""
+    monkeypatch.setattr(database, "SessionLocal", db_sessions)
+    monkeypatch.setattr(database, "replica_router", router)
+    database._primary_pins.clear()
+    yield db_sessions.kw["bind"]
+    database._primary_pins.clear()
+
+
+def read_bind(request):
+    dependency = database.get_read_db(request)
+    db = next(dependency)
+    try:
+        return db.get_bind()
+    finally:
+        dependency.close()
+
+
+def test_unchecked_replicas_are_not_used(router):
+    assert router.pick() is database.engine
+
+
+def test_round_robin_over_healthy_replicas(router):
+    router.check_health()
+
+    picks = [router.pick() for _ in range(4)]
+
+    assert picks == router.engines * 2
+
+
+def test_failing_replica_leaves_and_rejoins_rotation(router, monkeypatch):
+    router.check_health()
+    down, up = router.engines
+
+    with monkeypatch.context() as m:
+        fail_connect(down, m)
+        router.check_health()
+        assert router.healthy == [up]
+        assert {router.pick() for _ in range(3)} == {up}
+
+    router.check_health()
+    assert router.healthy == router.engines
+
+
+def test_falls_back_to_primary_when_all_replicas_fail(router, monkeypatch):
+    router.check_health()
+    for replica in router.engines:
+        fail_connect(replica, monkeypatch)
+
+    router.check_health()
+
+    assert router.pick() is database.engine
+
+
+def test_reads_go_to_replica_without_a_write(routed):
+    database.replica_router.check_health()
+
+    assert read_bind(make_request()) in database.replica_router.engines
+
+
+def test_client_is_pinned_to_primary_after_a_write(routed):
+    database.replica_router.check_health()
+    dependency = database.get_db(make_request())
+    db = next(dependency)
+    db.execute(text("UPDATE users SET last_login = last_login"))
+    db.commit()
+    dependency.close()
+
+    assert read_bind(make_request()) is routed
+    # Other clients keep reading from the replicas
+    assert read_bind(make_request("Bearer token-b")) in database.replica_router.engines
+
+
+def test_no_pin_without_a_write(routed):
+    database.replica_router.check_health()
+    dependency = database.get_db(make_request())
+    next(dependency)
+    dependency.close()
+
+    assert read_bind(make_request()) in database.replica_router.engines
+
+
+def test_strong_consistency_header_reads_from_primary(routed):
+    database.replica_router.check_health()
+
+    assert read_bind(make_request(x_consistency="strong")) is routed
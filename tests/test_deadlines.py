@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from core import deadlines
+from core.deadlines import Deadline, DeadlineExceeded, DeadlineMiddleware, request_deadline
+
+
+async def call(app, timeout: float):
+    """Run one request through DeadlineMiddleware, returns the messages sent"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await DeadlineMiddleware(app, timeout=timeout)({"type": "http", "path": "/", "headers": []}, receive, send)
+    return messages
+
+
+async def respond(send, status: int = 200, body: bytes = b"ok"):
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+def test_slow_handler_gets_504_and_is_cancelled():
+    cancelled = []
+
+    async def app(scope, receive, send):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        await respond(send)
+
+    messages = asyncio.run(call(app, timeout=0.02))
+    assert messages[0]["status"] == 504
+    assert cancelled == [True]
+
+
+def test_fast_handler_is_untouched():
+    async def app(scope, receive, send):
+        await respond(send)
+
+    messages = asyncio.run(call(app, timeout=1))
+    assert [m.get("status") for m in messages] == [200, None]
+
+
+def test_started_response_is_not_cut_off():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.body", "body": b"late"})
+
+    messages = asyncio.run(call(app, timeout=0.01))
+    assert messages[0]["status"] == 200
+    assert messages[-1]["body"] == b"late"
+
+
+def test_route_can_extend_its_deadline():
+    async def app(scope, receive, send):
+        await request_deadline(1)()
+        await asyncio.sleep(0.05)
+        await respond(send)
+
+    messages = asyncio.run(call(app, timeout=0.01))
+    assert messages[0]["status"] == 200
+
+
+def test_statement_after_the_deadline_is_not_run():
+    engine = create_engine("sqlite://")
+    expired = Deadline(0.001)
+    expired.expires_at -= 1
+    token = deadlines._current_deadline.set(expired)
+    try:
+        with engine.connect() as conn, pytest.raises(DeadlineExceeded):
+            conn.execute(text("select 1"))
+    finally:
+        deadlines._current_deadline.reset(token)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("select 1")).scalar() == 1
+
+
+def test_deadline_exceeded_in_handler_gets_504():
+    async def app(scope, receive, send):
+        raise DeadlineExceeded("too late")
+
+    messages = asyncio.run(call(app, timeout=1))
+    assert messages[0]["status"] == 504
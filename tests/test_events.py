@@ -0,0 +1,42 @@
+import json
+
+import fakeredis
+
+from core.events import EventBroker, RedisEventBackend
+from tests.test_cache import wait_for
+
+
+def test_redis_relay_reconnects_after_disconnect(monkeypatch):
+    monkeypatch.setattr(RedisEventBackend, "RECONNECT_MIN_SECONDS", 0.01)
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server)
+    real_pubsub = client.pubsub
+    connections = []
+
+    def pubsub(**kwargs):
+        connection = real_pubsub(**kwargs)
+        if not connections:
+            # Redis goes away while the first connection is listening
+            def listen():
+                server.connected = False
+                raise ConnectionError("connection reset")
+            connection.listen = listen
+        connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(client, "pubsub", pubsub)
+    broker = EventBroker()
+    seen = []
+    monkeypatch.setattr(broker, "dispatch", lambda topics, event: seen.append((topics, event)))
+    relay = RedisEventBackend(client, broker)
+    relay.start()
+
+    # Subscribing fails while the server is down, the relay keeps retrying
+    assert wait_for(lambda: len(connections) >= 3)
+    assert relay._listener.is_alive()
+
+    server.connected = True
+    publisher = fakeredis.FakeRedis(server=server)
+    message = json.dumps({"topics": ["user:1"], "event": {"type": "ping"}})
+    assert wait_for(lambda: publisher.publish(RedisEventBackend.CHANNEL, message) and seen)
+    assert seen[0] == (["user:1"], {"type": "ping"})
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from controllers.requisitions import export_requisitions
+from core.config import settings
+from services.export_service import EXPORT_COLUMNS, ExportService
+
+
+def test_csv_escapes_formulas():
+    rows = [
+        ("PR-1", "=HYPERLINK(\"http://evil\")", "+1", "-2", "@SUM(A1)", Decimal("-5.00"), "plain"),
+    ]
+    body = b"".join(ExportService.csv_chunks(rows)).decode()
+    header, line = body.splitlines()
+    assert header.split(",") == [name for name, _ in EXPORT_COLUMNS]
+    assert line == "PR-1,\"'=HYPERLINK(\"\"http://evil\"\")\",'+1,'-2,'@SUM(A1),-5.00,plain"
+
+
+def test_delete_expired_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EXPORT_JOB_TTL_HOURS", 1)
+    old = tmp_path / "old.csv"
+    partial = tmp_path / "stale.xlsx.part"
+    fresh = tmp_path / "fresh.csv"
+    for path in (old, partial, fresh):
+        path.write_text("x")
+    two_hours_ago = time.time() - 7200
+    os.utime(old, (two_hours_ago, two_hours_ago))
+    os.utime(partial, (two_hours_ago, two_hours_ago))
+
+    assert ExportService.delete_expired_files() == 2
+    assert [p.name for p in tmp_path.iterdir()] == ["fresh.csv"]
+
+
+def test_delete_expired_files_without_export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path / "missing"))
+    assert ExportService.delete_expired_files() == 0
+
+
+@pytest.mark.parametrize("error, expected", [
+    (RuntimeError("openpyxl is not installed"), HTTPException),
+    (OSError("No space left on device"), OSError),
+])
+def test_xlsx_export_removes_temp_file_on_error(tmp_path, monkeypatch, error, expected):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(ExportService, "stream_requisitions", staticmethod(lambda **filters: iter(())))
+
+    def write_xlsx(rows, path):
+        raise error
+    monkeypatch.setattr(ExportService, "write_xlsx", staticmethod(write_xlsx))
+
+    with pytest.raises(expected):
+        export_requisitions(format="xlsx")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from models.orm_models import User
+from scripts.generate_data import LoadDataWriter
+
+
+def read_field(field):
+    """What MySQL loads for a field with ESCAPED BY '\\'"""
+    if field == r"\N":
+        return None
+    value, chars = [], iter(field)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars)
+            char = {"t": "\t", "n": "\n"}.get(escaped, escaped)
+        value.append(char)
+    return "".join(value)
+
+
+class RecordingConnection:
+    """Keeps the file LOAD DATA would read"""
+
+    def __init__(self):
+        self.statements = []
+        self.files = []
+
+    def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+        path = statement.split("'")[1]
+        with open(path, newline="") as f:
+            self.files.append(f.read())
+
+
+def test_load_data_file_writes_null_and_escapes_strings():
+    conn = RecordingConnection()
+    row = {
+        "id": 1,
+        "username": None,
+        "first_name": "Tab\there",
+        "last_name": "Two\nlines",
+        "email": "back\\slash@example.com",
+        "is_sys_admin": True,
+        "created_at": datetime(2025, 1, 2, 3, 4, 5),
+    }
+
+    LoadDataWriter().insert(conn, User.__table__, [row])
+
+    assert conn.files == ["1\t\\N\tTab\\there\tTwo\\nlines\tback\\\\slash@example.com\t1\t2025-01-02 03:04:05\n"]
+    fields = conn.files[0].rstrip("\n").split("\t")
+    assert fields[1] == r"\N"
+    assert [read_field(field) for field in fields[1:5]] == [None, "Tab\there", "Two\nlines", "back\\slash@example.com"]
+    assert conn.statements[0].endswith("(id, username, first_name, last_name, email, is_sys_admin, created_at)")
@@ -0,0 +1,128 @@
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import JWTError, jwk, jwt
+
+from controllers import jwks
+from core import keys
+from core.config import settings
+
+PRIVATE_FIELDS = {"d", "p", "q", "dp", "dq", "qi"}
+
+
+def write_key(directory, kid: str, private: bool = True) -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if private:
+        pem = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    else:
+        pem = key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+    (directory / f"{kid}.pem").write_bytes(pem)
+    return pem.decode()
+
+
+def key_pair(path):
+    private = jwk.construct(path.read_text(), "RS256")
+    return private.public_key(), private
+
+
+@pytest.fixture
+def rsa_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ALGORITHM", "RS256")
+    monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", None)
+    monkeypatch.setattr(keys, "_key_ring", None)
+    return tmp_path
+
+
+def test_token_signed_by_an_older_key_still_verifies(rsa_keys, monkeypatch):
+    write_key(rsa_keys, "2026-01")
+    old_token = keys.reload_key_ring().encode({"sub": "a@example.com"})
+    assert jwt.get_unverified_header(old_token)["kid"] == "2026-01"
+
+    # Rotate: a newer key signs from now on, the old one only verifies
+    write_key(rsa_keys, "2026-02")
+    ring = keys.reload_key_ring()
+    assert ring.active.kid == "2026-02"
+    new_token = ring.encode({"sub": "b@example.com"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "2026-02"
+    assert ring.decode(old_token)["sub"] == "a@example.com"
+    assert ring.decode(new_token)["sub"] == "b@example.com"
+
+    # JWT_ACTIVE_KID overrides the name order
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "2026-01")
+    assert keys.reload_key_ring().active.kid == "2026-01"
+
+
+def test_unknown_kid_is_rejected(rsa_keys, tmp_path_factory):
+    other_dir = tmp_path_factory.mktemp("other")
+    write_key(other_dir, "elsewhere")
+    write_key(rsa_keys, "current")
+    foreign = keys.KeyRing(
+        [keys.SigningKey("elsewhere", "RS256", *key_pair(other_dir / "elsewhere.pem"))], "elsewhere"
+    ).encode({"sub": "x"})
+
+    with pytest.raises(JWTError):
+        keys.reload_key_ring().decode(foreign)
+
+
+def test_removed_key_no_longer_verifies(rsa_keys):
+    write_key(rsa_keys, "old")
+    token = keys.reload_key_ring().encode({"sub": "x"})
+    (rsa_keys / "old.pem").unlink()
+    write_key(rsa_keys, "new")
+    with pytest.raises(JWTError):
+        keys.reload_key_ring().decode(token)
+
+
+def test_public_only_key_verifies_but_cannot_sign(rsa_keys, monkeypatch):
+    write_key(rsa_keys, "signer")
+    write_key(rsa_keys, "verify-only", private=False)
+    ring = keys.reload_key_ring()
+    assert ring.active.kid == "signer"
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "verify-only")
+    with pytest.raises(ValueError):
+        keys.reload_key_ring()
+
+
+def test_jwks_exposes_only_public_material(rsa_keys):
+    write_key(rsa_keys, "a")
+    write_key(rsa_keys, "b")
+    keys.reload_key_ring()
+    app = FastAPI()
+    app.include_router(jwks)
+    response = TestClient(app).get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+    published = response.json()["keys"]
+    assert sorted(key["kid"] for key in published) == ["a", "b"]
+    for key in published:
+        assert key["kty"] == "RSA"
+        assert key["use"] == "sig"
+        assert key["alg"] == "RS256"
+        assert {"n", "e"} <= set(key)
+        assert not PRIVATE_FIELDS & set(key)
+
+
+def test_shared_secret_tokens_without_kid(monkeypatch):
+    monkeypatch.setattr(settings, "ALGORITHM", "HS256")
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "test-secret")
+    monkeypatch.setattr(keys, "_key_ring", None)
+    ring = keys.reload_key_ring()
+
+    # A token issued before key rotation existed: plain HS256, no kid header
+    existing = jwt.encode({"sub": "a@example.com"}, "test-secret", algorithm="HS256")
+    assert "kid" not in jwt.get_unverified_header(existing)
+    assert ring.decode(existing)["sub"] == "a@example.com"
+    assert "kid" not in jwt.get_unverified_header(ring.encode({"sub": "b"}))
+
+    with pytest.raises(JWTError):
+        ring.decode(jwt.encode({"sub": "x"}, "another-secret", algorithm="HS256"))
+    # Nothing to publish for a shared secret
+    assert ring.jwks() == {"keys": []}
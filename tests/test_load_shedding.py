@@ -0,0 +1,154 @@
+import asyncio
+
+from core.load_shedding import WINDOW_SIZE, AdaptiveConcurrencyLimiter, LoadSheddingMiddleware
+
+
+def limiter(limit: int = 1, max_queue_wait: float = 1.0) -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter(initial_limit=limit, min_limit=1, max_limit=8, max_queue_wait=max_queue_wait)
+
+
+def test_release_hands_the_slot_to_the_oldest_waiter():
+    async def scenario():
+        lim = limiter(limit=2)
+        assert await lim.acquire()
+        assert await lim.acquire()
+        first = asyncio.ensure_future(lim.acquire())
+        second = asyncio.ensure_future(lim.acquire())
+        await asyncio.sleep(0)
+        assert lim.stats()["queued_now"] == 2
+
+        lim.release(0.01)
+        assert await first
+        assert not second.done()
+        assert lim.in_flight == 2
+
+        lim.release(0.01)
+        assert await second
+        lim.release(0.01)
+        lim.release(0.01)
+        assert lim.in_flight == 0
+        assert lim.stats()["queued"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_timeout_sheds_the_request():
+    async def scenario():
+        lim = limiter(max_queue_wait=0.02)
+        assert await lim.acquire()
+        assert not await lim.acquire()
+        assert lim.shed == 1
+        assert lim.stats()["queued_now"] == 0
+        # The timed out waiter doesn't get the slot later
+        lim.release(0.01)
+        assert lim.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_sheds_immediately():
+    async def scenario():
+        lim = limiter()
+        assert await lim.acquire()
+        queued = asyncio.ensure_future(lim.acquire())
+        await asyncio.sleep(0)
+        # The queue holds at most `limit` waiters
+        assert not await lim.acquire()
+        assert lim.shed == 1
+        lim.release(0.01)
+        assert await queued
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        lim = limiter()
+        assert await lim.acquire()
+        waiting = asyncio.ensure_future(lim.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert lim.stats()["queued_now"] == 0
+        lim.release(0.01)
+        assert lim.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_right_after_hand_over_does_not_leak_the_slot():
+    async def scenario():
+        lim = limiter(limit=2)
+        assert await lim.acquire()
+        assert await lim.acquire()
+        cancelled = asyncio.ensure_future(lim.acquire())
+        following = asyncio.ensure_future(lim.acquire())
+        await asyncio.sleep(0)
+
+        lim.release(0.01)  # resolves the first waiter's future
+        cancelled.cancel()  # before its task got to run
+        [outcome] = await asyncio.gather(cancelled, return_exceptions=True)
+        if outcome is True:
+            # Before Python 3.12 wait_for returns the result over the
+            # cancellation: the request got the slot and gives it back when done
+            lim.release(0.01)
+        # Either way the slot ends up with the next waiter
+        assert await following
+        lim.release(0.01)
+        lim.release(0.01)
+        assert lim.in_flight == 0
+        assert lim.stats()["queued_now"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_recent_latency_reports_the_partial_window():
+    lim = limiter(limit=4)
+    assert lim.stats()["recent_latency_ms"] is None
+    lim.release(0.010)
+    lim.release(0.030)
+    stats = lim.stats()
+    assert stats["recent_latency_ms"] == 20.0
+    assert stats["recent_latency_samples"] == 2
+    assert stats["long_term_latency_ms"] is None
+
+    for _ in range(WINDOW_SIZE - 2):
+        lim.release(0.020)
+    stats = lim.stats()
+    assert stats["recent_latency_samples"] == WINDOW_SIZE
+    assert stats["long_term_latency_ms"] == stats["recent_latency_ms"]
+
+
+def test_middleware_sheds_with_503():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        middleware = LoadSheddingMiddleware(app, limiter(max_queue_wait=0.02))
+
+        async def request():
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                messages.append(message)
+
+            await middleware({"type": "http", "path": "/x", "method": "GET", "headers": []}, receive, send)
+            return messages[0]
+
+        held = asyncio.ensure_future(request())
+        await asyncio.sleep(0)
+        shed = await request()
+        assert shed["status"] == 503
+        assert (b"retry-after", b"1") in shed["headers"]
+        release.set()
+        assert (await held)["status"] == 200
+        assert middleware.limiter.in_flight == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import TypeAdapter
+
+from models.requisition import RequisitionWithApprovals
+from models.requisition_approval import RequisitionApproval
+
+page_adapter = TypeAdapter(List[RequisitionWithApprovals])
+
+
+def respond(value) -> bytes:
+    """What FastAPI does with the value a route returns for this response_model"""
+    return page_adapter.dump_json(page_adapter.validate_python(value, from_attributes=True), by_alias=True)
+
+
+def approval_row(requisition_id, level, decided):
+    return {
+        "id": requisition_id * 10 + level,
+        "requisition_id": requisition_id,
+        "approval_level": level,
+        "role_id": 3 + level,
+        "approver_id": 7 if decided else None,
+        "status_id": 3 if decided else 1,
+        "comments": "Ok, \"within budget\"" if decided else None,
+        "decision_date": datetime(2025, 3, 4, 15, 6, 7, 890123) if decided else None,
+        "skipped": False,
+        "skip_reason": None,
+        "skipped_by_user_id": None,
+        "skipped_at": None,
+        "created_at": datetime(2025, 3, 1, 9, 0),
+        "updated_at": datetime(2025, 3, 4, 15, 6, 7),
+    }
+
+
+def requisition_rows():
+    """A page as the service reads it: columns, archived flag and approval chains"""
+    rows = []
+    for i in range(1, 4):
+        rows.append({
+            "id": i,
+            "requisition_number": f"PR-2025-{i:05d}",
+            "requisition_type_id": 1,
+            "flow_id": 1,
+            "flow_version_id": 2,
+            "department_id": 4,
+            "initiator_id": 9,
+            "current_status_id": 2,
+            "total_amount": 1234.5 * i,
+            "submission_date": datetime(2025, 3, i, 8, 30, 0, 120000) if i > 1 else None,
+            "created_at": datetime(2025, 3, i, 8, 0),
+            "updated_at": datetime(2025, 3, i, 8, 30, 0, 120000),
+            "deleted_at": None,
+            "archived": i == 3,
+            "approvals": [approval_row(i, level, decided=level < i) for level in (1, 2)],
+        })
+    return rows
+
+
+def trusted_page(rows):
+    return [
+        RequisitionWithApprovals.trusted({
+            **row,
+            "approvals": [RequisitionApproval.trusted(approval) for approval in row["approvals"]],
+        })
+        for row in rows
+    ]
+
+
+def test_trusted_models_serialize_like_validated_ones():
+    rows = requisition_rows()
+
+    validated = respond(rows)
+
+    assert respond(trusted_page(rows)) == validated
+    assert b'"decision_date":"2025-03-04T15:06:07.890123"' in validated
+    assert b'"submission_date":null' in validated
+
+
+def test_trusted_models_dump_like_validated_ones():
+    rows = requisition_rows()
+    validated = [RequisitionWithApprovals.model_validate(row) for row in rows]
+
+    for trusted, expected in zip(trusted_page(rows), validated):
+        for mode in ("python", "json"):
+            assert trusted.model_dump(mode=mode, by_alias=True) == expected.model_dump(mode=mode, by_alias=True)
+        assert trusted.model_dump_json(by_alias=True) == expected.model_dump_json(by_alias=True)
+        assert isinstance(trusted.approvals[0], RequisitionApproval)
+
+
+def test_trusted_fills_defaults_like_validation():
+    row = {key: value for key, value in requisition_rows()[0].items() if key not in ("archived", "approvals", "deleted_at")}
+
+    assert RequisitionWithApprovals.trusted(row) == RequisitionWithApprovals.model_validate(row)
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete
+
+import core.org_index as org_index_module
+from core.config import settings
+from core.org_index import org_index
+from models.orm_models import Department, DepartmentUserRole, User
+
+DELEGATE, MANAGER = 3, 5
+
+
+@pytest.fixture
+def index(db, db_sessions, monkeypatch):
+    """The shared index, emptied and loaded from the test database; restored afterwards"""
+    monkeypatch.setattr(org_index_module, "SessionLocal", db_sessions)
+    for name, empty in (("_by_user", {}), ("_by_department", {}), ("_loaded", False), ("full_loads", 0), ("user_reloads", 0)):
+        monkeypatch.setattr(org_index, name, empty)
+    db.add_all([Department(id=1, name="IT", code="IT"), Department(id=2, name="HR", code="HR")])
+    for user_id in (1, 2, 3):
+        db.add(User(id=user_id, first_name="U", last_name=str(user_id), email=f"u{user_id}@example.com", password="x"))
+    db.flush()
+    db.add_all([
+        DepartmentUserRole(id=1, department_id=1, user_id=1, role_id=DELEGATE),
+        DepartmentUserRole(id=2, department_id=1, user_id=2, role_id=MANAGER),
+        DepartmentUserRole(id=3, department_id=2, user_id=2, role_id=DELEGATE),
+    ])
+    db.commit()
+    org_index.load()
+    return org_index
+
+
+def test_load_builds_both_lookups(index):
+    assert index.roles_of(2) == {(1, MANAGER), (2, DELEGATE)}
+    assert index.holders(1, DELEGATE) == {1}
+    assert index.resolve([(1, MANAGER), (2, MANAGER)]) == {(1, MANAGER): {2}, (2, MANAGER): frozenset()}
+    assert index.stats()["memberships"] == 3
+
+
+def test_commit_reloads_only_the_changed_users(db, index):
+    db.add(DepartmentUserRole(department_id=1, user_id=3, role_id=MANAGER))
+    db.commit()
+
+    assert index.can_approve(3, 1, MANAGER)
+    assert index.holders(1, MANAGER) == {2, 3}
+    assert (index.full_loads, index.user_reloads) == (1, 1)
+
+
+def test_moving_a_membership_reloads_both_users(db, index):
+    membership = db.get(DepartmentUserRole, 1)
+    membership.user_id = 3
+    db.commit()
+
+    assert index.roles_of(1) == frozenset()
+    assert index.roles_of(3) == {(1, DELEGATE)}
+    assert index.holders(1, DELEGATE) == {3}
+
+
+def test_rolled_back_changes_are_not_applied(db, index):
+    db.add(DepartmentUserRole(department_id=1, user_id=3, role_id=MANAGER))
+    db.flush()
+    db.rollback()
+    db.commit()
+
+    assert index.roles_of(3) == frozenset()
+    assert index.user_reloads == 0
+
+
+def test_soft_deleted_user_leaves_the_index(db, index):
+    db.get(User, 2).deleted_at = datetime.utcnow()
+    db.commit()
+
+    assert index.roles_of(2) == frozenset()
+    assert index.holders(1, MANAGER) == frozenset()
+    assert index.holders(2, DELEGATE) == frozenset()
+
+
+def test_soft_deleted_department_triggers_a_full_rebuild(db, index):
+    db.get(Department, 2).deleted_at = datetime.utcnow()
+    db.commit()
+
+    assert index.full_loads == 2
+    assert index.roles_of(2) == {(1, MANAGER)}
+    assert index.resolve([(2, DELEGATE)]) == {(2, DELEGATE): frozenset()}
+
+
+def test_periodic_rebuild_catches_bulk_sql(db, index, monkeypatch):
+    # Core statements bypass the ORM hooks: the index is stale until the next rebuild
+    db.execute(delete(DepartmentUserRole).where(DepartmentUserRole.user_id == 1))
+    db.commit()
+    assert index.roles_of(1) == {(1, DELEGATE)}
+
+    monkeypatch.setattr(settings, "ORG_INDEX_REFRESH_SECONDS", 0.01)
+
+    async def run_briefly():
+        try:
+            await asyncio.wait_for(index.run_refresh_loop(), 0.1)
+        except asyncio.TimeoutError:
+            pass
+
+    asyncio.run(run_briefly())
+    assert index.roles_of(1) == frozenset()
+    assert index.full_loads > 2
+
+
+def test_invalidations_from_other_workers(db, index):
+    db.execute(delete(DepartmentUserRole).where(DepartmentUserRole.id.in_([1, 3])))
+    db.commit()
+
+    # What another worker publishes after committing a membership change
+    org_index_module._invalidations.delete(2)
+    assert index.roles_of(2) == {(1, MANAGER)}
+    assert index.roles_of(1) == {(1, DELEGATE)}
+
+    # ...and after a department change
+    org_index_module._invalidations.clear()
+    assert index.roles_of(1) == frozenset()
+    assert index.full_loads == 2
+
+
+def test_invalidations_are_ignored_before_the_first_load(index, monkeypatch):
+    monkeypatch.setattr(index, "_loaded", False)
+    org_index_module._invalidations.clear()
+    org_index_module._invalidations.delete(1)
+    assert (index.full_loads, index.user_reloads) == (1, 0)
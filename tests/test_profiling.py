@@ -0,0 +1,78 @@
+import threading
+import time
+
+import anyio.to_thread
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import profiling
+from core.profiling import ProfilingMiddleware, get_profile, install_thread_tagging, uninstall_thread_tagging
+
+
+@pytest.fixture(autouse=True)
+def restore_run_sync():
+    original = anyio.to_thread.run_sync
+    yield
+    uninstall_thread_tagging()
+    assert anyio.to_thread.run_sync is original
+
+
+def slow_endpoint_work():
+    time.sleep(0.2)
+
+
+def unrelated_work(done: threading.Event):
+    done.wait(1)
+
+
+def make_client(monkeypatch) -> TestClient:
+    monkeypatch.setattr(profiling, "_is_admin", lambda headers: True)
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow():
+        slow_endpoint_work()
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, interval_ms=5)
+    return TestClient(app)
+
+
+def test_profile_samples_only_this_requests_threadpool_work(monkeypatch):
+    client = make_client(monkeypatch)
+    done = threading.Event()
+    other = threading.Thread(target=unrelated_work, args=(done,))
+    other.start()
+    try:
+        response = client.get("/slow", headers={"X-Profile": "1"})
+    finally:
+        done.set()
+        other.join()
+
+    profile = get_profile(response.headers["X-Profile-Id"])
+    assert profile["summary"]["threadpool_ms"] > 100
+    threadpool_stacks = [stack for stack in profile["stacks"] if stack.startswith("threadpool;")]
+    assert any("slow_endpoint_work" in stack for stack in threadpool_stacks)
+    assert not any("unrelated_work" in stack for stack in profile["stacks"])
+    # Worker threads are untagged once the request is done
+    assert profiling._profiled_threads == {}
+
+
+def test_unflagged_requests_are_not_profiled(monkeypatch):
+    client = make_client(monkeypatch)
+    response = client.get("/slow")
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_thread_tagging_install_is_idempotent_and_reversible():
+    original = anyio.to_thread.run_sync
+    install_thread_tagging()
+    install_thread_tagging()
+    assert anyio.to_thread.run_sync is profiling._run_sync
+
+    uninstall_thread_tagging()
+    assert anyio.to_thread.run_sync is original
+    uninstall_thread_tagging()
+    assert anyio.to_thread.run_sync is original
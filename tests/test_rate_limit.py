@@ -0,0 +1,81 @@
+import threading
+
+import fakeredis
+import pytest
+from starlette.requests import Request
+
+from core.config import settings
+from core.rate_limit import MemoryRateLimitStore, RateLimiter, RedisRateLimitStore, get_client_ip
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return MemoryRateLimitStore()
+    return RedisRateLimitStore(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+
+
+def test_limit_per_scope(store):
+    limiter = RateLimiter(store, limits={"ip": 10, "email": 2}, window=60)
+    assert limiter.hit({"ip": "1.2.3.4", "email": "a@example.com"}).allowed
+    assert limiter.hit({"ip": "1.2.3.4", "email": "a@example.com"}).allowed
+    result = limiter.hit({"ip": "1.2.3.4", "email": "a@example.com"})
+    assert not result.allowed
+    assert result.scope == "email"
+    assert 0 < result.retry_after <= 60
+    assert limiter.hit({"ip": "1.2.3.4", "email": "b@example.com"}).allowed
+
+
+def test_rejected_attempts_are_not_counted(store):
+    limiter = RateLimiter(store, limits={"ip": 3, "email": 1}, window=60)
+    assert limiter.hit({"ip": "1.2.3.4", "email": "a@example.com"}).allowed
+    for _ in range(5):
+        assert not limiter.hit({"ip": "1.2.3.4", "email": "a@example.com"}).allowed
+    # Only the allowed attempt counted against the IP
+    assert limiter.hit({"ip": "1.2.3.4", "email": "b@example.com"}).allowed
+    assert limiter.hit({"ip": "1.2.3.4", "email": "c@example.com"}).allowed
+    assert not limiter.hit({"ip": "1.2.3.4", "email": "d@example.com"}).allowed
+
+
+def test_concurrent_attempts_do_not_exceed_the_limit(store):
+    limiter = RateLimiter(store, limits={"email": 5}, window=3600)
+    start = threading.Barrier(20)
+    results = []
+
+    def attempt():
+        start.wait()
+        results.append(limiter.hit({"email": "a@example.com"}).allowed)
+
+    threads = [threading.Thread(target=attempt) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 5
+
+
+def make_request(headers=None, client=("10.0.0.1", 1234)) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": client,
+    })
+
+
+def test_client_ip_without_proxy_header(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HEADER", None)
+    assert get_client_ip(make_request({"X-Forwarded-For": "6.6.6.6"})) == "10.0.0.1"
+
+
+def test_client_ip_from_trusted_proxy_header(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HEADER", "X-Forwarded-For")
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+    # The client can prepend anything, only the entry our proxy appended counts
+    request = make_request({"X-Forwarded-For": "6.6.6.6, 203.0.113.7"})
+    assert get_client_ip(request) == "203.0.113.7"
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 2)
+    request = make_request({"X-Forwarded-For": "6.6.6.6, 203.0.113.7, 10.0.0.2"})
+    assert get_client_ip(request) == "203.0.113.7"
+    # Missing header falls back to the connection
+    assert get_client_ip(make_request()) == "10.0.0.1"
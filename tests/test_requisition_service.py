@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from models.orm_models import Requisition, archive_tables
+from services.requisition_service import RequisitionService
+
+
+def requisition(id, department_id, initiator_id, **values):
+    return {
+        "id": id,
+        "requisition_number": f"PR-{id}",
+        "requisition_type_id": 1,
+        "flow_id": 1,
+        "flow_version_id": 1,
+        "department_id": department_id,
+        "initiator_id": initiator_id,
+        "current_status_id": 3,
+        "total_amount": 100,
+        "created_at": datetime(2026, 1, id),
+        "updated_at": datetime(2026, 1, id),
+        **values,
+    }
+
+
+@pytest.fixture
+def requisitions(db):
+    db.execute(insert(Requisition.__table__), [
+        requisition(1, department_id=1, initiator_id=10),
+        requisition(2, department_id=2, initiator_id=10),
+        requisition(3, department_id=2, initiator_id=20),
+    ])
+    db.execute(insert(archive_tables["requisitions"]), [
+        requisition(4, department_id=2, initiator_id=20, archived_at=datetime(2026, 2, 1)),
+        requisition(5, department_id=3, initiator_id=20, archived_at=datetime(2026, 2, 1)),
+    ])
+    db.commit()
+
+
+def ids(rows):
+    return sorted(row["id"] for row in rows)
+
+
+def test_unscoped_reads_see_everything(db, requisitions):
+    assert ids(RequisitionService.get_requisitions(db, include_archive=True)) == [1, 2, 3, 4, 5]
+
+
+def test_scoped_reads_see_departments_and_own_requisitions(db, requisitions):
+    scope = {"visible_to": 20, "visible_departments": {1}}
+    assert ids(RequisitionService.get_requisitions(db, **scope)) == [1, 3]
+    assert ids(RequisitionService.get_requisitions(db, include_archive=True, **scope)) == [1, 3, 4, 5]
+    assert ids(RequisitionService.get_requisitions(db, department_id=2, **scope)) == [3]
+
+    assert RequisitionService.get_requisition_by_id(db, 2, **scope) is None
+    assert RequisitionService.get_requisition_by_id(db, 3, **scope)["id"] == 3
+    assert RequisitionService.get_requisition_by_id(db, 5, include_archive=True, **scope)["archived"]
+
+
+def test_scoped_reads_without_roles_only_see_own_requisitions(db, requisitions):
+    scope = {"visible_to": 10, "visible_departments": set()}
+    assert ids(RequisitionService.get_requisitions(db, include_archive=True, **scope)) == [1, 2]
+    assert RequisitionService.get_requisition_by_id(db, 4, include_archive=True, **scope) is None
@@ -0,0 +1,27 @@
+import pytest
+from passlib.hash import argon2
+
+from core import security
+from core.config import settings
+
+
+def test_bcrypt_context_without_argon2_backend(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", "bcrypt")
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(argon2, "has_backend", lambda name="any": False)
+    context = security.create_pwd_context()
+    assert context.schemes() == ("bcrypt",)
+    assert context.verify("secret", context.hash("secret"))
+
+
+def test_argon2_without_backend_fails_at_startup(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", "argon2")
+    monkeypatch.setattr(argon2, "has_backend", lambda name="any": False)
+    with pytest.raises(RuntimeError, match="argon2-cffi"):
+        security.create_pwd_context()
+
+
+def test_unknown_scheme_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", "md5")
+    with pytest.raises(ValueError):
+        security.create_pwd_context()
@@ -0,0 +1,61 @@
+import pytest
+
+from models.orm_models import RefreshToken, User
+from services.token_service import RefreshTokenReuseError, TokenService
+from services.user_service import UserService
+
+
+@pytest.fixture
+def user(db):
+    user = User(first_name="Ada", last_name="Lovelace", email="ada@example.com", password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_rotate_replaces_token(db, user):
+    raw, old = TokenService.issue_refresh_token(db, user.id)
+    rotated_user, new_raw = TokenService.rotate_refresh_token(db, raw)
+
+    assert rotated_user.id == user.id
+    db.refresh(old)
+    new = db.query(RefreshToken).filter_by(token_hash=TokenService.hash_token(new_raw)).one()
+    assert old.revoked_at is not None
+    assert old.replaced_by_id == new.id
+    assert new.family_id == old.family_id
+    assert new.revoked_at is None
+
+
+def test_reusing_a_rotated_token_revokes_the_family(db, user):
+    raw, _ = TokenService.issue_refresh_token(db, user.id)
+    _, new_raw = TokenService.rotate_refresh_token(db, raw)
+
+    with pytest.raises(RefreshTokenReuseError):
+        TokenService.rotate_refresh_token(db, raw)
+    assert TokenService.rotate_refresh_token(db, new_raw) is None
+
+
+def test_concurrent_rotation_does_not_fork_the_family(db_sessions, user):
+    first, second = db_sessions(), db_sessions()
+    raw, _ = TokenService.issue_refresh_token(first, user.id)
+
+    # The second request has read the token before the first one rotated it,
+    # and still holds the stale copy
+    stale = second.query(RefreshToken).filter_by(token_hash=TokenService.hash_token(raw)).one()
+    assert stale.revoked_at is None
+    _, winner_raw = TokenService.rotate_refresh_token(first, raw)
+
+    with pytest.raises(RefreshTokenReuseError):
+        TokenService.rotate_refresh_token(second, raw)
+    family = first.query(RefreshToken).all()
+    assert len(family) == 2
+    assert all(token.revoked_at is not None for token in family)
+    first.expire_all()
+    assert TokenService.rotate_refresh_token(first, winner_raw) is None
+
+
+def test_deleting_a_user_revokes_refresh_tokens(db, user):
+    raw, _ = TokenService.issue_refresh_token(db, user.id)
+    assert UserService.delete_user(db, user.id)
+    assert db.query(RefreshToken).filter(RefreshToken.revoked_at.is_(None)).count() == 0
+    assert TokenService.rotate_refresh_token(db, raw) is None